@@ -3,6 +3,7 @@ Our Simple Clerk agent with several capabilities/tools which helps it autonomous
 These tools include:
 
 - Inventory lookup and verification
+- Product search by partial name or SKU
 - Transaction processing
 - Receipt generation
 - Transaction queries
@@ -16,7 +17,25 @@ from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from datetime import datetime
+from decimal import Decimal
+import boto3
+import logging
 import os
+import sys
+
+# Import shim: the agent reuses modules from ../scripts (search index, restock
+# events and forecast). This is its only sys.path change; Lambda handler code
+# is loaded by path through lambda_modules, never from sys.path.
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+from dynamodb_batch import LoadError
+from lambda_modules import load_lambda
+from product_search_index import ProductSearchIndex, SEARCH_INDEX_JSON
+from restock_events import RestockEventEmitter
+from restock_forecast import load_order_up_to
+
+# The catalog snapshot is shared with the inventory service Lambda
+inventory_lambda = load_lambda('inventory')
 
 # Initialize the agent with a Bedrock model
 model = BedrockModel(model_id="nova-pro")
@@ -24,32 +43,104 @@ model = BedrockModel(model_id="nova-pro")
 # Initialize the DynamoDB client
 dynamodb = boto3.client('dynamodb')
 
+# Static product fields (name, price, ...) are loaded once and kept current
+# by the catalog version check; only stock is read from DynamoDB per lookup
+catalog = inventory_lambda.CatalogSnapshot(dynamodb, table_name='Products')
+
+# Raises a restock request when a sale takes a product across its reorder
+# threshold (no scheduled Products scan; restock_events.py is the rare sweep).
+# Quantities top stock up to the levels from scripts/restock_forecast.py.
+# Requests are only written by the flush at the end of a sale, never mid-sale.
+restock_events = RestockEventEmitter(dynamodb, table_name='Restock_Requests', order_up_to=load_order_up_to(),
+                                     auto_flush=False)
+
+logger = logging.getLogger(__name__)
+
+
+def plain_number(value):
+    """DynamoDB numbers deserialize to Decimal; return int or float for the agent."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def read_product(sku, fields):
+    """
+    Read product fields straight from DynamoDB, for SKUs not in the catalog
+    snapshot yet (added since it was loaded).
+
+    Returns:
+        dict: The requested fields with plain numbers, or None if the SKU does not exist
+    """
+    if sku == inventory_lambda.CATALOG_VERSION_KEY:
+        return None
+    response = dynamodb.get_item(TableName='Products', Key={'sku': {'S': sku}}, **inventory_lambda.projection(fields))
+    if 'Item' not in response:
+        return None
+    return {key: plain_number(value) for key, value in inventory_lambda.to_plain(response['Item']).items()}
+
 
 #Use the @tool decorator to create a tool for the agent to use
 @tool
 def inventory_lookup(sku: str) -> dict:
     """Look up product information and stock level by SKU."""
 
-
-    # Query DynamoDB for product
-    product = dynamodb.get_item(TableName='Products', Key={'sku': sku})
+    product = catalog.get(sku)
+    if product is None:
+        # Not in the snapshot yet: one direct read covers static and live fields
+        product = read_product(sku, ['name', 'price', 'stock_quantity'])
+        if product is None:
+            return {"sku": sku, "error": "Product not found"}
+        stock_quantity = product.get('stock_quantity', 0)
+    else:
+        # Stock changes with every sale, so it is always read live
+        stock = dynamodb.get_item(TableName='Products', Key={'sku': {'S': sku}},
+                                  ProjectionExpression='stock_quantity')
+        stock_quantity = int(stock.get('Item', {}).get('stock_quantity', {}).get('N', 0))
     return {
-        "sku": product['sku'],
+        "sku": sku,
         "name": product['name'],
-        "price": product['price'],
-        "stock_quantity": product['stock_quantity'],
-        "available": product['stock_quantity'] > 0
+        "price": plain_number(product['price']),
+        "stock_quantity": stock_quantity,
+        "available": stock_quantity > 0
     }
 
 
+# Loaded on first search and kept for the life of the process
+search_index = None
+
+
+@tool
+def product_search(query: str, limit: int = 5) -> list:
+    """
+    Search products by partial name, description, category or SKU.
+    Tolerates typos ("hart holdr" finds "Heart ... Holder") and ranks
+    best sellers first. Use it when the customer does not know the exact SKU,
+    then confirm stock with inventory_lookup.
+
+    Args:
+        query: Free text, e.g. "red alarm clock" or "85123"
+        limit: Maximum number of products to return
+    Returns:
+        A list of matching products (sku, name, category, price in cents, stock_quantity)
+    """
+    global search_index
+    if search_index is None:
+        search_index = ProductSearchIndex.load(os.environ.get('PRODUCT_SEARCH_INDEX', SEARCH_INDEX_JSON))
+    return [
+        {key: product[key] for key in ('sku', 'name', 'category', 'price', 'stock_quantity')}
+        for product in search_index.search(query, limit=limit)
+    ]
+
+
 @tool
 def transaction_processing(items: list) -> dict:
     """
     Process a transaction by calculating the total price and stock level.
     It does the following:
     - Calculates the total price of the items
-    - Calculates the stock level of the items
     - Updates the stock level of the items
+    - Raises a restock request for any item the sale takes to or below its reorder threshold
     - Returns the total price and stock level of the transaction
     
     Args:
@@ -58,26 +149,47 @@ def transaction_processing(items: list) -> dict:
         A dictionary containing the total price and stock level of the transaction
         {
             "total_price": total_price,
-            "stock_level": stock_level
+            "stock_level": stock_level,
+            "restock_requested": [skus]
         }
     """
 
     # Calculate the total price of the items
     total_price = sum(item['price'] * item['quantity'] for item in items)
-    # Calculate the stock level of the items
-    stock_level = sum(item['stock_quantity'] for item in items)
 
-    # Update the stock level of the items
+    # Update the stock level of the items; the new level comes back with the write
+    stock_level = 0
+    restock_requested = []
     for item in items:
-        dynamodb.update_item(
+        response = dynamodb.update_item(
             TableName='Products',
-            Key={'sku': item['sku']},
+            Key={'sku': {'S': item['sku']}},
             UpdateExpression='SET stock_quantity = stock_quantity - :quantity',
-            ExpressionAttributeValues={':quantity': item['quantity']}
+            ExpressionAttributeValues={':quantity': {'N': str(item['quantity'])}},
+            ReturnValues='UPDATED_NEW'
         )
+        stock_after = int(response['Attributes']['stock_quantity']['N'])
+        stock_level += stock_after
+
+        # reorder_threshold is a static field, so it comes from the catalog snapshot
+        # (or a direct read for a SKU added since the snapshot was loaded)
+        product = catalog.get(item['sku']) or read_product(
+            item['sku'], ['sku', 'name', 'reorder_threshold', 'supplier_name'])
+        if product and restock_events.record_sale(product, stock_after, item['quantity']):
+            restock_requested.append(item['sku'])
+
+    # One BatchWriteItem for every restock request this sale raised. The stock
+    # updates are already written, so a failed restock write must not fail the
+    # sale (a retry would decrement stock twice); the reconciliation sweep in
+    # scripts/restock_events.py raises any request lost here.
+    try:
+        restock_events.flush()
+    except LoadError as e:
+        logger.warning(f"Restock requests not written, left to the reconciliation sweep: {e}")
     return {
         "total_price": total_price,
-        "stock_level": stock_level
+        "stock_level": stock_level,
+        "restock_requested": restock_requested
     }
 
 @tool
@@ -300,7 +412,7 @@ def transaction_queries(transaction_type: str) -> any:
 clerk_agent = Agent(
     name="clerk_agent",
     model=model,
-    tools=[inventory_lookup, transaction_processing,
+    tools=[inventory_lookup, product_search, transaction_processing,
      receipt_generation, transaction_queries],
     system_prompt=
     """
@@ -308,6 +420,7 @@ clerk_agent = Agent(
     
     You have the following tools at your disposal:
     - inventory_lookup: Look up products in the inventory
+    - product_search: Find products by partial name or SKU when the exact SKU is unknown
     - transaction_processing: Process transactions
     - receipt_generation: Generate receipts
     - transaction_queries: Query transaction history
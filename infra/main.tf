@@ -172,6 +172,11 @@ module "lambda_inventory" {
   environment    = local.environment
   tags           = local.common_tags
 
+  environment_variables = {
+    PRODUCTS_TABLE        = module.dynamodb.products_table_name
+    CATALOG_CHECK_SECONDS = "30"
+  }
+
   # DynamoDB permissions
   dynamodb_table_arns = [
     module.dynamodb.products_table_arn,
@@ -190,6 +195,12 @@ module "lambda_auth" {
   runtime        = "python3.13"
   environment    = local.environment
   tags           = local.common_tags
+
+  environment_variables = {
+    COGNITO_REGION = var.aws_region
+    USER_POOL_ID   = var.cognito_user_pool_id
+    APP_CLIENT_ID  = var.cognito_app_client_id
+  }
 }
 
 # S3 Bucket Policy for Web Application - Allow CloudFront OAC Access
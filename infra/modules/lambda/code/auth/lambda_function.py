@@ -1,10 +1,329 @@
-def handler(event, context):
+"""
+Auth Service Lambda: Cognito JWT verification
+
+Verifies Cognito access and ID tokens locally instead of calling Cognito on
+every request. Usable as an API Gateway HTTP API Lambda authorizer (simple
+responses) and as GET /auth/user, which returns the caller's claims.
+
+Features:
+- RS256 signature verification with the standard library only (PKCS#1 v1.5)
+- JWKS cache: signing keys are fetched once per container, refreshed on a timer
+  and on an unknown `kid` (key rotation), with a floor between refetches so
+  forged kids cannot force a fetch per request. A failed fetch keeps serving
+  the last good keys (tokens with unknown kids are denied, not errored)
+- Verified-claims LRU: a token already verified in this container is accepted
+  from memory until it expires
+- Standard checks: alg, exp/nbf with clock skew, issuer, token_use, audience/client_id
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+import urllib.request
+from collections import OrderedDict
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Configuration
+REGION = os.environ.get('COGNITO_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+USER_POOL_ID = os.environ.get('USER_POOL_ID', '')
+APP_CLIENT_ID = os.environ.get('APP_CLIENT_ID', '')
+ISSUER = os.environ.get('TOKEN_ISSUER') or f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}"
+JWKS_URL = os.environ.get('JWKS_URL') or f"{ISSUER}/.well-known/jwks.json"
+JWKS_REFRESH_SECONDS = int(os.environ.get('JWKS_REFRESH_SECONDS', '3600'))
+JWKS_MIN_REFETCH_SECONDS = int(os.environ.get('JWKS_MIN_REFETCH_SECONDS', '30'))
+JWKS_TIMEOUT_SECONDS = 2.0
+CLAIMS_CACHE_SIZE = int(os.environ.get('CLAIMS_CACHE_SIZE', '2048'))
+CLOCK_SKEW_SECONDS = 60
+ALLOWED_TOKEN_USES = ('access', 'id')
+
+# ASN.1 DigestInfo prefix for SHA-256 (RFC 8017, section 9.2)
+SHA256_DIGEST_INFO = bytes.fromhex('3031300d060960864801650304020105000420')
+
+
+class AuthError(Exception):
+    """Token rejected (always surfaced to the client as 401)."""
+    def __init__(self, message):
+        self.message = message
+
+
+def b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def b64url_int(segment):
+    return int.from_bytes(b64url_decode(segment), 'big')
+
+
+def rsa_verify_sha256(n, e, message, signature):
     """
-    Auth Service Lambda function handler.
-    This placeholder will be replaced with actual code via CI/CD deployment.
+    Verify an RSASSA-PKCS1-v1_5 SHA-256 signature (JWT alg RS256).
+
+    Args:
+        n, e: RSA public key modulus and exponent
+        message: Signed bytes (base64url header + '.' + payload)
+        signature: Raw signature bytes
+
+    Returns:
+        bool: True if the signature is valid
+    """
+    k = (n.bit_length() + 7) // 8
+    if len(signature) != k:
+        return False
+    s = int.from_bytes(signature, 'big')
+    if s >= n:
+        return False
+    encoded = pow(s, e, n).to_bytes(k, 'big')
+    digest_info = SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+    expected = b'\x00\x01' + b'\xff' * (k - len(digest_info) - 3) + b'\x00' + digest_info
+    return hmac.compare_digest(encoded, expected)
+
+
+def fetch_jwks(url):
+    """GET the JSON Web Key Set."""
+    with urllib.request.urlopen(url, timeout=JWKS_TIMEOUT_SECONDS) as response:
+        return json.loads(response.read())
+
+
+class JWKSCache:
+    """
+    Signing keys by kid, refreshed every refresh_seconds and when a token
+    names an unknown kid (but at most once per min_refetch_seconds). A failed
+    fetch is retried after min_refetch_seconds; until then the cached keys
+    (possibly none) are served.
+
+    Args:
+        url: JWKS URL
+        fetcher: Callable url -> JWKS dict (fetch_jwks by default; injectable for tests)
+    """
+
+    def __init__(self, url=None, refresh_seconds=None, min_refetch_seconds=None, fetcher=None):
+        self.url = url or JWKS_URL
+        self.refresh_seconds = JWKS_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self.min_refetch_seconds = JWKS_MIN_REFETCH_SECONDS if min_refetch_seconds is None else min_refetch_seconds
+        self.fetcher = fetcher or fetch_jwks
+        self.keys = {}
+        self.fetched_at = None
+        self.fetches = 0
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def refresh(self):
+        """
+        Re-fetch the key set. On failure the previous keys stay in use and the
+        next attempt waits min_refetch_seconds.
+
+        Returns:
+            bool: True if the fetch succeeded
+        """
+        self.fetches += 1
+        try:
+            jwks = self.fetcher(self.url)
+            keys = {
+                key['kid']: (b64url_int(key['n']), b64url_int(key['e']))
+                for key in jwks.get('keys', [])
+                if key.get('kty') == 'RSA' and key.get('use', 'sig') == 'sig'
+            }
+        except Exception as e:
+            self.failures += 1
+            self.retry_at = time.monotonic() + self.min_refetch_seconds
+            logger.warning(f"JWKS fetch failed, keeping {len(self.keys)} cached keys: {e}")
+            return False
+        self.keys = keys
+        self.fetched_at = time.monotonic()
+        self.retry_at = 0.0
+        logger.info(f"Fetched JWKS: {len(self.keys)} keys")
+        return True
+
+    def get(self, kid):
+        """Return (n, e) for kid, or None if the key set does not have it."""
+        if not isinstance(kid, str):
+            return None
+        now = time.monotonic()
+        if now < self.retry_at:
+            # Recent fetch failure: serve the cached keys until the back-off ends
+            return self.keys.get(kid)
+        age = None if self.fetched_at is None else now - self.fetched_at
+        if age is None or age >= self.refresh_seconds:
+            self.refresh()
+        elif kid not in self.keys and age >= self.min_refetch_seconds:
+            # Possibly a rotated key
+            self.refresh()
+        return self.keys.get(kid)
+
+
+class ClaimsCache:
+    """Bounded LRU of verified token -> claims, each entry valid until the token's exp (0 entries disables it)."""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = CLAIMS_CACHE_SIZE if max_entries is None else max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token, now):
+        entry = self.entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        claims, expires_at = entry
+        if expires_at <= now:
+            del self.entries[token]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(token)
+        self.hits += 1
+        return claims
+
+    def put(self, token, claims, expires_at):
+        if self.max_entries <= 0:
+            return
+        self.entries[token] = (claims, expires_at)
+        self.entries.move_to_end(token)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+# Kept for the life of the container
+jwks_cache = None
+claims_cache = ClaimsCache()
+
+
+def get_jwks_cache():
+    global jwks_cache
+    if jwks_cache is None:
+        jwks_cache = JWKSCache()
+    return jwks_cache
+
+
+def validate_claims(claims, now):
+    """Time, issuer, token_use and audience checks (raises AuthError)."""
+    if not isinstance(claims.get('exp'), (int, float)) or claims['exp'] + CLOCK_SKEW_SECONDS <= now:
+        raise AuthError('Token expired')
+    nbf = claims.get('nbf', 0)
+    if not isinstance(nbf, (int, float)):
+        raise AuthError('Malformed token')
+    if nbf - CLOCK_SKEW_SECONDS > now:
+        raise AuthError('Token not yet valid')
+    if claims.get('iss') != ISSUER:
+        raise AuthError('Invalid issuer')
+    token_use = claims.get('token_use')
+    if token_use not in ALLOWED_TOKEN_USES:
+        raise AuthError('Invalid token_use')
+    if APP_CLIENT_ID:
+        audience = claims.get('client_id') if token_use == 'access' else claims.get('aud')
+        if audience != APP_CLIENT_ID:
+            raise AuthError('Invalid audience')
+
+
+def verify_token(token, now=None):
     """
+    Verify a Cognito JWT and return its claims.
+
+    Args:
+        token: Compact JWS (header.payload.signature)
+        now: Current Unix time (default: time.time())
+
+    Returns:
+        dict: Verified claims
+
+    Raises:
+        AuthError: If the token is malformed, badly signed, expired or not for this app
+    """
+    now = time.time() if now is None else now
+    claims = claims_cache.get(token, now)
+    if claims is not None:
+        return claims
+
+    try:
+        header_segment, payload_segment, signature_segment = token.split('.')
+        header = json.loads(b64url_decode(header_segment))
+        claims = json.loads(b64url_decode(payload_segment))
+        signature = b64url_decode(signature_segment)
+    except (ValueError, AttributeError):
+        raise AuthError('Malformed token')
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise AuthError('Malformed token')
+
+    # Only RS256: never trust 'none' or HMAC algorithms named by the token
+    if header.get('alg') != 'RS256':
+        raise AuthError('Unsupported algorithm')
+    kid = header.get('kid')
+    if not isinstance(kid, str):
+        raise AuthError('Malformed token')
+    key = get_jwks_cache().get(kid)
+    if key is None:
+        raise AuthError('Unknown signing key')
+    if not rsa_verify_sha256(key[0], key[1], f"{header_segment}.{payload_segment}".encode('ascii'), signature):
+        raise AuthError('Invalid signature')
+
+    validate_claims(claims, now)
+    claims_cache.put(token, claims, claims['exp'] + CLOCK_SKEW_SECONDS)
+    return claims
+
+
+def bearer_token(headers):
+    value = headers.get('authorization', '')
+    return value[7:].strip() if value[:7].lower() == 'bearer ' else value.strip()
+
+
+def user_context(claims):
+    """Claims passed on to downstream Lambdas (authorizer context) or returned by /auth/user."""
     return {
-        'statusCode': 200,
-        'body': 'Placeholder - Auth Service - deploy via CI/CD'
+        'user_id': claims.get('sub'),
+        'username': claims.get('username') or claims.get('cognito:username'),
+        'email': claims.get('email'),
+        'groups': claims.get('cognito:groups', []),
+        'token_use': claims.get('token_use'),
+        'expires_at': claims.get('exp'),
     }
 
+
+def json_response(status, payload):
+    return {
+        'statusCode': status,
+        'headers': {'Content-Type': 'application/json', 'Cache-Control': 'no-store'},
+        'body': json.dumps(payload, separators=(',', ':')),
+    }
+
+
+def handler(event, context):
+    """
+    Auth Service Lambda function handler.
+
+    Handles HTTP API Lambda authorizer events (payload 2.0, simple responses)
+    and GET /auth/user.
+
+    Args:
+        event: API Gateway event
+        context: Lambda context
+
+    Returns:
+        dict: Authorizer or proxy response
+    """
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+    token = bearer_token(headers)
+
+    if event.get('type') == 'REQUEST' or 'routeArn' in event:
+        try:
+            claims = verify_token(token)
+        except AuthError as e:
+            logger.info(f"Denied: {e.message}")
+            return {'isAuthorized': False}
+        context_values = user_context(claims)
+        context_values['groups'] = ','.join(context_values['groups'])  # Authorizer context values are scalars
+        return {'isAuthorized': True, 'context': context_values}
+
+    method = event.get('requestContext', {}).get('http', {}).get('method', 'GET')
+    path = event.get('rawPath', '')
+    if method == 'GET' and path.rstrip('/').endswith('/auth/user'):
+        try:
+            return json_response(200, user_context(verify_token(token)))
+        except AuthError as e:
+            return json_response(401, {'error': e.message})
+    return json_response(404, {'error': f"Route not found: {method} {path}"})
@@ -1,10 +1,530 @@
-def handler(event, context):
+"""
+Inventory Service Lambda (read paths of /inventory-crud)
+
+Routes (API Gateway HTTP API, payload format 2.0):
+- GET /inventory-crud/products          List products (cursor pagination, optional ?category=)
+- GET /inventory-crud/products/{sku}    Get one product
+- GET /inventory-crud/stock/{sku}       Get stock level (strongly consistent read)
+
+Features:
+- Cursor-based pagination: ?limit=&cursor= where the cursor is the opaque,
+  URL-safe encoding of DynamoDB's LastEvaluatedKey (no offset scans)
+- Sparse field selection: ?fields=sku,name,price becomes a ProjectionExpression,
+  so unused attributes are neither read into the response nor sent
+- ETag on every 200 response; a matching If-None-Match returns 304 with no body
+- gzip for bodies over GZIP_MIN_BYTES when the client sends Accept-Encoding: gzip
+- DynamoDB client created once per container and reused by warm invocations
+- Catalog snapshot: static product fields (name, price, category, supplier, ...)
+  are loaded once per container and kept current by checking a catalog-version
+  item at most every CATALOG_CHECK_SECONDS and re-reading only the SKUs that
+  changed; product lookups then read static fields from memory and fetch only
+  live stock from DynamoDB
+"""
+
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from decimal import Decimal
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Configuration
+PRODUCTS_TABLE = os.environ.get('PRODUCTS_TABLE', 'Products')
+CATEGORY_INDEX = 'category-index'
+ROUTE_PREFIX = '/inventory-crud'
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '200'))
+GZIP_MIN_BYTES = int(os.environ.get('GZIP_MIN_BYTES', '1024'))
+GZIP_LEVEL = 6
+
+PRODUCT_FIELDS = {
+    'sku', 'name', 'description', 'category', 'price', 'cost', 'stock_quantity', 'reorder_threshold',
+    'unit', 'supplier_name', 'supplier_contact', 'image_url', 'created_at', 'updated_at', 'is_active',
+}
+STOCK_FIELDS = ['sku', 'stock_quantity', 'reorder_threshold', 'updated_at']
+# Fields that change with every sale are always read live
+DYNAMIC_FIELDS = {'stock_quantity', 'updated_at'}
+STATIC_FIELDS = sorted(PRODUCT_FIELDS - DYNAMIC_FIELDS)
+
+# Catalog snapshot
+CATALOG_VERSION_KEY = '_catalog_version'  # Reserved sku of the version item in the Products table
+CATALOG_CHECK_SECONDS = float(os.environ.get('CATALOG_CHECK_SECONDS', '30'))
+CATALOG_CHANGE_LOG_SIZE = 500  # Changed SKUs remembered by the version item
+BATCH_GET_SIZE = 100  # BatchGetItem limit
+
+# Throttling errors surface as 503 so clients back off and retry
+RETRYABLE_ERRORS = {'ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded'}
+
+_deserializer = TypeDeserializer()
+_serializer = TypeSerializer()
+
+# Created on first use and kept for the life of the container
+dynamodb = None
+catalog = None
+
+
+class ApiError(Exception):
+    """Client-visible error with an HTTP status."""
+    def __init__(self, status, message):
+        self.status = status
+        self.message = message
+
+
+def get_client():
+    global dynamodb
+    if dynamodb is None:
+        dynamodb = boto3.client('dynamodb')
+    return dynamodb
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, set):
+        return sorted(value)
+    raise TypeError(f"Not JSON serialisable: {type(value).__name__}")
+
+
+def to_plain(item):
+    """DynamoDB attribute-value map to a plain dict."""
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def _version_item_key():
+    return {'sku': {'S': CATALOG_VERSION_KEY}}
+
+
+def bump_catalog_version(client, table_name, skus=None, retries=5):
     """
-    Inventory Service Lambda function handler.
-    This placeholder will be replaced with actual code via CI/CD deployment.
+    Record a catalog change so warm snapshots pick it up.
+
+    Args:
+        client: DynamoDB client
+        table_name: Products table
+        skus: Products whose static fields changed (None: everything changed,
+              e.g. after a bulk load; snapshots reload in full)
+        retries: Attempts when another writer bumps the version concurrently
+
+    Returns:
+        int: New catalog version
+    """
+    for _ in range(retries):
+        current = client.get_item(TableName=table_name, Key=_version_item_key(), ConsistentRead=True).get('Item')
+        version = int(current['version']['N']) if current else 0
+        changes = current.get('changes', {}).get('L', []) if current else []
+        new_version = version + 1
+        skus = None if skus is not None and len(skus) > CATALOG_CHANGE_LOG_SIZE else skus
+        if skus is None:
+            changes = []
+        else:
+            changes = changes + [{'M': {'v': {'N': str(new_version)}, 'sku': {'S': sku}}} for sku in skus]
+            # Drop whole versions from the front so every remembered version is complete
+            while len(changes) > CATALOG_CHANGE_LOG_SIZE:
+                oldest = changes[0]['M']['v']['N']
+                changes = [change for change in changes if change['M']['v']['N'] != oldest]
+        item = {**_version_item_key(), 'version': {'N': str(new_version)}, 'changes': {'L': changes},
+                'updated_at': {'N': str(int(time.time()))}}
+        condition = {'ConditionExpression': 'version = :version',
+                     'ExpressionAttributeValues': {':version': {'N': str(version)}}} if current else \
+                    {'ConditionExpression': 'attribute_not_exists(sku)'}
+        try:
+            client.put_item(TableName=table_name, Item=item, **condition)
+            return new_version
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+    raise RuntimeError(f"Could not bump catalog version after {retries} attempts")
+
+
+class CatalogSnapshot:
+    """
+    In-memory copy of the static product fields, shared by warm invocations.
+
+    The first lookup scans the table (static fields only). After that the
+    version item is read at most every check_seconds; when it has moved, only
+    the SKUs in its change log are re-read with BatchGetItem, or the snapshot
+    is reloaded in full if the log no longer reaches back to our version.
+
+    Args:
+        client: DynamoDB client
+        table_name: Products table
+        check_seconds: Minimum interval between version checks
     """
+
+    def __init__(self, client, table_name=None, check_seconds=None):
+        self.client = client
+        self.table_name = table_name or PRODUCTS_TABLE
+        self.check_seconds = CATALOG_CHECK_SECONDS if check_seconds is None else check_seconds
+        self.products = {}
+        self.version = None
+        self.loaded_at = None  # Wall clock of the last full load
+        self.checked_at = None  # Monotonic time of the last version check
+        self.lock = threading.Lock()
+        self.stats = {'full_loads': 0, 'delta_refreshes': 0, 'version_checks': 0, 'items_read': 0,
+                      'read_calls': 0, 'last_refresh_ms': 0.0, 'refresh_ms_total': 0.0}
+
+    def get(self, sku):
+        """Static fields of a product (None if unknown)."""
+        self.ensure_fresh()
+        return self.products.get(sku)
+
+    def ensure_fresh(self):
+        if self.checked_at is not None and time.monotonic() - self.checked_at < self.check_seconds:
+            return
+        with self.lock:
+            if self.checked_at is not None and time.monotonic() - self.checked_at < self.check_seconds:
+                return
+            start = time.perf_counter()
+            kind = self._refresh()
+            self.checked_at = time.monotonic()
+            if kind:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self.stats['last_refresh_ms'] = elapsed_ms
+                self.stats['refresh_ms_total'] += elapsed_ms
+                log_metrics(self, kind)
+
+    def _read_version(self, with_changes=False):
+        self.stats['read_calls'] += 1
+        attributes = ['version'] + (['changes'] if with_changes else [])
+        item = self.client.get_item(TableName=self.table_name, Key=_version_item_key(),
+                                    **projection(attributes)).get('Item', {})
+        version = int(item['version']['N']) if 'version' in item else 0
+        changes = [(int(change['M']['v']['N']), change['M']['sku']['S'])
+                   for change in item.get('changes', {}).get('L', [])]
+        return version, changes
+
+    def _refresh(self):
+        """Bring the snapshot up to date; returns 'full', 'delta' or None (unchanged)."""
+        if self.version is None:
+            self._full_load()
+            return 'full'
+        self.stats['version_checks'] += 1
+        version, _ = self._read_version()
+        if version == self.version:
+            return None
+        version, changes = self._read_version(with_changes=True)
+        versions = [change_version for change_version, _ in changes]
+        if not versions or min(versions) > self.version + 1:
+            self._full_load()
+            return 'full'
+        self._read_items(sorted({sku for change_version, sku in changes if change_version > self.version}))
+        self.version = version
+        self.stats['delta_refreshes'] += 1
+        return 'delta'
+
+    def _full_load(self):
+        # Version first: anything that changes during the scan is re-read at the next check
+        version, _ = self._read_version()
+        products = {}
+        request = {'TableName': self.table_name, **projection(STATIC_FIELDS)}
+        while True:
+            response = self.client.scan(**request)
+            self.stats['read_calls'] += 1
+            for item in response.get('Items', []):
+                product = to_plain(item)
+                if product.get('sku') != CATALOG_VERSION_KEY:
+                    products[product['sku']] = product
+            if 'LastEvaluatedKey' not in response:
+                break
+            request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        self.products = products
+        self.version = version
+        self.loaded_at = time.time()
+        self.stats['full_loads'] += 1
+        self.stats['items_read'] += len(products)
+
+    def _read_items(self, skus):
+        """Re-read changed SKUs; SKUs no longer in the table are dropped."""
+        for start in range(0, len(skus), BATCH_GET_SIZE):
+            keys = [{'sku': {'S': sku}} for sku in skus[start:start + BATCH_GET_SIZE]]
+            found = set()
+            request = {self.table_name: {'Keys': keys, **projection(STATIC_FIELDS)}}
+            while request:
+                response = self.client.batch_get_item(RequestItems=request)
+                self.stats['read_calls'] += 1
+                for item in response.get('Responses', {}).get(self.table_name, []):
+                    product = to_plain(item)
+                    self.products[product['sku']] = product
+                    found.add(product['sku'])
+                request = response.get('UnprocessedKeys') or None
+            for key in keys:
+                if key['sku']['S'] not in found:
+                    self.products.pop(key['sku']['S'], None)
+            self.stats['items_read'] += len(found)
+
+    def metrics(self):
+        """Snapshot age (seconds since the last full load), staleness bound and refresh cost."""
+        now = time.monotonic()
+        return {
+            'version': self.version,
+            'products': len(self.products),
+            'snapshot_age_seconds': round(time.time() - self.loaded_at, 3) if self.loaded_at else None,
+            'seconds_since_check': round(now - self.checked_at, 3) if self.checked_at is not None else None,
+            **self.stats,
+        }
+
+
+def log_metrics(snapshot, kind):
+    """Log snapshot metrics in CloudWatch Embedded Metric Format."""
+    metrics = snapshot.metrics()
+    logger.info(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': 'AgenticRetailOS/Catalog',
+                'Dimensions': [['Refresh']],
+                'Metrics': [{'Name': 'SnapshotAgeSeconds', 'Unit': 'Seconds'},
+                            {'Name': 'RefreshMs', 'Unit': 'Milliseconds'},
+                            {'Name': 'SnapshotProducts', 'Unit': 'Count'}],
+            }],
+        },
+        'Refresh': kind,
+        'SnapshotAgeSeconds': metrics['snapshot_age_seconds'],
+        'RefreshMs': round(metrics['last_refresh_ms'], 3),
+        'SnapshotProducts': metrics['products'],
+        'CatalogVersion': metrics['version'],
+    }))
+
+
+def get_catalog():
+    global catalog
+    if catalog is None:
+        catalog = CatalogSnapshot(get_client())
+    return catalog
+
+
+def encode_cursor(last_evaluated_key):
+    """LastEvaluatedKey to an opaque URL-safe cursor (None at the end of the table)."""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(to_plain(last_evaluated_key), separators=(',', ':'), default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Opaque cursor back to an ExclusiveStartKey."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ApiError(400, 'Invalid cursor')
+    if not isinstance(key, dict) or 'sku' not in key or not set(key) <= {'sku', 'category'}:
+        raise ApiError(400, 'Invalid cursor')
+    return {name: _serializer.serialize(value) for name, value in key.items()}
+
+
+def parse_fields(params, default=None):
+    """?fields=a,b to a validated field list (None for all fields)."""
+    value = params.get('fields')
+    if not value:
+        return default
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in PRODUCT_FIELDS]
+    if unknown:
+        raise ApiError(400, f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def projection(fields):
+    """Keyword arguments for a ProjectionExpression (names are aliased; 'name' is reserved)."""
+    if not fields:
+        return {}
+    names = {f"#f{i}": field for i, field in enumerate(fields)}
+    return {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+
+
+def parse_limit(params):
+    value = params.get('limit')
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ApiError(400, 'limit must be an integer')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ApiError(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+# Route handlers
+
+def list_products(params):
+    """One page of products; 'next_cursor' is null on the last page."""
+    limit = parse_limit(params)
+    fields = parse_fields(params)
+    # sku is always read so the catalog version item can be recognised and dropped
+    read_fields = fields if not fields or 'sku' in fields else ['sku', *fields]
+    request = {'TableName': PRODUCTS_TABLE, 'Limit': limit, **projection(read_fields)}
+    if params.get('cursor'):
+        request['ExclusiveStartKey'] = decode_cursor(params['cursor'])
+
+    category = params.get('category')
+    if category:
+        request['IndexName'] = CATEGORY_INDEX
+        request['KeyConditionExpression'] = '#category = :category'
+        request.setdefault('ExpressionAttributeNames', {})['#category'] = 'category'
+        request['ExpressionAttributeValues'] = {':category': {'S': category}}
+        response = get_client().query(**request)
+    else:
+        response = get_client().scan(**request)
+
+    items = [to_plain(item) for item in response.get('Items', [])
+             if item.get('sku', {}).get('S') != CATALOG_VERSION_KEY]
+    if read_fields is not fields:
+        for item in items:
+            item.pop('sku', None)
     return {
-        'statusCode': 200,
-        'body': 'Placeholder - Inventory Service - deploy via CI/CD'
+        'items': items,
+        'count': len(items),
+        'next_cursor': encode_cursor(response.get('LastEvaluatedKey')),
     }
 
+
+def get_product(sku, params):
+    """Static fields come from the catalog snapshot; only live fields are read from DynamoDB."""
+    fields = parse_fields(params)
+    if sku == CATALOG_VERSION_KEY:
+        raise ApiError(404, f"Product not found: {sku}")
+    static = get_catalog().get(sku)
+    if static is None:
+        # Not in the snapshot yet (or never existed): read the item directly
+        response = get_client().get_item(TableName=PRODUCTS_TABLE, Key={'sku': {'S': sku}},
+                                         **projection(fields))
+        if 'Item' not in response:
+            raise ApiError(404, f"Product not found: {sku}")
+        return to_plain(response['Item'])
+
+    wanted = fields or sorted(PRODUCT_FIELDS)
+    product = {field: static[field] for field in wanted if field in static}
+    live_fields = [field for field in wanted if field in DYNAMIC_FIELDS]
+    if live_fields:
+        response = get_client().get_item(TableName=PRODUCTS_TABLE, Key={'sku': {'S': sku}},
+                                         **projection(live_fields))
+        if 'Item' not in response:
+            raise ApiError(404, f"Product not found: {sku}")
+        product.update(to_plain(response['Item']))
+    return product
+
+
+def get_stock(sku):
+    response = get_client().get_item(TableName=PRODUCTS_TABLE, Key={'sku': {'S': sku}}, ConsistentRead=True,
+                                     **projection(STOCK_FIELDS))
+    if 'Item' not in response:
+        raise ApiError(404, f"Product not found: {sku}")
+    stock = to_plain(response['Item'])
+    stock['low_stock'] = stock.get('stock_quantity', 0) <= stock.get('reorder_threshold', 0)
+    return stock
+
+
+def route(method, path, params):
+    """
+    Dispatch a request.
+
+    Returns:
+        tuple: (payload, Cache-Control header)
+    """
+    if path.startswith(ROUTE_PREFIX):
+        path = path[len(ROUTE_PREFIX):]
+    parts = [part for part in path.split('/') if part]
+
+    if method != 'GET':
+        raise ApiError(405, f"Method not allowed: {method}")
+    if parts == ['products']:
+        return list_products(params), 'private, no-cache'
+    if len(parts) == 2 and parts[0] == 'products':
+        return get_product(parts[1], params), 'private, no-cache'
+    if len(parts) == 2 and parts[0] == 'stock':
+        # Stock changes with every sale; always revalidate
+        return get_stock(parts[1]), 'no-store'
+    raise ApiError(404, f"Route not found: {method} {path}")
+
+
+# Responses
+
+def etag_for(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match check (handles lists, weak validators and '*')."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in (tag[2:] if tag.startswith('W/') else tag for tag in candidates)
+
+
+def build_response(status, payload, headers, cache_control=None):
+    """
+    Serialise a payload, then apply conditional GET and compression.
+
+    Args:
+        status: HTTP status for the payload
+        payload: JSON-serialisable body
+        headers: Request headers (lowercase names)
+        cache_control: Cache-Control value for successful responses
+    """
+    body = json.dumps(payload, separators=(',', ':'), default=_json_default).encode('utf-8')
+    response_headers = {'Content-Type': 'application/json'}
+
+    if status == 200:
+        etag = etag_for(body)
+        response_headers['ETag'] = etag
+        response_headers['Vary'] = 'Accept-Encoding'
+        if cache_control:
+            response_headers['Cache-Control'] = cache_control
+        if etag_matches(headers.get('if-none-match'), etag):
+            return {'statusCode': 304, 'headers': response_headers, 'body': ''}
+
+    if len(body) >= GZIP_MIN_BYTES and 'gzip' in headers.get('accept-encoding', ''):
+        response_headers['Content-Encoding'] = 'gzip'
+        return {
+            'statusCode': status,
+            'headers': response_headers,
+            'body': base64.b64encode(gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)).decode('ascii'),
+            'isBase64Encoded': True,
+        }
+    return {'statusCode': status, 'headers': response_headers, 'body': body.decode('utf-8')}
+
+
+def handler(event, context):
+    """
+    Inventory Service Lambda function handler.
+
+    Args:
+        event: API Gateway HTTP API (payload 2.0) event
+        context: Lambda context
+
+    Returns:
+        dict: API Gateway proxy response
+    """
+    http = event.get('requestContext', {}).get('http', {})
+    method = http.get('method', event.get('httpMethod', 'GET'))
+    path = event.get('rawPath') or http.get('path') or event.get('path', '/')
+    params = event.get('queryStringParameters') or {}
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+
+    try:
+        payload, cache_control = route(method, path, params)
+        return build_response(200, payload, headers, cache_control)
+    except ApiError as e:
+        return build_response(e.status, {'error': e.message}, headers)
+    except ClientError as e:
+        code = e.response.get('Error', {}).get('Code', 'Unknown')
+        if code in RETRYABLE_ERRORS:
+            logger.warning(f"DynamoDB throttled {method} {path}: {code}")
+            response = build_response(503, {'error': 'Service busy, retry shortly'}, headers)
+            response['headers']['Retry-After'] = '1'
+            return response
+        logger.error(f"DynamoDB error on {method} {path}: {code}: {e}")
+        return build_response(500, {'error': 'Internal error'}, headers)
@@ -63,7 +63,11 @@ resource "aws_iam_role_policy" "dynamodb" {
           "dynamodb:BatchGetItem",
           "dynamodb:BatchWriteItem"
         ]
-        Resource = var.dynamodb_table_arns
+        # Query/Scan on a GSI is authorized against the index ARN, not the table ARN
+        Resource = concat(
+          var.dynamodb_table_arns,
+          [for arn in var.dynamodb_table_arns : "${arn}/index/*"]
+        )
       }
     ]
   })
@@ -43,7 +43,7 @@ variable "environment_variables" {
 }
 
 variable "dynamodb_table_arns" {
-  description = "List of DynamoDB table ARNs for IAM permissions"
+  description = "List of DynamoDB table ARNs for IAM permissions (their GSIs are included)"
   type        = list(string)
   default     = []
 }
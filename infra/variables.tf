@@ -59,6 +59,18 @@ variable "create_certificate" {
   default     = false
 }
 
+variable "cognito_user_pool_id" {
+  description = "Cognito User Pool ID whose tokens the auth service verifies"
+  type        = string
+  default     = ""
+}
+
+variable "cognito_app_client_id" {
+  description = "Cognito app client ID expected in token audience (empty to skip the check)"
+  type        = string
+  default     = ""
+}
+
 variable "tags" {
   description = "Tags to apply to all resources"
   type        = map(string)
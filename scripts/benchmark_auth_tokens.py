@@ -0,0 +1,266 @@
+"""
+Local benchmark for the auth service Lambda token verification.
+
+Generates an RSA key set locally (pure Python, no crypto packages), signs
+Cognito-shaped access tokens with it and serves the JWKS to
+infra/modules/lambda/code/auth/lambda_function.py through an injected fetcher,
+so verification can be measured and checked without a User Pool.
+
+Features:
+- Local RS256 key set and token signer (Miller-Rabin primes, CRT signing)
+- Scenarios: JWKS fetched per request (no caching), cached JWKS with a
+  signature check per request, and cached JWKS + verified-claims LRU
+- Key rotation: a token signed with a new kid triggers exactly one JWKS refresh
+- Correctness checks: tampered, expired, wrong-issuer, alg=none, unknown-kid,
+  non-string-kid and non-numeric-nbf tokens are rejected
+- JWKS outage: a failing endpoint keeps the cached keys in use and the
+  authorizer denies unknown kids instead of erroring
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import secrets
+import time
+
+from lambda_modules import load_lambda
+
+auth = load_lambda('auth')
+
+# Benchmark Configuration
+DEFAULT_KEY_BITS = 2048
+DEFAULT_REQUESTS = 5000
+DEFAULT_USERS = 200
+DEFAULT_FETCH_MS = 40.0
+TOKEN_LIFETIME_SECONDS = 3600
+PUBLIC_EXPONENT = 65537
+
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def int_b64url(value):
+    return b64url(value.to_bytes((value.bit_length() + 7) // 8, 'big'))
+
+
+def is_probable_prime(n, rounds=40):
+    """Miller-Rabin primality test."""
+    if n < 2:
+        return False
+    for p in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if n % p == 0:
+            return n == p
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for _ in range(rounds):
+        x = pow(secrets.randbelow(n - 3) + 2, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def random_prime(bits):
+    while True:
+        candidate = secrets.randbits(bits) | (1 << (bits - 1)) | (1 << (bits - 2)) | 1
+        if candidate % PUBLIC_EXPONENT != 1 and is_probable_prime(candidate):
+            return candidate
+
+
+class LocalSigningKey:
+    """RSA key pair that signs RS256 JWTs and publishes itself as a JWK."""
+
+    def __init__(self, kid, bits=DEFAULT_KEY_BITS):
+        self.kid = kid
+        while True:
+            p, q = random_prime(bits // 2), random_prime(bits // 2)
+            n = p * q
+            if p != q and n.bit_length() == bits:
+                break
+        self.n, self.e = n, PUBLIC_EXPONENT
+        d = pow(self.e, -1, (p - 1) * (q - 1))
+        self.p, self.q = p, q
+        self.dp, self.dq, self.q_inv = d % (p - 1), d % (q - 1), pow(q, -1, p)
+
+    def jwk(self):
+        return {'kty': 'RSA', 'alg': 'RS256', 'use': 'sig', 'kid': self.kid,
+                'n': int_b64url(self.n), 'e': int_b64url(self.e)}
+
+    def sign(self, message):
+        k = (self.n.bit_length() + 7) // 8
+        digest_info = auth.SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+        encoded = b'\x00\x01' + b'\xff' * (k - len(digest_info) - 3) + b'\x00' + digest_info
+        m = int.from_bytes(encoded, 'big')
+        # CRT exponentiation
+        m1, m2 = pow(m, self.dp, self.p), pow(m, self.dq, self.q)
+        s = m2 + self.q * ((self.q_inv * (m1 - m2)) % self.p)
+        return s.to_bytes(k, 'big')
+
+    def token(self, claims, header=None):
+        header = header or {'alg': 'RS256', 'kid': self.kid, 'typ': 'JWT'}
+        signing_input = (b64url(json.dumps(header, separators=(',', ':')).encode()) + '.'
+                         + b64url(json.dumps(claims, separators=(',', ':')).encode()))
+        return signing_input + '.' + b64url(self.sign(signing_input.encode('ascii')))
+
+
+def access_claims(username, now, lifetime=TOKEN_LIFETIME_SECONDS):
+    """Claims shaped like a Cognito access token for this pool and client."""
+    return {
+        'sub': hashlib.sha1(username.encode()).hexdigest(),
+        'cognito:groups': ['clerks'],
+        'iss': auth.ISSUER,
+        'client_id': auth.APP_CLIENT_ID or 'local-client',
+        'token_use': 'access',
+        'scope': 'aws.cognito.signin.user.admin',
+        'auth_time': int(now),
+        'iat': int(now),
+        'exp': int(now) + lifetime,
+        'jti': secrets.token_hex(8),
+        'username': username,
+    }
+
+
+class LocalJWKS:
+    """JWKS endpoint stand-in with optional fetch latency."""
+
+    def __init__(self, keys, fetch_ms=0.0):
+        self.keys = list(keys)
+        self.fetch_ms = fetch_ms
+        self.fetches = 0
+        self.down = False
+
+    def __call__(self, url):
+        self.fetches += 1
+        if self.down:
+            raise OSError('JWKS endpoint unreachable')
+        if self.fetch_ms:
+            time.sleep(self.fetch_ms / 1000.0)
+        return {'keys': [key.jwk() for key in self.keys]}
+
+
+def install(jwks, refresh_seconds=None, claims_cache_size=None):
+    """Point the Lambda's module-level caches at a local key set."""
+    auth.jwks_cache = auth.JWKSCache(url='local://jwks', refresh_seconds=refresh_seconds, fetcher=jwks)
+    auth.claims_cache = auth.ClaimsCache(claims_cache_size)
+
+
+def run_scenario(tokens, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        auth.verify_token(tokens[i % len(tokens)])
+    elapsed = time.perf_counter() - start
+    return {'per_second': requests / elapsed, 'mean_us': elapsed / requests * 1e6}
+
+
+def check_rejections(key, other_key, now):
+    """Every malformed or foreign token must raise AuthError."""
+    good = key.token(access_claims('alice', now))
+    header, payload, signature = good.split('.')
+    forged_claims = b64url(json.dumps({**access_claims('alice', now), 'cognito:groups': ['admins']}).encode())
+    cases = {
+        'tampered payload': f"{header}.{forged_claims}.{signature}",
+        'bad signature': f"{header}.{payload}.{b64url(bytes(len(auth.b64url_decode(signature))))}",
+        'expired': key.token(access_claims('alice', now - 2 * TOKEN_LIFETIME_SECONDS)),
+        'wrong issuer': key.token({**access_claims('alice', now), 'iss': 'https://evil.example.com'}),
+        'wrong token_use': key.token({**access_claims('alice', now), 'token_use': 'refresh'}),
+        'alg none': f"{b64url(json.dumps({'alg': 'none', 'kid': key.kid}).encode())}.{payload}.",
+        'unknown kid': other_key.token(access_claims('alice', now)),
+        'non-string kid': key.token(access_claims('alice', now), header={'alg': 'RS256', 'kid': [key.kid]}),
+        'non-numeric nbf': key.token({**access_claims('alice', now), 'nbf': 'soon'}),
+        'null nbf': key.token({**access_claims('alice', now), 'nbf': None}),
+        'malformed': 'not-a-jwt',
+    }
+    results = {}
+    for name, token in cases.items():
+        try:
+            auth.verify_token(token)
+            results[name] = None
+        except auth.AuthError as e:
+            results[name] = e.message
+    return auth.verify_token(good)['username'] == 'alice', results
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark auth Lambda JWT verification locally')
+    parser.add_argument('--key-bits', type=int, default=DEFAULT_KEY_BITS, help='RSA key size')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='Verifications per scenario')
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help='Distinct tokens in rotation')
+    parser.add_argument('--fetch-ms', type=float, default=DEFAULT_FETCH_MS,
+                        help='Simulated JWKS fetch latency (uncached scenario)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("="*60)
+    print("AUTH TOKEN VERIFICATION BENCHMARK (local key set)")
+    print("="*60)
+
+    start = time.perf_counter()
+    key = LocalSigningKey('local-key-1', args.key_bits)
+    rotated_key = LocalSigningKey('local-key-2', args.key_bits)
+    print(f"✓ Generated 2 x {args.key_bits}-bit RSA keys in {time.perf_counter() - start:.1f}s")
+
+    now = time.time()
+    tokens = [key.token(access_claims(f"clerk{i:04d}", now)) for i in range(args.users)]
+    print(f"✓ Signed {len(tokens)} access tokens (issuer {auth.ISSUER})\n")
+
+    # Correctness
+    install(LocalJWKS([key]))
+    accepted, rejections = check_rejections(key, rotated_key, now)
+    print(f"{'✓' if accepted else '✗'} Valid token accepted")
+    for name, reason in rejections.items():
+        print(f"{'✓' if reason else '✗'} {name:18s} -> {reason or 'ACCEPTED'}")
+
+    # Throughput
+    print(f"\n{'scenario':40s} {'verifs/s':>10s} {'mean us':>9s} {'JWKS fetches':>13s}")
+    uncached_requests = max(1, min(args.requests, int(2000 / max(args.fetch_ms, 1))))
+    scenarios = [
+        ('JWKS fetch + verify every request', dict(refresh_seconds=0, claims_cache_size=0),
+         args.fetch_ms, uncached_requests),
+        ('cached JWKS, signature every request', dict(claims_cache_size=0), args.fetch_ms, args.requests),
+        ('cached JWKS + verified-claims LRU', dict(), args.fetch_ms, args.requests),
+    ]
+    for name, cache_options, fetch_ms, requests in scenarios:
+        jwks = LocalJWKS([key], fetch_ms=fetch_ms)
+        install(jwks, **cache_options)
+        r = run_scenario(tokens, requests)
+        print(f"{name:40s} {r['per_second']:10,.0f} {r['mean_us']:9.1f} {jwks.fetches:13d}")
+
+    # Key rotation: the pool publishes a second key and starts signing with it
+    jwks = LocalJWKS([key], fetch_ms=args.fetch_ms)
+    install(jwks)
+    auth.jwks_cache.min_refetch_seconds = 0
+    run_scenario(tokens, len(tokens))
+    jwks.keys.append(rotated_key)
+    rotated_tokens = [rotated_key.token(access_claims(f"clerk{i:04d}", now)) for i in range(args.users)]
+    run_scenario(rotated_tokens + tokens, 2 * len(tokens))
+    print(f"\n{'✓' if jwks.fetches == 2 else '⚠'} Key rotation: {jwks.fetches} JWKS fetches "
+          f"(initial + one on the new kid)")
+    print(f"  Claims LRU: {auth.claims_cache.hits:,} hits, {auth.claims_cache.misses:,} misses, "
+          f"{len(auth.claims_cache.entries)} entries")
+
+    # JWKS outage: keys expire while the endpoint is down
+    jwks = LocalJWKS([key])
+    install(jwks, refresh_seconds=0, claims_cache_size=0)
+    auth.verify_token(tokens[0])
+    jwks.down = True
+    stale_ok = auth.verify_token(tokens[1])['username'] == 'clerk0001'
+    event = {'type': 'REQUEST', 'routeArn': 'local', 'headers': {'Authorization': f"Bearer {rotated_tokens[0]}"}}
+    denied = auth.handler(event, None) == {'isAuthorized': False}
+    print(f"{'✓' if stale_ok and denied else '✗'} JWKS outage: cached keys still verify, unknown kid denied "
+          f"({auth.jwks_cache.failures} failed fetch, retry in {auth.jwks_cache.min_refetch_seconds}s)")
+
+
+if __name__ == '__main__':
+    main()
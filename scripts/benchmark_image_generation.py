@@ -0,0 +1,189 @@
+"""
+Offline throughput benchmark for the image generation request path.
+
+Runs generate_images.generate_image_with_retry against fake_bedrock's
+FakeBedrockRuntime for a grid of client settings (worker concurrency,
+client request rate, initial backoff) and reports images/min, retries and
+tail latency for each, so the generator can be tuned without Bedrock calls.
+
+Features:
+- Scenario grid over concurrency x client rate x backoff
+- Simulated time: all latencies, backoffs and rates scale by --time-scale,
+  and results are reported in simulated (real-world) units
+- Per scenario: images/min, failures, API calls, throttles, retries, p50/p95/p99 latency
+- Optional JSON output for comparing runs
+"""
+
+import argparse
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+import generate_images
+from fake_bedrock import FakeBedrockRuntime, DEFAULT_LATENCY_MS, DEFAULT_LATENCY_SIGMA, DEFAULT_MAX_RPS, \
+    DEFAULT_MAX_CONCURRENT
+from generate_images import AdaptiveRateLimiter, ImageError, generate_image_with_retry
+
+# Benchmark Configuration
+DEFAULT_IMAGES = 60
+DEFAULT_TIME_SCALE = 0.05  # 1 simulated second = 50 ms real time
+
+
+def run_scenario(images, concurrency, client_rps, backoff, fake_options, time_scale=DEFAULT_TIME_SCALE,
+                 max_retries=None):
+    """
+    Generate `images` images through the fake backend with one client configuration.
+
+    Args:
+        images: Number of prompts to generate
+        concurrency: Worker threads / maximum in-flight requests
+        client_rps: Client token-bucket rate (simulated requests per second)
+        backoff: INITIAL_BACKOFF for throttling retries (simulated seconds)
+        fake_options: Keyword arguments for FakeBedrockRuntime
+        time_scale: Real seconds per simulated second
+        max_retries: Per-request retries (default: generate_images.MAX_RETRIES)
+
+    Returns:
+        dict: Scenario settings and measurements (simulated units)
+    """
+    fake = FakeBedrockRuntime(time_scale=time_scale, **fake_options)
+    limiter = AdaptiveRateLimiter(requests_per_second=client_rps / time_scale,
+                                  burst=generate_images.BURST_REQUESTS,
+                                  initial_concurrency=min(generate_images.INITIAL_CONCURRENCY, concurrency),
+                                  max_concurrency=concurrency)
+    saved = (generate_images.INITIAL_BACKOFF, generate_images.DECREASE_COOLDOWN_SECONDS)
+    generate_images.INITIAL_BACKOFF = backoff * time_scale
+    generate_images.DECREASE_COOLDOWN_SECONDS = saved[1] * time_scale
+
+    def one_image(i):
+        start = time.perf_counter()
+        try:
+            generate_image_with_retry(fake, f"Benchmark product {i}", max_retries=max_retries or
+                                      generate_images.MAX_RETRIES, rate_limiter=limiter)
+            return True, time.perf_counter() - start
+        except ImageError:
+            return False, time.perf_counter() - start
+
+    latencies = []
+    failed = 0
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in as_completed([executor.submit(one_image, i) for i in range(images)]):
+                ok, elapsed = future.result()
+                if ok:
+                    latencies.append(elapsed / time_scale)
+                else:
+                    failed += 1
+    finally:
+        generate_images.INITIAL_BACKOFF, generate_images.DECREASE_COOLDOWN_SECONDS = saved
+    wall = (time.perf_counter() - start) / time_scale
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (float('nan'),) * 3
+    return {
+        'concurrency': concurrency,
+        'client_rps': client_rps,
+        'backoff': backoff,
+        'images': images,
+        'succeeded': len(latencies),
+        'failed': failed,
+        'images_per_min': len(latencies) / wall * 60 if wall else 0.0,
+        'api_calls': fake.stats['calls'],
+        'throttled': fake.stats['throttled'],
+        'retries': fake.stats['calls'] - images,
+        'max_in_flight': fake.stats['max_in_flight'],
+        'final_limit': int(limiter.limit),
+        'p50_s': round(float(p50), 2),
+        'p95_s': round(float(p95), 2),
+        'p99_s': round(float(p99), 2),
+        'wall_s': round(wall, 1),
+    }
+
+
+def print_results(results):
+    """Print one row per scenario, best throughput marked."""
+    print(f"{'conc':>4s} {'rps':>5s} {'backoff':>7s} {'img/min':>8s} {'ok':>4s} {'fail':>4s} {'calls':>6s} "
+          f"{'thrott':>6s} {'retries':>7s} {'p50 s':>6s} {'p95 s':>6s} {'p99 s':>6s}")
+    best = max(results, key=lambda r: (r['failed'] == 0, round(r['images_per_min'], 1), -r['p95_s']))
+    for r in results:
+        marker = '  <- best' if r is best else ''
+        print(f"{r['concurrency']:4d} {r['client_rps']:5.1f} {r['backoff']:7.2f} {r['images_per_min']:8.1f} "
+              f"{r['succeeded']:4d} {r['failed']:4d} {r['api_calls']:6d} {r['throttled']:6d} {r['retries']:7d} "
+              f"{r['p50_s']:6.2f} {r['p95_s']:6.2f} {r['p99_s']:6.2f}{marker}")
+
+
+def parse_list(text, cast=float):
+    return [cast(value) for value in text.split(',') if value]
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark image generation settings against a fake Bedrock backend')
+    parser.add_argument('--images', type=int, default=DEFAULT_IMAGES, help='Images per scenario')
+    parser.add_argument('--concurrency', default='2,4,8', help='Comma-separated worker counts')
+    parser.add_argument('--client-rps', default=str(generate_images.MAX_REQUESTS_PER_SECOND),
+                        help='Comma-separated client request rates')
+    parser.add_argument('--backoff', default=str(generate_images.INITIAL_BACKOFF),
+                        help='Comma-separated initial backoff seconds')
+    parser.add_argument('--max-retries', type=int, default=generate_images.MAX_RETRIES)
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS, help='Fake median latency')
+    parser.add_argument('--latency-sigma', type=float, default=DEFAULT_LATENCY_SIGMA, help='Fake log-normal sigma')
+    parser.add_argument('--service-rps', type=float, default=DEFAULT_MAX_RPS, help='Fake service-side rate limit')
+    parser.add_argument('--service-concurrency', type=int, default=DEFAULT_MAX_CONCURRENT,
+                        help='Fake service-side concurrency cap')
+    parser.add_argument('--throttle-probability', type=float, default=0.0, help='Extra random throttling')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Injected service error rate')
+    parser.add_argument('--bad-response-rate', type=float, default=0.0, help='Injected error/empty body rate')
+    parser.add_argument('--time-scale', type=float, default=DEFAULT_TIME_SCALE,
+                        help='Real seconds per simulated second (1.0 for real time)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results as JSON')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    fake_options = {
+        'latency_ms': args.latency_ms,
+        'latency_sigma': args.latency_sigma,
+        'max_rps': args.service_rps,
+        'max_concurrent': args.service_concurrency,
+        'throttle_probability': args.throttle_probability,
+        'error_rate': args.error_rate,
+        'bad_response_rate': args.bad_response_rate,
+        'seed': args.seed,
+    }
+
+    print("="*60)
+    print("IMAGE GENERATION BENCHMARK (fake Bedrock)")
+    print("="*60)
+    print(f"Service: {args.latency_ms:.0f} ms median latency (sigma {args.latency_sigma}), "
+          f"{args.service_rps} req/s, {args.service_concurrency} concurrent, "
+          f"throttle p={args.throttle_probability}, errors p={args.error_rate}")
+    print(f"{args.images} images per scenario, time scale {args.time_scale}\n")
+
+    generate_images.logger.setLevel('ERROR')  # Per-retry warnings would drown the table
+    results = []
+    for concurrency, client_rps, backoff in itertools.product(parse_list(args.concurrency, int),
+                                                              parse_list(args.client_rps),
+                                                              parse_list(args.backoff)):
+        results.append(run_scenario(args.images, concurrency, client_rps, backoff, fake_options,
+                                    time_scale=args.time_scale, max_retries=args.max_retries))
+        r = results[-1]
+        print(f"✓ concurrency={concurrency} rps={client_rps} backoff={backoff}: "
+              f"{r['images_per_min']:.1f} images/min")
+
+    print()
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'service': fake_options, 'time_scale': args.time_scale, 'results': results}, f, indent=2)
+        print(f"\n✓ Results: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Local benchmark for the inventory service Lambda read paths.
+
+Invokes infra/modules/lambda/code/inventory/lambda_function.handler in-process
+against a DynamoDB stand-in loaded with the product catalog (optionally
+replicated to a larger size), and reports requests/sec and response bytes
+per request type, so pagination, sparse fields, gzip and conditional GET
+can be compared with fetching the whole catalog.
+
+Features:
+- In-process Products table stand-in: get_item, scan and category-index query
+  with Limit / ExclusiveStartKey / ProjectionExpression semantics
+- Optional per-call latency to model DynamoDB round trips
+- Per scenario: requests/sec, mean latency, response bytes on the wire
+- Catalog snapshot: cost of the initial load and of a delta refresh after
+  a batch of price changes, and lookups served from memory
+"""
+
+import argparse
+import bisect
+import time
+
+import numpy as np
+import pandas as pd
+from botocore.exceptions import ClientError
+
+from dynamodb_batch import to_dynamodb_item
+from lambda_modules import load_lambda
+from load_dynamodb import iter_products
+
+inventory = load_lambda('inventory')
+
+# Benchmark Configuration
+DEFAULT_PRODUCTS = 10000
+DEFAULT_REQUESTS = 2000
+SPARSE_FIELDS = 'sku,name,price,stock_quantity,image_url'
+STATIC_ONLY_FIELDS = 'sku,name,price,category,image_url'
+CHANGED_PRODUCTS = 50
+
+
+class LocalProductsTable:
+    """
+    In-process stand-in for the DynamoDB client calls the inventory Lambda makes.
+
+    Items are kept in sku order; scans and queries page through them like
+    DynamoDB does (Limit caps items read, LastEvaluatedKey marks the end of
+    the page).
+    """
+
+    def __init__(self, items, latency_ms=0.0):
+        self.items = sorted(items, key=lambda item: item['sku']['S'])
+        self.skus = [item['sku']['S'] for item in self.items]
+        self.by_sku = dict(zip(self.skus, self.items))
+        self.by_category = {}
+        for item in self.items:
+            self.by_category.setdefault(item.get('category', {}).get('S'), []).append(item)
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _wait(self):
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+    @staticmethod
+    def _project(item, request):
+        if 'ProjectionExpression' not in request:
+            return item
+        names = request.get('ExpressionAttributeNames', {})
+        fields = [names.get(name.strip(), name.strip()) for name in request['ProjectionExpression'].split(',')]
+        return {field: item[field] for field in fields if field in item}
+
+    def get_item(self, TableName, Key, ConsistentRead=False, **request):
+        self._wait()
+        item = self.by_sku.get(Key['sku']['S'])
+        return {'Item': self._project(item, request)} if item else {}
+
+    def batch_get_item(self, RequestItems):
+        self._wait()
+        (table_name, request), = RequestItems.items()
+        items = [self.by_sku[key['sku']['S']] for key in request['Keys'] if key['sku']['S'] in self.by_sku]
+        return {'Responses': {table_name: [self._project(item, request) for item in items]}, 'UnprocessedKeys': {}}
+
+    def put_item(self, TableName, Item, ConditionExpression=None, ExpressionAttributeValues=None):
+        """Store an item; supports the conditions bump_catalog_version uses."""
+        self._wait()
+        sku = Item['sku']['S']
+        current = self.by_sku.get(sku)
+        expected = (ExpressionAttributeValues or {}).get(':version')
+        if ConditionExpression and (current is not None if expected is None else current['version'] != expected):
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'PutItem')
+        if current is None:
+            position = bisect.bisect_left(self.skus, sku)
+            self.skus.insert(position, sku)
+            self.items.insert(position, Item)
+        else:
+            self.items[bisect.bisect_left(self.skus, sku)] = Item
+            category = current.get('category', {}).get('S')
+            if category in self.by_category:
+                self.by_category[category] = [Item if item is current else item for item in self.by_category[category]]
+        self.by_sku[sku] = Item
+
+    def _page(self, items, skus, request, key_fields):
+        start = 0
+        if 'ExclusiveStartKey' in request:
+            start = bisect.bisect_right(skus, request['ExclusiveStartKey']['sku']['S'])
+        page = items[start:start + request.get('Limit', len(items))]
+        response = {'Items': [self._project(item, request) for item in page], 'Count': len(page)}
+        if page and start + len(page) < len(items):
+            response['LastEvaluatedKey'] = {field: page[-1][field] for field in key_fields}
+        return response
+
+    def scan(self, TableName, **request):
+        self._wait()
+        return self._page(self.items, self.skus, request, ['sku'])
+
+    def query(self, TableName, IndexName, KeyConditionExpression, **request):
+        self._wait()
+        category = request['ExpressionAttributeValues'][':category']['S']
+        items = self.by_category.get(category, [])
+        return self._page(items, [item['sku']['S'] for item in items], request, ['sku', 'category'])
+
+
+def load_catalog(n_products):
+    """Catalog items in DynamoDB format, replicated with suffixed SKUs up to n_products."""
+    base = pd.DataFrame(list(iter_products()))
+    copies = -(-n_products // len(base))
+    frames = []
+    for copy in range(copies):
+        frame = base.copy()
+        if copy:
+            frame['sku'] = frame['sku'].astype(str) + f"-{copy}"
+        frames.append(frame)
+    catalog = pd.concat(frames, ignore_index=True).head(n_products)
+    return [to_dynamodb_item(record) for record in catalog.to_dict('records')], catalog
+
+
+def make_event(path, params=None, headers=None):
+    """API Gateway HTTP API (payload 2.0) GET event."""
+    return {
+        'rawPath': path,
+        'queryStringParameters': params or None,
+        'headers': headers or {},
+        'requestContext': {'http': {'method': 'GET', 'path': path}},
+    }
+
+
+def wire_bytes(response):
+    """Response body size as sent to the client (after base64 decoding)."""
+    body = response.get('body') or ''
+    return len(body) * 3 // 4 if response.get('isBase64Encoded') else len(body.encode('utf-8'))
+
+
+def run_scenario(events, requests):
+    """Invoke the handler for `requests` events (cycling) and time it."""
+    latencies = []
+    total_bytes = 0
+    statuses = {}
+    start = time.perf_counter()
+    for i in range(requests):
+        t = time.perf_counter()
+        response = inventory.handler(events[i % len(events)], None)
+        latencies.append(time.perf_counter() - t)
+        total_bytes += wire_bytes(response)
+        statuses[response['statusCode']] = statuses.get(response['statusCode'], 0) + 1
+    elapsed = time.perf_counter() - start
+    return {
+        'rps': requests / elapsed,
+        'mean_ms': float(np.mean(latencies)) * 1000,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1000,
+        'bytes': total_bytes / requests,
+        'statuses': statuses,
+    }
+
+
+def full_catalog_cost(page_size):
+    """Fetch every page without sparse fields or gzip: the cost of loading the whole catalog."""
+    start = time.perf_counter()
+    params = {'limit': str(page_size)}
+    total_bytes = pages = 0
+    while True:
+        response = inventory.handler(make_event('/inventory-crud/products', params), None)
+        total_bytes += wire_bytes(response)
+        pages += 1
+        cursor = inventory.json.loads(response['body'])['next_cursor']
+        if not cursor:
+            break
+        params = {'limit': str(page_size), 'cursor': cursor}
+    return {'pages': pages, 'bytes': total_bytes, 'seconds': time.perf_counter() - start}
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark the inventory Lambda read paths locally')
+    parser.add_argument('--products', type=int, default=DEFAULT_PRODUCTS, help='Catalog size')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='Requests per scenario')
+    parser.add_argument('--page-size', type=int, default=inventory.DEFAULT_PAGE_SIZE)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated DynamoDB latency per call')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("="*60)
+    print("INVENTORY API BENCHMARK (local DynamoDB stand-in)")
+    print("="*60)
+
+    items, catalog = load_catalog(args.products)
+    inventory.dynamodb = LocalProductsTable(items, latency_ms=args.latency_ms)
+    print(f"✓ {len(items):,} products, page size {args.page_size}, DynamoDB latency {args.latency_ms} ms\n")
+
+    rng = np.random.default_rng(0)
+    skus = catalog['sku'].astype(str).to_numpy()
+    sample = [skus[i] for i in rng.integers(0, len(skus), 200)]
+    category = str(catalog['category'].mode()[0])
+    gzip_headers = {'Accept-Encoding': 'gzip, br'}
+
+    first_page = make_event('/inventory-crud/products', {'limit': str(args.page_size)})
+    sparse_page = make_event('/inventory-crud/products', {'limit': str(args.page_size), 'fields': SPARSE_FIELDS},
+                             gzip_headers)
+    etag = inventory.handler(sparse_page, None)['headers']['ETag']
+    revalidate = make_event('/inventory-crud/products', {'limit': str(args.page_size), 'fields': SPARSE_FIELDS},
+                            {**gzip_headers, 'If-None-Match': etag})
+
+    scenarios = [
+        ('list page, all fields', [first_page]),
+        ('list page, all fields, gzip', [make_event('/inventory-crud/products', {'limit': str(args.page_size)},
+                                                    gzip_headers)]),
+        ('list page, sparse + gzip', [sparse_page]),
+        ('list page, 304 revalidate', [revalidate]),
+        ('category page, sparse', [make_event('/inventory-crud/products',
+                                              {'limit': str(args.page_size), 'fields': SPARSE_FIELDS,
+                                               'category': category}, gzip_headers)]),
+        ('get product', [make_event(f'/inventory-crud/products/{sku}', headers=gzip_headers) for sku in sample]),
+        ('get product, static fields', [make_event(f'/inventory-crud/products/{sku}', {'fields': STATIC_ONLY_FIELDS})
+                                        for sku in sample]),
+        ('get stock', [make_event(f'/inventory-crud/stock/{sku}') for sku in sample]),
+    ]
+
+    print(f"{'scenario':30s} {'req/s':>9s} {'mean ms':>8s} {'p99 ms':>7s} {'bytes/req':>10s}  statuses")
+    for name, events in scenarios:
+        r = run_scenario(events, args.requests)
+        statuses = ', '.join(f"{status}x{count}" for status, count in sorted(r['statuses'].items()))
+        print(f"{name:30s} {r['rps']:9.0f} {r['mean_ms']:8.3f} {r['p99_ms']:7.3f} {r['bytes']:10.0f}  {statuses}")
+
+    full = full_catalog_cost(inventory.MAX_PAGE_SIZE)
+    # Catalog snapshot refresh cost: change some prices, bump the version, force a check
+    snapshot = inventory.get_catalog()
+    full_load = snapshot.metrics()
+    print(f"\nCatalog snapshot: initial load of {full_load['products']:,} products took "
+          f"{full_load['last_refresh_ms']:.1f} ms in {full_load['read_calls']} DynamoDB calls")
+    changed = [str(sku) for sku in rng.choice(skus, CHANGED_PRODUCTS, replace=False)]
+    for sku in changed:
+        item = dict(inventory.dynamodb.by_sku[sku])
+        item['price'] = {'N': str(int(item['price']['N']) + 100)}
+        inventory.dynamodb.put_item(TableName=inventory.PRODUCTS_TABLE, Item=item)
+    inventory.bump_catalog_version(inventory.dynamodb, inventory.PRODUCTS_TABLE, changed)
+    calls_before = snapshot.stats['read_calls']
+    snapshot.checked_at = None  # Next lookup checks the version
+    snapshot.ensure_fresh()
+    delta = snapshot.metrics()
+    refreshed = all(snapshot.products[sku]['price'] == int(inventory.dynamodb.by_sku[sku]['price']['N'])
+                    for sku in changed)
+    print(f"{'✓' if refreshed else '✗'} Delta refresh of {CHANGED_PRODUCTS} changed products: "
+          f"{delta['last_refresh_ms']:.1f} ms in {delta['read_calls'] - calls_before} DynamoDB calls "
+          f"(version {delta['version']}, {delta['delta_refreshes']} delta / {delta['full_loads']} full)")
+
+    print(f"\nWhole catalog, all fields, no gzip: {full['pages']} pages, {full['bytes'] / 1024:,.1f} KB "
+          f"in {full['seconds']:.2f}s (what an unpaginated list endpoint would return on every call)")
+    print(f"DynamoDB calls: {inventory.dynamodb.calls:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+Build multi-size WebP/AVIF derivatives of the product images.
+
+The POS product grid shows ~140px thumbnails, but generate_images.py writes
+one 512x512 PNG per SKU. This script decodes each PNG once and writes every
+configured size in every available modern format, plus a manifest of
+variant URLs and byte sizes that convert_csv_to_json.py merges into
+products.json.
+
+Features:
+- One decode per image; sizes are produced by successive downscales
+- WebP and AVIF output (formats Pillow can't encode are skipped with a warning)
+- Parallel across SKUs on a process pool
+- Incremental: SKUs whose variants are newer than the source are skipped
+- Payload report: bytes per format/size versus the source PNGs
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image, features
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+# File Paths
+SOURCE_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'product_images')
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'web', 'public', 'images', 'variants')
+MANIFEST_FILE = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'image_variants.json')
+
+# URL the web app serves OUTPUT_DIR from
+URL_PREFIX = '/images/variants'
+
+# Derivative Configuration
+SIZES = (64, 128, 256, 512)
+FORMATS = ('avif', 'webp')
+# Pillow encoder options per format
+ENCODER_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'avif': {'quality': 50, 'speed': 6},
+}
+# Size the product grid displays (140px cards at 2x DPR) - used for the headline report
+GRID_SIZE = 256
+MAX_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def available_formats(formats=FORMATS):
+    """Return the requested formats this Pillow build can encode."""
+    supported = []
+    for fmt in formats:
+        if features.check(fmt):
+            supported.append(fmt)
+        else:
+            print(f"⚠ Pillow has no {fmt.upper()} encoder - skipping {fmt} variants")
+    return supported
+
+
+def variant_path(output_dir, sku, size, fmt):
+    """Path of one derivative on disk."""
+    return os.path.join(output_dir, sku, f"{size}.{fmt}")
+
+
+def variant_url(sku, size, fmt):
+    """URL of one derivative as served by the web app."""
+    return f"{URL_PREFIX}/{sku}/{size}.{fmt}"
+
+
+def is_up_to_date(source_path, output_dir, sku, sizes, formats):
+    """True if every variant of a SKU exists and is newer than its source."""
+    source_mtime = os.path.getmtime(source_path)
+    for size in sizes:
+        for fmt in formats:
+            path = variant_path(output_dir, sku, size, fmt)
+            if not os.path.exists(path) or os.path.getmtime(path) < source_mtime:
+                return False
+    return True
+
+
+def build_variants(source_path, sku, output_dir, sizes=SIZES, formats=FORMATS):
+    """
+    Decode one source image and write all of its derivatives.
+
+    Runs in a worker process. Sizes are produced largest first, each one
+    downscaled from the previous, so the 512px decode is resampled once
+    per size at ever smaller input.
+
+    Args:
+        source_path: Source PNG/JPEG
+        sku: Product SKU (output subdirectory)
+        output_dir: Derivatives root directory
+        sizes: Square sizes in pixels
+        formats: Pillow format names
+
+    Returns:
+        dict: {format: {size: bytes}}
+    """
+    image = Image.open(source_path)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.split()[-1])
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    os.makedirs(os.path.join(output_dir, sku), exist_ok=True)
+    written = {fmt: {} for fmt in formats}
+    current = image
+    for size in sorted(sizes, reverse=True):
+        if current.size != (size, size):
+            current = current.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            buffer = io.BytesIO()
+            current.save(buffer, format=fmt.upper(), **ENCODER_OPTIONS.get(fmt, {}))
+            path = variant_path(output_dir, sku, size, fmt)
+            with open(path, 'wb') as f:
+                f.write(buffer.getvalue())
+            written[fmt][size] = buffer.tell()
+    return written
+
+
+def load_manifest(path=None):
+    """Load the variants manifest (empty manifest if missing)."""
+    path = path or MANIFEST_FILE
+    if not os.path.exists(path):
+        return {'sizes': list(SIZES), 'formats': list(FORMATS), 'skus': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=None):
+    """Write the variants manifest atomically."""
+    path = path or MANIFEST_FILE
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def manifest_entry(sku, source_path, written):
+    """Manifest record for one SKU: source size plus URL and bytes of each variant."""
+    return {
+        'source_bytes': os.path.getsize(source_path),
+        'variants': {
+            fmt: {str(size): {'url': variant_url(sku, size, fmt), 'bytes': nbytes}
+                  for size, nbytes in sorted(by_size.items())}
+            for fmt, by_size in written.items()
+        }
+    }
+
+
+def build_all(source_dir=None, output_dir=None, manifest_file=None, sizes=SIZES, formats=FORMATS,
+              workers=MAX_WORKERS, force=False):
+    """
+    Build derivatives for every image in source_dir and update the manifest.
+
+    Args:
+        source_dir: Directory of {sku}.png / .jpg images
+        output_dir: Derivatives root directory
+        manifest_file: Manifest JSON path
+        sizes: Square sizes in pixels
+        formats: Requested formats (unsupported ones are dropped)
+        workers: Encoder processes
+        force: Rebuild SKUs even if their variants are up to date
+
+    Returns:
+        dict: The updated manifest
+    """
+    source_dir = source_dir or SOURCE_DIR
+    output_dir = output_dir or OUTPUT_DIR
+    formats = available_formats(formats)
+    if not formats:
+        raise RuntimeError("No requested image format can be encoded by this Pillow build")
+
+    sources = {}
+    for name in sorted(os.listdir(source_dir)):
+        sku, ext = os.path.splitext(name)
+        if ext.lower() in ('.png', '.jpg', '.jpeg'):
+            sources[sku] = os.path.join(source_dir, name)
+
+    manifest = load_manifest(manifest_file)
+    if manifest.get('sizes') != list(sizes) or manifest.get('formats') != list(formats):
+        force = True
+    manifest = {'sizes': list(sizes), 'formats': list(formats),
+                'skus': {} if force else manifest.get('skus', {})}
+
+    todo = []
+    for sku, path in sources.items():
+        if not force and sku in manifest['skus'] and is_up_to_date(path, output_dir, sku, sizes, formats):
+            continue
+        todo.append(sku)
+    print(f"Images: {len(sources)} found, {len(sources) - len(todo)} up to date, {len(todo)} to build")
+
+    start = time.time()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(build_variants, sources[sku], sku, output_dir, sizes, formats): sku
+                   for sku in todo}
+        for future in as_completed(futures):
+            sku = futures[future]
+            try:
+                manifest['skus'][sku] = manifest_entry(sku, sources[sku], future.result())
+            except Exception as e:
+                failed += 1
+                print(f"✗ {sku}: {e}")
+    if todo:
+        print(f"✓ Built {len(todo) - failed} SKUs in {time.time() - start:.2f}s ({workers} workers)")
+
+    # Drop SKUs whose source image is gone
+    for sku in set(manifest['skus']) - set(sources):
+        del manifest['skus'][sku]
+
+    save_manifest(manifest, manifest_file)
+    print(f"✓ Manifest: {manifest_file or MANIFEST_FILE}")
+    return manifest
+
+
+def print_payload_report(manifest):
+    """Print total bytes per format/size and the reduction versus the source images."""
+    skus = manifest['skus']
+    if not skus:
+        print("⚠ No images in manifest")
+        return
+    source_total = sum(entry['source_bytes'] for entry in skus.values())
+
+    print("\n" + "="*60)
+    print("IMAGE PAYLOAD REPORT")
+    print("="*60)
+    print(f"Source images: {len(skus)} files, {source_total / 1024:.1f} KB")
+    print(f"{'format':8s} {'size':>6s} {'total KB':>10s} {'avg KB':>8s} {'reduction':>10s}")
+    for fmt in manifest['formats']:
+        for size in manifest['sizes']:
+            total = sum(entry['variants'][fmt][str(size)]['bytes'] for entry in skus.values())
+            marker = '  <- grid' if size == GRID_SIZE else ''
+            print(f"{fmt:8s} {size:6d} {total / 1024:10.1f} {total / len(skus) / 1024:8.2f} "
+                  f"{1 - total / source_total:10.1%}{marker}")
+
+    if GRID_SIZE in manifest['sizes']:
+        best = min(sum(entry['variants'][fmt][str(GRID_SIZE)]['bytes'] for entry in skus.values())
+                   for fmt in manifest['formats'])
+        print(f"\nProduct grid payload: {source_total / 1024:.1f} KB -> {best / 1024:.1f} KB "
+              f"({1 - best / source_total:.1%} smaller)")
+    print("="*60)
+
+
+def main(force=False, workers=MAX_WORKERS):
+    """Main execution function."""
+    print("="*60)
+    print("BUILDING PRODUCT IMAGE DERIVATIVES")
+    print("="*60)
+
+    if not os.path.exists(SOURCE_DIR):
+        print(f"✗ Source directory not found: {SOURCE_DIR}")
+        print("  Run generate_images.py first")
+        return
+
+    manifest = build_all(workers=workers, force=force)
+    print_payload_report(manifest)
+
+    print("\nNext steps:")
+    print("1. Merge variant URLs into products.json: python convert_csv_to_json.py")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Build multi-size WebP/AVIF product image derivatives')
+    parser.add_argument('--force', action='store_true', help='Rebuild every SKU, even if up to date')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Encoder processes')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(force=args.force, workers=args.workers)
@@ -0,0 +1,427 @@
+"""
+Incremental build orchestrator for the data pipeline scripts.
+
+Models the data refresh (transform -> images -> derivatives/atlases -> web
+JSON) as a dependency graph. Every step declares its input and output
+files; a step is skipped when the content hash of its inputs (including
+its own script and command line) matches the last successful run and its
+outputs are unchanged since. Independent steps run in parallel.
+
+Features:
+- Content-hashed inputs and outputs (file hashes are cached by size/mtime,
+  so unchanged files are not re-read)
+- A step's inputs include the local modules its script imports (found by
+  parsing the imports, transitively), so editing a helper module re-runs it
+- Early cutoff: a step whose upstream re-ran but produced identical output
+  is still a cache hit
+- Parallel execution of independent steps as separate processes
+- Per-step report: cache hit / ran / failed, duration
+"""
+
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail')
+WEB_DIR = os.path.join(PROJECT_ROOT, 'web')
+
+STATE_FILE = os.path.join(DATA_DIR, 'build_state.json')
+LOG_DIR = os.path.join(DATA_DIR, 'build_logs')
+MAX_JOBS = 4
+
+# Step graph. Paths are relative to the project root; directories are hashed recursively
+# and glob patterns hash the files they match. 'script' and the scripts/ modules it
+# imports are hashed as inputs so code changes invalidate the step.
+STEPS = {
+    'transform': {
+        'script': 'scripts/transform_data.py',
+        'args': [],
+        'inputs': ['datasets/uci-retail/Online Retail.xlsx'],
+        'outputs': ['datasets/uci-retail/products_catalog.csv',
+                    'datasets/uci-retail/transactions_history.csv',
+                    'datasets/uci-retail/transactions_history.jsonl.gz',
+                    'datasets/uci-retail/transaction_items_parquet'],
+        'deps': [],
+    },
+    'images': {
+        'script': 'scripts/generate_images.py',
+        'args': ['--no-wait-retries'],
+        'inputs': ['datasets/uci-retail/products_catalog.csv'],
+        'outputs': ['datasets/uci-retail/product_images',
+                    'datasets/uci-retail/products_catalog_with_images.csv'],
+        'deps': ['transform'],
+    },
+    'derivatives': {
+        'script': 'scripts/build_image_derivatives.py',
+        'args': [],
+        'inputs': ['datasets/uci-retail/product_images'],
+        'outputs': ['web/public/images/variants', 'datasets/uci-retail/image_variants.json'],
+        'deps': ['images'],
+    },
+    'products_json': {
+        'script': 'scripts/convert_csv_to_json.py',
+        'args': ['--only', 'products'],
+        'inputs': ['datasets/uci-retail/products_catalog_with_images.csv',
+                   'datasets/uci-retail/image_variants.json'],
+        'outputs': ['web/src/data/products.json'],
+        'deps': ['images', 'derivatives'],
+    },
+    'transactions_json': {
+        'script': 'scripts/convert_csv_to_json.py',
+        'args': ['--only', 'transactions'],
+        'inputs': ['datasets/uci-retail/transactions_history.jsonl.gz',
+                   'datasets/uci-retail/transactions_history.csv'],
+        'outputs': ['web/public/data/transactions'],
+        'deps': ['transform'],
+    },
+    'copy_images': {
+        'script': 'scripts/convert_csv_to_json.py',
+        'args': ['--only', 'images'],
+        'inputs': ['datasets/uci-retail/product_images'],
+        # Only the synced top-level images: variants/ and atlases/ belong to other steps
+        'outputs': ['web/public/images/*.png', 'web/public/images/*.jpg', 'web/public/images/*.jpeg'],
+        'deps': ['images'],
+    },
+    'search_index': {
+        'script': 'scripts/product_search_index.py',
+        'args': [],
+        'inputs': ['datasets/uci-retail/products_catalog_with_images.csv',
+                   'datasets/uci-retail/sku_sales_stats.csv',
+                   'datasets/uci-retail/transactions_history.csv'],
+        'outputs': ['web/public/data/search_index.json'],
+        'deps': ['transform', 'images'],
+    },
+    'restock_forecast': {
+        'script': 'scripts/restock_forecast.py',
+        'args': [],
+        'inputs': ['datasets/uci-retail/products_catalog.csv',
+                   'datasets/uci-retail/transaction_items_parquet',
+                   'datasets/uci-retail/transactions_history.jsonl.gz',
+                   'datasets/uci-retail/transactions_history.csv'],
+        'outputs': ['datasets/uci-retail/restock_forecast.csv'],
+        'deps': ['transform'],
+    },
+    'atlases': {
+        'script': 'scripts/build_sprite_atlases.py',
+        'args': [],
+        'inputs': ['datasets/uci-retail/products_catalog_with_images.csv', 'datasets/uci-retail/product_images'],
+        'outputs': ['web/public/images/atlases', 'web/public/data/sprite_atlases.json'],
+        'deps': ['images', 'copy_images'],
+    },
+}
+
+# Inputs a step can run without (hashed as 'missing' when absent). The structured
+# transaction outputs are preferred by their readers, which fall back to the CSV.
+OPTIONAL_INPUTS = {
+    'datasets/uci-retail/transactions_history.jsonl.gz',
+    'datasets/uci-retail/image_variants.json',
+    'datasets/uci-retail/sku_sales_stats.csv',
+    'datasets/uci-retail/transaction_items_parquet',  # Written only when pyarrow is installed
+}
+
+
+class FileHasher:
+    """
+    SHA-256 of files and directory trees, memoised by (size, mtime_ns).
+
+    The memo is persisted with the build state, so a run only reads files
+    that changed since the last build.
+    """
+
+    def __init__(self, memo=None):
+        self.memo = memo or {}
+        self.bytes_read = 0
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        key = f"{stat.st_size}:{stat.st_mtime_ns}"
+        cached = self.memo.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.bytes_read += stat.st_size
+        self.memo[path] = [key, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path_hash(self, path):
+        """Hash a file, directory or glob pattern (relative names + file hashes); 'missing' if absent."""
+        if glob.has_magic(path):
+            digest = hashlib.sha256()
+            for file_path in sorted(glob.glob(path)):
+                if os.path.isfile(file_path):
+                    digest.update(os.path.basename(file_path).encode('utf-8'))
+                    digest.update(self.file_hash(file_path).encode('ascii'))
+            return digest.hexdigest()
+        if os.path.isfile(path):
+            return self.file_hash(path)
+        if not os.path.isdir(path):
+            return 'missing'
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.tmp'):
+                    continue
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+                digest.update(self.file_hash(file_path).encode('ascii'))
+        return digest.hexdigest()
+
+    def combined(self, parts):
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+
+def load_state(path=None):
+    path = path or STATE_FILE
+    if not os.path.exists(path):
+        return {'steps': {}, 'file_hashes': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_state(state, path=None):
+    path = path or STATE_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _abs(relative_path):
+    return os.path.join(PROJECT_ROOT, relative_path)
+
+
+def local_imports(script):
+    """
+    scripts/ modules a script imports, directly or through other local modules.
+
+    Args:
+        script: Script path relative to the project root
+
+    Returns:
+        list: Module paths relative to the project root, sorted
+    """
+    found = set()
+    pending = [script]
+    while pending:
+        with open(_abs(pending.pop()), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = f"scripts/{name.split('.')[0]}.py"
+                if module != script and module not in found and os.path.isfile(_abs(module)):
+                    found.add(module)
+                    pending.append(module)
+    return sorted(found)
+
+
+def input_hash(step, hasher):
+    """Hash of a step's script, the local modules it imports, its command line and declared inputs."""
+    parts = [step['script'], hasher.path_hash(_abs(step['script'])), json.dumps(step['args'])]
+    for module in local_imports(step['script']):
+        parts.extend([module, hasher.path_hash(_abs(module))])
+    for path in step['inputs']:
+        parts.extend([path, hasher.path_hash(_abs(path))])
+    return hasher.combined(parts)
+
+
+def output_hash(step, hasher):
+    parts = []
+    for path in step['outputs']:
+        parts.extend([path, hasher.path_hash(_abs(path))])
+    return hasher.combined(parts)
+
+
+def select_steps(targets, excluded):
+    """Targets plus their transitive dependencies, minus excluded steps."""
+    selected = set()
+    pending = list(targets or STEPS)
+    while pending:
+        name = pending.pop()
+        if name not in STEPS:
+            raise ValueError(f"Unknown step: {name} (steps: {', '.join(STEPS)})")
+        if name in selected:
+            continue
+        selected.add(name)
+        pending.extend(STEPS[name]['deps'])
+    return [name for name in STEPS if name in selected and name not in excluded]
+
+
+def run_step(name, step):
+    """Run one step as a subprocess, logging its output. Returns (returncode, seconds, log path)."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{name}.log")
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        result = subprocess.run([sys.executable, _abs(step['script']), *step['args']],
+                                cwd=SCRIPT_DIR, stdout=log, stderr=subprocess.STDOUT)
+    return result.returncode, time.perf_counter() - start, log_path
+
+
+def build(targets=None, excluded=(), jobs=MAX_JOBS, force=False, dry_run=False):
+    """
+    Bring the selected steps up to date.
+
+    Args:
+        targets: Step names to build (with their dependencies); all if None
+        excluded: Steps to treat as externally managed (their outputs are used as-is)
+        jobs: Steps run in parallel
+        force: Run every selected step regardless of hashes
+        dry_run: Only report which steps would run (a step whose dependency
+            would run is reported as running too)
+
+    Returns:
+        dict: {step: result dict}
+    """
+    state = load_state()
+    hasher = FileHasher(state.get('file_hashes'))
+    selected = select_steps(targets, set(excluded))
+    results = {}
+    done = set(STEPS) - set(selected)  # Steps outside the selection count as satisfied
+    failed = set()
+    running = {}
+    would_run = set()  # Dry run: steps that would run, so their dependents would too
+
+    def decide(name):
+        """Return ('hit'|'run'|'missing', input hash) for a step whose deps are done."""
+        step = STEPS[name]
+        missing = [path for path in step['inputs'] if not os.path.exists(_abs(path))
+                   and path not in OPTIONAL_INPUTS]
+        if missing:
+            return 'missing', None
+        current = input_hash(step, hasher)
+        previous = state['steps'].get(name)
+        if (not force and previous and previous['input_hash'] == current
+                and previous.get('output_hash') == output_hash(step, hasher)):
+            return 'hit', current
+        return 'run', current
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(done) + len(failed) < len(STEPS):
+            ready = [name for name in selected
+                     if name not in done and name not in failed and name not in running
+                     and name not in results
+                     and all(dep in done for dep in STEPS[name]['deps'])]
+            blocked = [name for name in selected if name not in results and name not in running
+                       and any(dep in failed for dep in STEPS[name]['deps'])]
+            for name in blocked:
+                results[name] = {'status': 'blocked', 'seconds': 0.0}
+                failed.add(name)
+            for name in ready:
+                if dry_run and any(dep in would_run for dep in STEPS[name]['deps']):
+                    # Its inputs would be rebuilt first, so current hashes say nothing
+                    results[name] = {'status': 'would run', 'seconds': 0.0}
+                    would_run.add(name)
+                    done.add(name)
+                    continue
+                decision, current = decide(name)
+                if decision == 'hit':
+                    results[name] = {'status': 'cache hit', 'seconds': 0.0}
+                    done.add(name)
+                elif decision == 'missing':
+                    # Source data isn't here; use whatever outputs exist
+                    results[name] = {'status': 'missing input', 'seconds': 0.0}
+                    done.add(name)
+                elif dry_run:
+                    results[name] = {'status': 'would run', 'seconds': 0.0}
+                    would_run.add(name)
+                    done.add(name)
+                else:
+                    print(f"  → {name}")
+                    running[executor.submit(run_step, name, STEPS[name])] = (name, current)
+            if not running:
+                if not ready and not blocked:
+                    break
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, current = running.pop(future)
+                returncode, seconds, log_path = future.result()
+                if returncode == 0:
+                    results[name] = {'status': 'ran', 'seconds': seconds}
+                    state['steps'][name] = {
+                        'input_hash': current,
+                        'output_hash': output_hash(STEPS[name], hasher),
+                        'finished_at': time.time(),
+                        'seconds': round(seconds, 2),
+                    }
+                    done.add(name)
+                    print(f"  ✓ {name} ({seconds:.1f}s)")
+                else:
+                    results[name] = {'status': 'failed', 'seconds': seconds, 'log': log_path}
+                    failed.add(name)
+                    print(f"  ✗ {name} failed (exit {returncode}) - see {log_path}")
+
+    if not dry_run:
+        state['file_hashes'] = {path: value for path, value in hasher.memo.items() if os.path.exists(path)}
+        save_state(state)
+    results['_hashed_mb'] = hasher.bytes_read / (1024 * 1024)
+    return results
+
+
+def print_report(results, total_seconds):
+    """Per-step status table and cache hit rate."""
+    hashed_mb = results.pop('_hashed_mb', 0.0)
+    print("\n" + "="*60)
+    print("BUILD REPORT")
+    print("="*60)
+    print(f"{'step':20s} {'status':14s} {'seconds':>8s}")
+    for name in STEPS:
+        if name in results:
+            print(f"{name:20s} {results[name]['status']:14s} {results[name]['seconds']:8.1f}")
+    hits = sum(1 for r in results.values() if r['status'] == 'cache hit')
+    print(f"\nCache hits: {hits}/{len(results)} steps; hashed {hashed_mb:.1f} MB of changed files; "
+          f"total {total_seconds:.1f}s")
+    print("="*60)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Incrementally rebuild the data pipeline')
+    parser.add_argument('targets', nargs='*', help=f"Steps to build (default: all): {', '.join(STEPS)}")
+    parser.add_argument('--exclude', action='append', default=[], metavar='STEP',
+                        help='Skip a step and use its existing outputs (repeatable), e.g. --exclude images')
+    parser.add_argument('--jobs', type=int, default=MAX_JOBS, help='Steps to run in parallel')
+    parser.add_argument('--force', action='store_true', help='Run every selected step')
+    parser.add_argument('--dry-run', action='store_true', help='Show which steps would run')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("="*60)
+    print("DATA PIPELINE BUILD")
+    print("="*60)
+    start = time.perf_counter()
+    results = build(args.targets, args.exclude, args.jobs, args.force, args.dry_run)
+    print_report(results, time.perf_counter() - start)
+    if any(r['status'] in ('failed', 'blocked') for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
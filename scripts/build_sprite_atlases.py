@@ -0,0 +1,273 @@
+"""
+Pack product thumbnails into per-category sprite atlases.
+
+The checkout grid otherwise issues one image request per product. This
+script groups products by category, packs their thumbnails into one or
+more atlas images per category and writes a JSON coordinate map keyed by
+SKU, so a category view needs one or two image requests.
+
+Features:
+- Category-grouped atlases, split into sheets of at most MAX_TILES_PER_ATLAS
+- JSON map: SKU -> atlas URL and tile rectangle
+- Content-hashed atlas filenames, so browsers can cache them indefinitely
+- Incremental: only sheets whose SKUs or source images changed are re-rendered
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+import pandas as pd
+from PIL import Image, features
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+# File Paths
+PRODUCTS_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'products_catalog_with_images.csv')
+# Images copied into the web app by convert_csv_to_json.copy_images, falling back to generate_images.py output
+SOURCE_DIRS = [
+    os.path.join(PROJECT_ROOT, 'web', 'public', 'images'),
+    os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'product_images'),
+]
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'web', 'public', 'images', 'atlases')
+# Fetched by web/src/services/spriteAtlases.ts; the product grid crops tiles with background-position
+ATLAS_MAP_JSON = os.path.join(PROJECT_ROOT, 'web', 'public', 'data', 'sprite_atlases.json')
+
+# URL the web app serves OUTPUT_DIR from
+URL_PREFIX = '/images/atlases'
+
+# Atlas Configuration
+TILE_SIZE = 128  # Grid cards are 140px high with padding
+ATLAS_COLUMNS = 8
+MAX_TILES_PER_ATLAS = 64  # 8x8 tiles = 1024x1024 px per sheet
+ATLAS_FORMAT = 'webp' if features.check('webp') else 'png'
+ATLAS_QUALITY = 80
+BACKGROUND = (255, 255, 255)
+
+
+def slugify(text):
+    """Category name to a filename-safe slug."""
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or 'uncategorized'
+
+
+def find_source_image(sku, source_dirs=None):
+    """Return the first existing image for a SKU across the source directories."""
+    for source_dir in source_dirs or SOURCE_DIRS:
+        for ext in ('.png', '.jpg', '.jpeg'):
+            path = os.path.join(source_dir, f"{sku}{ext}")
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def plan_sheets(products_df, source_dirs=None):
+    """
+    Group products with images by category and split each group into sheets.
+
+    SKUs are sorted within a category so sheet membership is stable between
+    runs; a change to one SKU only invalidates the sheet it lands on.
+
+    Returns:
+        list: Sheets as dicts {name, category, tiles: [(sku, source_path)]}
+    """
+    sheets = []
+    missing = 0
+    for category, group in sorted(products_df.groupby('category'), key=lambda item: str(item[0])):
+        tiles = []
+        for sku in sorted(group['sku'].astype(str)):
+            path = find_source_image(sku, source_dirs)
+            if path is None:
+                missing += 1
+                continue
+            tiles.append((sku, path))
+        for start in range(0, len(tiles), MAX_TILES_PER_ATLAS):
+            sheets.append({
+                'name': f"{slugify(category)}-{start // MAX_TILES_PER_ATLAS}",
+                'category': str(category),
+                'tiles': tiles[start:start + MAX_TILES_PER_ATLAS],
+            })
+    if missing:
+        print(f"⚠ {missing} products have no image and are left out of the atlases")
+    return sheets
+
+
+def sheet_fingerprint(sheet):
+    """Hash of a sheet's layout inputs: config, SKU order and each source's size/mtime."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([TILE_SIZE, ATLAS_COLUMNS, ATLAS_FORMAT, ATLAS_QUALITY]).encode('utf-8'))
+    for sku, path in sheet['tiles']:
+        stat = os.stat(path)
+        digest.update(f"{sku}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def tile_rects(tiles):
+    """Tile rectangles in row-major order: {sku: {x, y, w, h}}."""
+    return {
+        sku: {'x': (i % ATLAS_COLUMNS) * TILE_SIZE, 'y': (i // ATLAS_COLUMNS) * TILE_SIZE,
+              'w': TILE_SIZE, 'h': TILE_SIZE}
+        for i, (sku, _) in enumerate(tiles)
+    }
+
+
+def render_sheet(sheet, output_path):
+    """
+    Render one atlas image.
+
+    Args:
+        sheet: Sheet dict from plan_sheets
+        output_path: Destination file
+
+    Returns:
+        tuple: (width, height, bytes written)
+    """
+    columns = min(ATLAS_COLUMNS, len(sheet['tiles']))
+    rows = -(-len(sheet['tiles']) // ATLAS_COLUMNS)
+    atlas = Image.new('RGB', (columns * TILE_SIZE, rows * TILE_SIZE), BACKGROUND)
+    rects = tile_rects(sheet['tiles'])
+
+    for sku, path in sheet['tiles']:
+        with Image.open(path) as image:
+            image.draft('RGB', (TILE_SIZE, TILE_SIZE))  # JPEG sources decode at reduced scale
+            if image.mode in ('RGBA', 'LA', 'P'):
+                rgba = image.convert('RGBA')
+                image = Image.new('RGB', rgba.size, BACKGROUND)
+                image.paste(rgba, mask=rgba.split()[-1])
+            else:
+                image = image.convert('RGB')
+            image.thumbnail((TILE_SIZE, TILE_SIZE), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        rect = rects[sku]
+        # Center non-square images in their tile
+        atlas.paste(image, (rect['x'] + (TILE_SIZE - image.width) // 2,
+                            rect['y'] + (TILE_SIZE - image.height) // 2))
+
+    tmp_path = f"{output_path}.tmp"
+    atlas.save(tmp_path, format=ATLAS_FORMAT.upper(), quality=ATLAS_QUALITY, optimize=True)
+    os.replace(tmp_path, output_path)
+    return atlas.width, atlas.height, os.path.getsize(output_path)
+
+
+def load_atlas_map(path=None):
+    """Load the existing coordinate map (empty map if missing)."""
+    path = path or ATLAS_MAP_JSON
+    if not os.path.exists(path):
+        return {'tile_size': TILE_SIZE, 'atlases': {}, 'skus': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def build_atlases(products_csv=None, source_dirs=None, output_dir=None, map_file=None, force=False):
+    """
+    Build or refresh all atlases and the coordinate map.
+
+    Args:
+        products_csv: Catalog CSV with sku and category columns
+        source_dirs: Directories searched for {sku}.png images, in order
+        output_dir: Atlas output directory
+        map_file: Coordinate map JSON path
+        force: Re-render every sheet
+
+    Returns:
+        dict: The coordinate map
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    map_file = map_file or ATLAS_MAP_JSON
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(map_file), exist_ok=True)
+
+    products_df = pd.read_csv(products_csv or PRODUCTS_CSV, dtype={'sku': str})
+    sheets = plan_sheets(products_df, source_dirs)
+    previous = load_atlas_map(map_file)['atlases']
+
+    atlases = {}
+    sku_map = {}
+    rendered = 0
+    start = time.time()
+    for sheet in sheets:
+        fingerprint = sheet_fingerprint(sheet)
+        filename = f"{sheet['name']}.{fingerprint[:10]}.{ATLAS_FORMAT}"
+        output_path = os.path.join(output_dir, filename)
+        old = previous.get(sheet['name'])
+
+        if not force and old and old['hash'] == fingerprint and os.path.exists(output_path):
+            atlas = old
+        else:
+            width, height, nbytes = render_sheet(sheet, output_path)
+            rendered += 1
+            atlas = {
+                'url': f"{URL_PREFIX}/{filename}",
+                'category': sheet['category'],
+                'width': width,
+                'height': height,
+                'bytes': nbytes,
+                'hash': fingerprint,
+            }
+        atlases[sheet['name']] = atlas
+        for sku, rect in tile_rects(sheet['tiles']).items():
+            sku_map[sku] = {'atlas': sheet['name'], **rect}
+
+    # Remove atlas files no longer referenced
+    current_files = {os.path.basename(atlas['url']) for atlas in atlases.values()}
+    removed = 0
+    for name in os.listdir(output_dir):
+        if name.endswith(f".{ATLAS_FORMAT}") and name not in current_files:
+            os.remove(os.path.join(output_dir, name))
+            removed += 1
+
+    atlas_map = {'tile_size': TILE_SIZE, 'atlases': atlases, 'skus': sku_map}
+    tmp_file = map_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(atlas_map, f, indent=2)
+    os.replace(tmp_file, map_file)
+
+    print(f"✓ {len(atlases)} atlases for {len(sku_map)} products: "
+          f"{rendered} rendered, {len(atlases) - rendered} unchanged, {removed} stale removed "
+          f"({time.time() - start:.2f}s)")
+    return atlas_map
+
+
+def print_atlas_report(atlas_map):
+    """Print image requests and bytes per category, atlases versus individual images."""
+    print("\n" + "="*60)
+    print("SPRITE ATLAS REPORT")
+    print("="*60)
+    print(f"{'category':24s} {'products':>8s} {'atlases':>8s} {'atlas KB':>9s}")
+    by_category = {}
+    for name, atlas in atlas_map['atlases'].items():
+        entry = by_category.setdefault(atlas['category'], {'atlases': 0, 'bytes': 0, 'products': 0})
+        entry['atlases'] += 1
+        entry['bytes'] += atlas['bytes']
+    for sku_entry in atlas_map['skus'].values():
+        by_category[atlas_map['atlases'][sku_entry['atlas']]['category']]['products'] += 1
+    for category, entry in sorted(by_category.items()):
+        print(f"{category:24s} {entry['products']:8d} {entry['atlases']:8d} {entry['bytes'] / 1024:9.1f}")
+    total_products = sum(entry['products'] for entry in by_category.values())
+    print(f"\nImage requests for the full grid: {total_products} -> {len(atlas_map['atlases'])}")
+    print("="*60)
+
+
+def main(force=False):
+    """Main execution function."""
+    print("="*60)
+    print("BUILDING PRODUCT SPRITE ATLASES")
+    print("="*60)
+    atlas_map = build_atlases(force=force)
+    print_atlas_report(atlas_map)
+    print(f"\n✓ Coordinate map: {ATLAS_MAP_JSON}")
+    print(f"✓ Atlases: {OUTPUT_DIR}")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Pack product thumbnails into per-category sprite atlases')
+    parser.add_argument('--force', action='store_true', help='Re-render every atlas')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(force=args.force)
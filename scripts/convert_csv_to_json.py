@@ -1,131 +1,685 @@
 """
 Convert CSV files to JSON for local development
+
+Features:
+- Column-wise conversion (typed columns -> to_dict('records')), no per-row casting
+- Transactions are read from transactions_history.jsonl.gz (items already
+  structured); the CSV is only a fallback, and in compact mode its stored items
+  JSON is spliced in verbatim instead of being parsed and re-serialised
+- Streaming JSON array writer: CSVs are read in chunks and records written as they
+  are converted, so large histories never sit in memory as one list
+- Compact output by default (--pretty for indented JSON)
+- .json.gz and .json.br copies written in the same pass (Brotli if installed)
+- Transactions exported as day (or record-count) shards plus an index of date
+  ranges, counts and totals, so the web app loads only what a view shows
+- Incremental image sync: only new/changed images are hardlinked, reflinked or
+  copied (in parallel), and orphaned images are deleted
 """
 
 import pandas as pd
+import argparse
+import gzip
+import hashlib
 import json
 import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 
 # Input files
 PRODUCTS_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'products_catalog_with_images.csv')
-TRANSACTIONS_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'transactions_history.csv')
+TRANSACTIONS_JSONL = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'transactions_history.jsonl.gz')
+TRANSACTIONS_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'transactions_history.csv')  # Fallback
+IMAGE_VARIANTS_JSON = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'image_variants.json')
 
 # Output files
 WEB_DATA_DIR = os.path.join(PROJECT_ROOT, 'web', 'src', 'data')
 PRODUCTS_JSON = os.path.join(WEB_DATA_DIR, 'products.json')
-TRANSACTIONS_JSON = os.path.join(WEB_DATA_DIR, 'transactions.json')
+TRANSACTIONS_JSON = os.path.join(WEB_DATA_DIR, 'transactions.json')  # --monolithic only
+
+# Transaction shards are served as static files and fetched on demand
+TRANSACTION_SHARDS_DIR = os.path.join(PROJECT_ROOT, 'web', 'public', 'data', 'transactions')
+SHARD_INDEX_FILE = 'index.json'
+SHARD_URL_PREFIX = '/data/transactions'
+SHARD_BY = 'day'  # or 'count': pack consecutive days up to SHARD_MAX_RECORDS
+SHARD_MAX_RECORDS = 5000
+TOTAL_COLUMNS = ('subtotal', 'tax', 'discount_total', 'total')
+
+# URL prefix the web app serves web/public/images from
+IMAGE_URL_PREFIX = '/images/'
+
+# Image sync options
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+IMAGE_LINK_MODE = 'auto'  # hardlink, then reflink, then copy
+SYNC_WORKERS = 8
+FICLONE = 0x40049409  # Linux ioctl for copy-on-write clones
+
+# Output options
+COMPACT_JSON = True
+COMPRESSED_FORMATS = ('gz', 'br')
+CHUNK_ROWS = 50000  # CSV rows converted per chunk
+
+# Column types (CSV column -> JSON type) and defaults for optional columns
+PRODUCT_COLUMNS = {
+    'sku': str, 'name': str, 'description': str, 'category': str,
+    'price': int, 'cost': int, 'stock_quantity': int, 'reorder_threshold': int,
+    'unit': str, 'supplier_name': str, 'supplier_contact': str, 'image_url': str,
+    'created_at': str, 'updated_at': str, 'is_active': bool,
+}
+TRANSACTION_COLUMNS = {
+    'transaction_id': str, 'timestamp': str, 'user_id': str, 'cashier_name': str, 'items': 'json',
+    'subtotal': int, 'tax': int, 'discount_total': int, 'total': int,
+    'payment_method': str, 'status': str,
+}
+OPTIONAL_DEFAULTS = {
+    'description': '', 'supplier_name': '', 'supplier_contact': '', 'image_url': '',
+    'cashier_name': '', 'discount_total': 0, 'payment_method': 'mock', 'status': 'completed',
+}
+
+
+class RawJSON(str):
+    """A string that is already valid JSON; StreamingJSONArrayWriter writes it verbatim."""
+
 
-def convert_products():
+class StreamingJSONArrayWriter:
+    """
+    Write a JSON array one record at a time to .json and compressed copies.
+    
+    Output goes to temporary files that replace the targets on close(), so
+    readers never see a half-written bundle.
+    
+    Usage:
+        with StreamingJSONArrayWriter(PRODUCTS_JSON, compact=True) as writer:
+            writer.write_many(records)
+    """
+    
+    brotli_warned = False
+    
+    def __init__(self, path, compact=COMPACT_JSON, compressed_formats=COMPRESSED_FORMATS):
+        self.path = path
+        self.compact = compact
+        self.count = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.outputs = {path: open(path + '.tmp', 'wb')}
+        self.gzip = None
+        self.brotli = None
+        if 'gz' in compressed_formats:
+            self.gzip = gzip.GzipFile(path + '.gz.tmp', 'wb', compresslevel=9, mtime=0)
+        if 'br' in compressed_formats:
+            if brotli is None:
+                if not StreamingJSONArrayWriter.brotli_warned:  # Once per run, not per shard
+                    print("⚠ brotli not installed - skipping .br output (pip install brotli)")
+                    StreamingJSONArrayWriter.brotli_warned = True
+            else:
+                self.brotli = (open(path + '.br.tmp', 'wb'), brotli.Compressor(mode=brotli.MODE_TEXT))
+        self._write('[')
+    
+    def _write(self, text):
+        data = text.encode('utf-8')
+        self.outputs[self.path].write(data)
+        if self.gzip:
+            self.gzip.write(data)
+        if self.brotli:
+            self.brotli[0].write(self.brotli[1].process(data))
+    
+    def write(self, record):
+        """Append one record to the array."""
+        if self.compact:
+            raw = {key: value for key, value in record.items() if isinstance(value, RawJSON)}
+            if raw:
+                # Serialise placeholders, then swap in the raw JSON (keeps key order)
+                record = {**record, **{key: f"\0raw:{key}" for key in raw}}
+            text = json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+            for key, value in raw.items():
+                text = text.replace(f'"\\u0000raw:{key}"', value, 1)
+            self._write(text if self.count == 0 else ',' + text)
+        else:
+            # Same layout as json.dump(records, f, indent=2)
+            text = '\n  ' + json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            self._write(text if self.count == 0 else ',' + text)
+        self.count += 1
+    
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+    
+    def close(self):
+        """Finish the array and move all outputs into place."""
+        self._write(']' if self.compact or self.count == 0 else '\n]')
+        self.outputs[self.path].close()
+        targets = [self.path]
+        if self.gzip:
+            self.gzip.close()
+            targets.append(self.path + '.gz')
+        if self.brotli:
+            self.brotli[0].write(self.brotli[1].finish())
+            self.brotli[0].close()
+            targets.append(self.path + '.br')
+        for target in targets:
+            os.replace(target + '.tmp', target)
+        return {target: os.path.getsize(target) for target in targets}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.sizes = self.close()
+            return
+        # Leave existing outputs untouched on failure
+        self.outputs[self.path].close()
+        if self.gzip:
+            self.gzip.close()
+        if self.brotli:
+            self.brotli[0].close()
+        for suffix in ('.tmp', '.gz.tmp', '.br.tmp'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+
+def _parse_items(value):
+    """Parse an items JSON string (lists pass through); malformed or missing values become []."""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str):
+        return []
+    try:
+        return json.loads(value)
+    except ValueError:
+        return []
+
+
+def _raw_items(value):
+    """Pass an items JSON string through unparsed (lists pass through); missing or non-array values become []."""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('[') and value.endswith(']'):
+            return RawJSON(value)
+    return RawJSON('[]')
+
+
+def typed_records(df, columns, raw_json=False):
+    """
+    Convert a DataFrame chunk to JSON-ready records column by column.
+    
+    Missing optional columns get their defaults, NaNs are filled, and each
+    column is cast once rather than per row. With raw_json, JSON string
+    columns are passed through as RawJSON for the compact writer.
+    """
+    out = pd.DataFrame(index=df.index)
+    for column, kind in columns.items():
+        if column in df.columns or column not in OPTIONAL_DEFAULTS:
+            values = df[column]
+        else:
+            values = pd.Series(OPTIONAL_DEFAULTS[column], index=df.index)
+        if column in OPTIONAL_DEFAULTS:
+            values = values.fillna(OPTIONAL_DEFAULTS[column])
+        if kind == 'json':
+            convert = _raw_items if raw_json else _parse_items
+            out[column] = pd.Series([convert(v) for v in values], index=df.index, dtype=object)
+        elif kind is str:
+            out[column] = values.astype(str).astype(object)
+        elif kind is int:
+            out[column] = values.astype('int64')
+        else:
+            out[column] = values.astype(bool)
+    # Object dtype makes to_dict return Python ints/bools that json can serialise
+    return out.astype(object).to_dict('records')
+
+
+def print_sizes(sizes):
+    """Print the written files and their sizes."""
+    for path, size in sizes.items():
+        print(f"    {os.path.basename(path):24s} {size / 1024:10.1f} KB")
+
+
+def web_image_url(image_url):
+    """Map a CSV image path (product_images/{sku}.png) to the URL copy_images serves it from."""
+    if image_url and not image_url.startswith(('/', 'http://', 'https://')):
+        return IMAGE_URL_PREFIX + os.path.basename(image_url)
+    return image_url
+
+
+def load_image_variants():
+    """Load variant URLs from build_image_derivatives.py as {sku: {format: {size: url}}}"""
+    if not os.path.exists(IMAGE_VARIANTS_JSON):
+        return {}
+    with open(IMAGE_VARIANTS_JSON, 'r') as f:
+        manifest = json.load(f)
+    return {
+        sku: {fmt: {size: variant['url'] for size, variant in sizes.items()}
+              for fmt, sizes in entry['variants'].items()}
+        for sku, entry in manifest['skus'].items()
+    }
+
+def convert_products(compact=COMPACT_JSON, compressed_formats=COMPRESSED_FORMATS):
     """Convert products CSV to JSON"""
     print("Converting products CSV to JSON...")
-    df = pd.read_csv(PRODUCTS_CSV)
-    
-    # Convert to list of objects
-    products = []
-    for _, row in df.iterrows():
-        product = {
-            'sku': str(row['sku']),
-            'name': str(row['name']),
-            'description': str(row.get('description', '')),
-            'category': str(row['category']),
-            'price': int(row['price']),  # Already in cents
-            'cost': int(row['cost']),
-            'stock_quantity': int(row['stock_quantity']),
-            'reorder_threshold': int(row['reorder_threshold']),
-            'unit': str(row['unit']),
-            'supplier_name': str(row.get('supplier_name', '')),
-            'supplier_contact': str(row.get('supplier_contact', '')),
-            'image_url': str(row.get('image_url', '')),
-            'created_at': str(row['created_at']),
-            'updated_at': str(row['updated_at']),
-            'is_active': bool(row['is_active'])
-        }
-        products.append(product)
-    
-    # Save to JSON
-    os.makedirs(WEB_DATA_DIR, exist_ok=True)
-    with open(PRODUCTS_JSON, 'w') as f:
-        json.dump(products, f, indent=2)
-    
-    print(f"✓ Converted {len(products)} products to {PRODUCTS_JSON}")
-
-def convert_transactions():
-    """Convert transactions CSV to JSON"""
-    print("Converting transactions CSV to JSON...")
-    df = pd.read_csv(TRANSACTIONS_CSV)
-    
-    # Convert to list of objects
-    transactions = []
-    for _, row in df.iterrows():
-        # Parse items JSON string
-        import json as json_lib
-        items_str = row['items']
-        if isinstance(items_str, str):
-            try:
-                items = json_lib.loads(items_str)
-            except:
-                items = []
-        else:
-            items = []
+    image_variants = load_image_variants()
+    with_variants = 0
+    
+    with StreamingJSONArrayWriter(PRODUCTS_JSON, compact, compressed_formats) as writer:
+        for chunk in pd.read_csv(PRODUCTS_CSV, dtype={'sku': str}, chunksize=CHUNK_ROWS):
+            records = typed_records(chunk, PRODUCT_COLUMNS)
+            for product in records:
+                product['image_url'] = web_image_url(product['image_url'])
+            if image_variants:
+                for product in records:
+                    if product['sku'] in image_variants:
+                        product['image_variants'] = image_variants[product['sku']]
+                        with_variants += 1
+            writer.write_many(records)
+    
+    print(f"✓ Converted {writer.count} products to {PRODUCTS_JSON}")
+    if image_variants:
+        print(f"✓ Added image variants for {with_variants} products")
+    print_sizes(writer.sizes)
+
+def transactions_source():
+    """Transaction history to read: JSON Lines when present, else the CSV."""
+    return TRANSACTIONS_JSONL if os.path.exists(TRANSACTIONS_JSONL) else TRANSACTIONS_CSV
+
+def iter_transaction_chunks(path=None, chunksize=CHUNK_ROWS):
+    """
+    Stream the transaction history in DataFrame chunks.
+    
+    From JSON Lines, `items` holds parsed lists; from the CSV fallback it
+    holds the stored JSON strings (typed_records handles both).
+    """
+    path = path or transactions_source()
+    if not path.endswith(('.jsonl', '.jsonl.gz')):
+        yield from pd.read_csv(path, dtype={'transaction_id': str, 'user_id': str}, chunksize=chunksize)
+        return
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        records = []
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+            if len(records) == chunksize:
+                yield pd.DataFrame(records)
+                records = []
+        if records:
+            yield pd.DataFrame(records)
+
+def convert_transactions(compact=COMPACT_JSON, compressed_formats=COMPRESSED_FORMATS):
+    """Convert the transaction history to one monolithic JSON array (--monolithic)"""
+    source = transactions_source()
+    print(f"Converting {os.path.basename(source)} to JSON...")
+    
+    with StreamingJSONArrayWriter(TRANSACTIONS_JSON, compact, compressed_formats) as writer:
+        for chunk in iter_transaction_chunks(source):
+            writer.write_many(typed_records(chunk, TRANSACTION_COLUMNS, raw_json=compact))
+    
+    print(f"✓ Converted {writer.count} transactions to {TRANSACTIONS_JSON}")
+    print_sizes(writer.sizes)
+
+def _stage_by_day(staging_dir, source=None):
+    """
+    Split the transaction history into one staging JSON Lines file per UTC day.
+    
+    The history is not sorted by time, so records are appended to their
+    day's file chunk by chunk; only one chunk is ever in memory.
+    
+    Returns:
+        list: (day, row count) tuples sorted by day (YYYY-MM-DD)
+    """
+    days = {}
+    for chunk in iter_transaction_chunks(source):
+        day_keys = chunk['timestamp'].astype(str).str.slice(0, 10)
+        for day, group in chunk.groupby(day_keys, sort=False):
+            with open(os.path.join(staging_dir, f"{day}.jsonl"), 'a', encoding='utf-8') as f:
+                for record in group.to_dict('records'):
+                    f.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+                    f.write('\n')
+            days[day] = days.get(day, 0) + len(group)
+    return sorted(days.items())
+
+def _read_staged_day(path):
+    """Load one staging file written by _stage_by_day."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return pd.DataFrame([json.loads(line) for line in f])
+
+def _plan_shards(day_counts, shard_by, max_records):
+    """
+    Group consecutive days into shards.
+    
+    'day' gives one shard per day; 'count' packs consecutive days until a
+    shard would exceed max_records. Either way a single day larger than
+    max_records is split into parts.
+    
+    Returns:
+        list: Shards as lists of (day, part, part_count) tuples
+    """
+    shards = []
+    current, current_rows = [], 0
+    for day, rows in day_counts:
+        parts = max(1, -(-rows // max_records))
+        if parts > 1 or shard_by == 'day':
+            if current:
+                shards.append(current)
+                current, current_rows = [], 0
+            shards.extend([[(day, part, parts)] for part in range(parts)])
+            continue
+        if current and current_rows + rows > max_records:
+            shards.append(current)
+            current, current_rows = [], 0
+        current.append((day, 0, 1))
+        current_rows += rows
+    if current:
+        shards.append(current)
+    return shards
+
+def _shard_name(shard):
+    first_day, part, parts = shard[0]
+    last_day = shard[-1][0]
+    if parts > 1:
+        return f"{first_day}.p{part}"
+    return first_day if first_day == last_day else f"{first_day}_{last_day}"
+
+def _transaction_totals(df):
+    """Counts and money totals for a frame of transactions (cents)."""
+    units = sum(sum(item.get('quantity', 0) for item in _parse_items(value)) for value in df['items'])
+    totals = {'count': int(len(df)), 'units': int(units)}
+    for column in TOTAL_COLUMNS:
+        totals[column] = int(pd.to_numeric(df[column], errors='coerce').fillna(0).sum())
+    return totals
+
+def convert_transaction_shards(compact=COMPACT_JSON, compressed_formats=COMPRESSED_FORMATS, shard_by=SHARD_BY,
+                               max_records=SHARD_MAX_RECORDS, shard_dir=None):
+    """
+    Export transactions as date-range shards plus a small index.
+    
+    Each shard is a JSON array sorted by timestamp. The index lists every
+    shard's file, URL, time range, count and totals, and per-day totals,
+    so the web app can fetch only the shards a view needs and summary
+    widgets can render from the index alone.
+    
+    Args:
+        compact: Compact JSON instead of indented
+        compressed_formats: Extra compressed copies to write per shard
+        shard_by: 'day' (one shard per day) or 'count' (pack days up to max_records)
+        max_records: Upper bound on transactions per shard
+        shard_dir: Output directory (default TRANSACTION_SHARDS_DIR)
+    
+    Returns:
+        dict: The shard index
+    """
+    source = transactions_source()
+    print(f"Converting {os.path.basename(source)} to {shard_by} shards...")
+    shard_dir = shard_dir or TRANSACTION_SHARDS_DIR
+    os.makedirs(shard_dir, exist_ok=True)
+    start = time.perf_counter()
+    
+    with tempfile.TemporaryDirectory(prefix='txn-shards-', dir=shard_dir) as staging_dir:
+        day_counts = _stage_by_day(staging_dir, source)
+        frames = {}
+        
+        def day_frame(day):
+            # Shards are planned in day order, so only the current day is kept
+            if day not in frames:
+                frames.clear()
+                df = _read_staged_day(os.path.join(staging_dir, f"{day}.jsonl"))
+                frames[day] = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+            return frames[day]
         
-        transaction = {
-            'transaction_id': str(row['transaction_id']),
-            'timestamp': str(row['timestamp']),
-            'user_id': str(row['user_id']),
-            'cashier_name': str(row.get('cashier_name', '')),
-            'items': items,
-            'subtotal': int(row['subtotal']),
-            'tax': int(row['tax']),
-            'discount_total': int(row.get('discount_total', 0)),
-            'total': int(row['total']),
-            'payment_method': str(row.get('payment_method', 'mock')),
-            'status': str(row.get('status', 'completed'))
-        }
-        transactions.append(transaction)
-    
-    # Save to JSON
-    with open(TRANSACTIONS_JSON, 'w') as f:
-        json.dump(transactions, f, indent=2)
-    
-    print(f"✓ Converted {len(transactions)} transactions to {TRANSACTIONS_JSON}")
-
-def copy_images():
-    """Copy product images to web/public/images/"""
-    print("Copying product images...")
-    import shutil
+        shards = []
+        day_totals = {}
+        for shard in _plan_shards(day_counts, shard_by, max_records):
+            pieces = []
+            for day, part, parts in shard:
+                df = day_frame(day)
+                if parts > 1:
+                    size = -(-len(df) // parts)
+                    df = df.iloc[part * size:(part + 1) * size]
+                pieces.append(df)
+                if part == 0:
+                    day_totals[day] = _transaction_totals(day_frame(day))
+            df = pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else pieces[0]
+            
+            name = _shard_name(shard)
+            path = os.path.join(shard_dir, f"{name}.json")
+            with StreamingJSONArrayWriter(path, compact, compressed_formats) as writer:
+                writer.write_many(typed_records(df, TRANSACTION_COLUMNS, raw_json=compact))
+            shards.append({
+                'file': f"{name}.json",
+                'url': f"{SHARD_URL_PREFIX}/{name}.json",
+                'first_date': shard[0][0],
+                'last_date': shard[-1][0],
+                'start': str(df['timestamp'].iloc[0]),
+                'end': str(df['timestamp'].iloc[-1]),
+                **_transaction_totals(df),
+                'bytes': writer.sizes[path],
+            })
+    
+    totals = {key: sum(shard[key] for shard in shards) for key in ('count', 'units', *TOTAL_COLUMNS)}
+    index = {
+        'version': 1,
+        'shard_by': shard_by,
+        'max_records': max_records,
+        'first_date': day_counts[0][0] if day_counts else None,
+        'last_date': day_counts[-1][0] if day_counts else None,
+        'totals': totals,
+        'days': day_totals,
+        'shards': shards,
+    }
+    index_path = os.path.join(shard_dir, SHARD_INDEX_FILE)
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump(index, f, separators=(',', ':') if compact else None, indent=None if compact else 2)
+    os.replace(index_path + '.tmp', index_path)
+    
+    # Remove shards from a previous layout
+    current = {shard['file'] for shard in shards}
+    removed = 0
+    for name in os.listdir(shard_dir):
+        base = name
+        for suffix in ('.gz', '.br'):
+            base = base[:-len(suffix)] if base.endswith(suffix) else base
+        if base.endswith('.json') and base != SHARD_INDEX_FILE and base not in current:
+            os.remove(os.path.join(shard_dir, name))
+            removed += 1
+    
+    total_bytes = sum(shard['bytes'] for shard in shards)
+    print(f"✓ Wrote {totals['count']} transactions to {len(shards)} shards in {shard_dir} "
+          f"({total_bytes / 1024:.1f} KB, largest {max((s['bytes'] for s in shards), default=0) / 1024:.1f} KB, "
+          f"{time.perf_counter() - start:.2f}s)")
+    print(f"✓ Index: {index_path} ({os.path.getsize(index_path) / 1024:.1f} KB)"
+          + (f", {removed} stale files removed" if removed else ""))
+    return index
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _is_current(src, dst, compare):
+    """True if dst already matches src under the comparison mode."""
+    try:
+        src_stat, dst_stat = os.stat(src), os.stat(dst)
+    except FileNotFoundError:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return True  # Already hardlinked
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if compare == 'hash':
+        return _file_digest(src) == _file_digest(dst)
+    # copy2 and links preserve mtime, so equal size + mtime means unchanged
+    return int(src_stat.st_mtime) == int(dst_stat.st_mtime)
+
+def _reflink(src, dst):
+    """Copy-on-write clone (Btrfs, XFS); raises OSError where unsupported."""
+    if fcntl is None:
+        raise OSError("reflink not supported on this platform")
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+    shutil.copystat(src, dst)
+
+def _transfer(src, dst, link_mode):
+    """
+    Put src at dst via hardlink, reflink or copy (in that order for 'auto').
+    
+    Writes to a temporary name and renames, so the web server never serves a
+    partial file. Returns the method used.
+    """
+    tmp = f"{dst}.sync.tmp"
+    methods = {'auto': ('hardlink', 'reflink', 'copy'), 'hardlink': ('hardlink', 'copy'),
+               'reflink': ('reflink', 'copy'), 'copy': ('copy',)}[link_mode]
+    for method in methods:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        try:
+            if method == 'hardlink':
+                os.link(src, tmp)
+            elif method == 'reflink':
+                _reflink(src, tmp)
+            else:
+                shutil.copy2(src, tmp)
+            os.replace(tmp, dst)
+            return method
+        except OSError:
+            if method == 'copy':
+                raise
+    return None
+
+def sync_images(source_dir, target_dir, compare='mtime', link_mode=IMAGE_LINK_MODE, delete_orphans=True,
+                workers=SYNC_WORKERS):
+    """
+    Incrementally mirror the product images in source_dir into target_dir.
+    
+    Only new or changed files are transferred (hardlinked, reflinked or
+    copied, on a thread pool). Images in target_dir with no source are
+    deleted. Subdirectories of target_dir (variants/, atlases/) are left alone.
+    
+    Args:
+        source_dir: Generated images (datasets/uci-retail/product_images)
+        target_dir: Web app images (web/public/images)
+        compare: 'mtime' (size + mtime) or 'hash' (size + SHA-256)
+        link_mode: 'auto', 'hardlink', 'reflink' or 'copy'
+        delete_orphans: Remove target images that no longer exist in source
+        workers: Transfer threads
+    
+    Returns:
+        dict: Counts per action, bytes transferred and elapsed seconds
+    """
+    start = time.perf_counter()
+    os.makedirs(target_dir, exist_ok=True)
+    sources = {f for f in os.listdir(source_dir) if f.endswith(IMAGE_EXTENSIONS)}
+    targets = {f for f in os.listdir(target_dir)
+               if f.endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(target_dir, f))}
+    
+    summary = {'scanned': len(sources), 'unchanged': 0, 'hardlink': 0, 'reflink': 0, 'copy': 0,
+               'deleted': 0, 'bytes': 0}
+    changed = [f for f in sorted(sources)
+               if not _is_current(os.path.join(source_dir, f), os.path.join(target_dir, f), compare)]
+    summary['unchanged'] = len(sources) - len(changed)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_transfer, os.path.join(source_dir, f), os.path.join(target_dir, f),
+                                   link_mode): f for f in changed}
+        for future in as_completed(futures):
+            method = future.result()
+            summary[method] += 1
+            if method == 'copy':
+                summary['bytes'] += os.path.getsize(os.path.join(target_dir, futures[future]))
+    
+    if delete_orphans:
+        for name in sorted(targets - sources):
+            os.remove(os.path.join(target_dir, name))
+            summary['deleted'] += 1
+    
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+def copy_images(full_copy=False, compare='mtime', link_mode=IMAGE_LINK_MODE, delete_orphans=True):
+    """Sync product images to web/public/images/ (only changed files unless full_copy)"""
+    print("Syncing product images..." if not full_copy else "Copying product images...")
     
     source_dir = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'product_images')
     target_dir = os.path.join(PROJECT_ROOT, 'web', 'public', 'images')
     
     os.makedirs(target_dir, exist_ok=True)
     
-    if os.path.exists(source_dir):
-        image_files = [f for f in os.listdir(source_dir) if f.endswith(('.png', '.jpg', '.jpeg'))]
+    if not os.path.exists(source_dir):
+        print(f"⚠ Source directory not found: {source_dir}")
+        return
+    
+    if full_copy:
+        image_files = [f for f in os.listdir(source_dir) if f.endswith(IMAGE_EXTENSIONS)]
         for img_file in image_files:
-            src = os.path.join(source_dir, img_file)
-            dst = os.path.join(target_dir, img_file)
-            shutil.copy2(src, dst)
+            shutil.copy2(os.path.join(source_dir, img_file), os.path.join(target_dir, img_file))
         print(f"✓ Copied {len(image_files)} images to {target_dir}")
-    else:
-        print(f"⚠ Source directory not found: {source_dir}")
+        return
+    
+    summary = sync_images(source_dir, target_dir, compare, link_mode, delete_orphans)
+    transferred = summary['hardlink'] + summary['reflink'] + summary['copy']
+    print(f"✓ Synced {summary['scanned']} images to {target_dir} in {summary['seconds']:.2f}s")
+    print(f"    unchanged {summary['unchanged']}, transferred {transferred} "
+          f"(hardlinked {summary['hardlink']}, reflinked {summary['reflink']}, copied {summary['copy']}, "
+          f"{summary['bytes'] / 1024:.1f} KB), orphans deleted {summary['deleted']}")
 
-def main():
+def main(compact=COMPACT_JSON, compressed_formats=COMPRESSED_FORMATS, only=None, image_options=None,
+         shard_by=SHARD_BY, monolithic=False):
     print("="*60)
     print("CONVERTING CSV TO JSON FOR LOCAL DEVELOPMENT")
     print("="*60)
     
-    convert_products()
-    convert_transactions()
-    copy_images()
+    if only in (None, 'products'):
+        convert_products(compact, compressed_formats)
+    if only in (None, 'transactions'):
+        if monolithic:
+            convert_transactions(compact, compressed_formats)
+        else:
+            convert_transaction_shards(compact, compressed_formats, shard_by)
+    if only in (None, 'images'):
+        copy_images(**(image_options or {}))
     
     print("\n✓ Conversion complete!")
     print(f"  Products: {PRODUCTS_JSON}")
-    print(f"  Transactions: {TRANSACTIONS_JSON}")
+    print(f"  Transactions: {TRANSACTIONS_JSON if monolithic else TRANSACTION_SHARDS_DIR}")
     print(f"  Images: web/public/images/")
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Convert CSV files to JSON for local development')
+    parser.add_argument('--pretty', action='store_true', help='Indented JSON instead of compact')
+    parser.add_argument('--no-compress', action='store_true', help='Skip the .gz/.br copies')
+    parser.add_argument('--only', choices=['products', 'transactions', 'images'],
+                        help='Run a single part (used by build_pipeline.py)')
+    parser.add_argument('--shard-by', choices=['day', 'count'], default=SHARD_BY,
+                        help=f'Transaction shards per day or per {SHARD_MAX_RECORDS} records (default: {SHARD_BY})')
+    parser.add_argument('--monolithic', action='store_true',
+                        help='Write transactions as one web/src/data/transactions.json instead of shards')
+    parser.add_argument('--full-copy', action='store_true', help='Copy every image instead of syncing')
+    parser.add_argument('--compare', choices=['mtime', 'hash'], default='mtime',
+                        help='How to detect changed images (default: size + mtime)')
+    parser.add_argument('--link-mode', choices=['auto', 'hardlink', 'reflink', 'copy'], default=IMAGE_LINK_MODE,
+                        help='How to transfer changed images (default: auto)')
+    parser.add_argument('--keep-orphans', action='store_true', help="Don't delete images with no source")
+    return parser.parse_args()
+
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    main(compact=not args.pretty, compressed_formats=() if args.no_compress else COMPRESSED_FORMATS, only=args.only,
+         image_options={'full_copy': args.full_copy, 'compare': args.compare, 'link_mode': args.link_mode,
+                        'delete_orphans': not args.keep_orphans},
+         shard_by=args.shard_by, monolithic=args.monolithic)
 
@@ -0,0 +1,123 @@
+"""
+BatchWriteItem helpers shared by load_dynamodb.py and restock_events.py.
+
+Kept apart from the bulk loader so code on a request path (the clerk agent's
+restock events) can batch-write without importing the loader and pandas.
+
+Features:
+- BatchWriteItem in 25-item batches with UnprocessedItems retried under
+  jittered exponential backoff
+- Client-side WCU rate limiting (token bucket)
+- Plain record -> DynamoDB attribute-value serialisation (NaN dropped,
+  floats as Decimal, numpy scalars unwrapped)
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeSerializer
+
+# DynamoDB Configuration
+DYNAMODB_REGION = 'us-east-1'
+BATCH_SIZE = 25  # BatchWriteItem limit
+MAX_RETRIES = 8  # Maximum retries for unprocessed items
+INITIAL_BACKOFF = 0.05  # Initial backoff in seconds
+MAX_BACKOFF = 5.0
+
+_serializer = TypeSerializer()
+
+
+class LoadError(Exception):
+    """Raised when a batch cannot be written after all retries, or a checkpoint cannot be resumed."""
+    def __init__(self, message):
+        self.message = message
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to cap write capacity units per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available (no-op when rate is 0)."""
+        if not self.rate:
+            return
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def _clean_value(value):
+    """Convert pandas/JSON values into DynamoDB-serialisable Python values."""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return int(value) if value.is_integer() else Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: v for k, v in ((k, _clean_value(v)) for k, v in value.items()) if v is not None}
+    if isinstance(value, list):
+        return [_clean_value(v) for v in value]
+    if hasattr(value, 'item'):  # numpy scalar
+        return _clean_value(value.item())
+    return value
+
+
+def to_dynamodb_item(record):
+    """Serialise a plain record into DynamoDB attribute-value format, dropping nulls."""
+    cleaned = _clean_value(record)
+    return {key: _serializer.serialize(value) for key, value in cleaned.items()}
+
+
+def estimate_wcu(item):
+    """Estimate write capacity units for an item (1 WCU per started KB)."""
+    return max(1, math.ceil(len(json.dumps(item)) / 1024))
+
+
+def write_batch(client, table_name, items, limiter, stats):
+    """
+    Write up to 25 items with BatchWriteItem, retrying UnprocessedItems.
+
+    Args:
+        client: DynamoDB client (or LocalDynamoDBStandIn)
+        table_name: Target table
+        items: DynamoDB-formatted items
+        limiter: TokenBucket for client-side WCU limiting
+        stats: Shared stats dict (updated under its lock)
+
+    Raises:
+        LoadError: If items are still unprocessed after MAX_RETRIES
+    """
+    requests = [{'PutRequest': {'Item': item}} for item in items]
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(sum(estimate_wcu(r['PutRequest']['Item']) for r in requests))
+        response = client.batch_write_item(RequestItems={table_name: requests})
+        requests = response.get('UnprocessedItems', {}).get(table_name, [])
+        if not requests:
+            return
+
+        with stats['lock']:
+            stats['retries'] += 1
+            stats['unprocessed'] += len(requests)
+        # Full jitter backoff
+        backoff = min(MAX_BACKOFF, INITIAL_BACKOFF * (2 ** attempt))
+        time.sleep(random.uniform(0, backoff))
+
+    raise LoadError(f"{len(requests)} items still unprocessed for {table_name} after {MAX_RETRIES} retries")
@@ -0,0 +1,158 @@
+"""
+Local stand-in for the bedrock-runtime client's invoke_model.
+
+Lets the rate limiting and retry logic in generate_images.py be exercised
+and tuned without paying for Nova Canvas calls.
+
+Features:
+- Returns valid base64 PNGs in the Nova Canvas response shape; the image is
+  picked by a SHA-256 of the prompt, so it is the same in every process
+- Log-normal latency with configurable median and spread
+- Service-side throttling: a request-rate bucket and a concurrency cap,
+  plus an optional random throttle probability
+- Error injection: service errors (ClientError) and error/empty response bodies
+- Call statistics for benchmarks
+"""
+
+import base64
+import hashlib
+import io
+import json
+import math
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+from PIL import Image
+
+# Defaults loosely modelled on Nova Canvas on-demand quotas
+DEFAULT_LATENCY_MS = 1500.0
+DEFAULT_LATENCY_SIGMA = 0.35
+DEFAULT_MAX_RPS = 2.0
+DEFAULT_MAX_CONCURRENT = 4
+
+SERVICE_ERROR_CODES = ('ServiceUnavailableException', 'InternalServerException', 'ModelTimeoutException')
+
+
+def _client_error(code, message):
+    return ClientError({'Error': {'Code': code, 'Message': message}}, 'InvokeModel')
+
+
+class FakeBedrockRuntime:
+    """
+    In-process bedrock-runtime stand-in implementing invoke_model.
+
+    A request is throttled (ThrottlingException) if the service-side token
+    bucket is empty, if more than max_concurrent requests are in flight, or
+    at random with throttle_probability. Throttled requests return after a
+    short delay, like the real API.
+
+    Args:
+        latency_ms: Median generation latency
+        latency_sigma: Log-normal sigma (0 for fixed latency)
+        max_rps: Service-side sustained request rate (None for unlimited)
+        burst: Service-side token bucket size
+        max_concurrent: Service-side concurrency cap (None for unlimited)
+        throttle_probability: Extra random throttling rate
+        error_rate: Probability of a service error (ClientError)
+        bad_response_rate: Probability of an error or empty response body
+        image_size: Returned image size in pixels
+        time_scale: Multiplier on all simulated latencies (e.g. 0.1 for quick runs)
+        seed: Random seed
+    """
+
+    def __init__(self, latency_ms=DEFAULT_LATENCY_MS, latency_sigma=DEFAULT_LATENCY_SIGMA, max_rps=DEFAULT_MAX_RPS,
+                 burst=2, max_concurrent=DEFAULT_MAX_CONCURRENT, throttle_probability=0.0, error_rate=0.0,
+                 bad_response_rate=0.0, image_size=512, time_scale=1.0, seed=0):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.max_rps = max_rps
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.throttle_probability = throttle_probability
+        self.error_rate = error_rate
+        self.bad_response_rate = bad_response_rate
+        self.time_scale = time_scale
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.token_updated = time.monotonic()
+        self.in_flight = 0
+        self.stats = {'calls': 0, 'succeeded': 0, 'throttled': 0, 'errors': 0, 'bad_responses': 0,
+                      'max_in_flight': 0}
+        self.images = [self._render_image(image_size, i) for i in range(4)]
+
+    @staticmethod
+    def _render_image(size, variant):
+        """A small set of distinct base64 PNGs to return."""
+        image = Image.linear_gradient('L').resize((size, size)).convert('RGB')
+        image = Image.blend(image, Image.new('RGB', (size, size), ((variant * 70) % 255, 120, 200)), 0.5)
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    def _sleep(self, milliseconds):
+        time.sleep(milliseconds / 1000.0 * self.time_scale)
+
+    def _admit(self):
+        """Decide whether the service accepts a request (called with the lock held)."""
+        if self.max_rps:
+            now = time.monotonic()
+            # Bucket refills in simulated time
+            elapsed = (now - self.token_updated) / self.time_scale
+            self.tokens = min(self.burst, self.tokens + elapsed * self.max_rps)
+            self.token_updated = now
+            if self.tokens < 1:
+                return False
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            return False
+        if self.random.random() < self.throttle_probability:
+            return False
+        if self.max_rps:
+            self.tokens -= 1
+        return True
+
+    def invoke_model(self, body, modelId, accept='application/json', contentType='application/json'):
+        request = json.loads(body)
+        prompt = request.get('textToImageParams', {}).get('text', '')
+        if not prompt:
+            raise _client_error('ValidationException', 'Text prompt is required')
+
+        with self.lock:
+            self.stats['calls'] += 1
+            if not self._admit():
+                self.stats['throttled'] += 1
+                throttled = True
+            else:
+                throttled = False
+                self.in_flight += 1
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+            roll = self.random.random()
+            latency = self.latency_ms * math.exp(self.random.gauss(0, self.latency_sigma))
+
+        if throttled:
+            self._sleep(50)
+            raise _client_error('ThrottlingException', 'Too many requests, please wait before trying again.')
+
+        try:
+            self._sleep(latency)
+            if roll < self.error_rate:
+                with self.lock:
+                    self.stats['errors'] += 1
+                raise _client_error(self.random.choice(SERVICE_ERROR_CODES), 'Injected service error')
+            if roll < self.error_rate + self.bad_response_rate:
+                with self.lock:
+                    self.stats['bad_responses'] += 1
+                payload = {'error': 'Injected generation error'} if roll < self.error_rate + self.bad_response_rate / 2 \
+                    else {'images': []}
+            else:
+                with self.lock:
+                    self.stats['succeeded'] += 1
+                # sha256, not hash(): str hashes are salted per process (PYTHONHASHSEED)
+                digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+                payload = {'images': [self.images[int.from_bytes(digest[:8], 'big') % len(self.images)]]}
+            return {'body': io.BytesIO(json.dumps(payload).encode('utf-8')), 'contentType': 'application/json'}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
@@ -3,27 +3,38 @@ Image Generation Script for Agentic Retail OS
 Generates product images using AWS Bedrock Nova Canvas API.
 
 Features:
-- Sequential API calls with rate limiting
+- Concurrent API calls with a token-bucket rate limiter
+- Adaptive concurrency (AIMD) driven by ThrottlingException responses
 - Exponential backoff with jitter for throttling
-- Thumbnail generation (configurable dimensions)
+- Thumbnail post-processing in a process pool (single resample per image)
+- Selectable PNG encoding profiles (fast / balanced / small) and batch re-encode
 - Progress tracking and error handling
+- Content-addressed cache: only SKUs whose prompt/config changed hit the API
 - Resume capability (skip existing images)
+- Crash-safe SQLite job journal with scheduled retries for transient failures
 - CSV update with local file paths
 """
 
 import pandas as pd
 import boto3
+import argparse
 import json
 import base64
+import hashlib
 import io
 import os
 import time
 import random
 import logging
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import partial
 from PIL import Image
 from botocore.config import Config
 from botocore.exceptions import ClientError
+from image_job_journal import ImageJobJournal
 
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -34,21 +45,52 @@ BEDROCK_REGION = 'us-east-1'  # Change if needed
 MODEL_ID = 'amazon.nova-canvas-v1:0'
 
 # Rate Limiting Configuration
-BASE_DELAY_SECONDS = 2.5  # Delay between requests
+MAX_REQUESTS_PER_SECOND = 2.0  # Token bucket refill rate
+BURST_REQUESTS = 2  # Token bucket capacity
+INITIAL_CONCURRENCY = 2  # Starting number of in-flight requests
+MAX_CONCURRENCY = 8  # Upper bound for in-flight requests (and worker threads)
+DECREASE_FACTOR = 0.5  # Multiplicative decrease on throttling
+DECREASE_COOLDOWN_SECONDS = 2.0  # At most one decrease per window
 MAX_RETRIES = 5  # Maximum retries for throttling
 INITIAL_BACKOFF = 1.0  # Initial backoff in seconds
+# Client errors worth a scheduled retry (see image_job_journal for the schedule)
+TRANSIENT_ERROR_CODES = ('ServiceUnavailableException', 'InternalServerException',
+                         'ModelTimeoutException', 'ModelNotReadyException')
 
 # Image Configuration
 THUMBNAIL_WIDTH = 512
 THUMBNAIL_HEIGHT = 512
 OUTPUT_FORMAT = 'PNG'  # PNG for better quality and transparency support
 
+# PNG encoding profiles (size/speed tradeoff); see --compare-png-profiles
+PNG_PROFILES = {
+    'fast': {'compress_level': 1},  # ~10x faster than 'small', larger files
+    'balanced': {'compress_level': 6},  # zlib default
+    'small': {'optimize': True},  # slowest, smallest lossless output
+}
+PNG_PROFILE = 'small'
+PNG_QUANTIZE_COLORS = 0  # >0 quantises 'small' output to a palette of this many colors (lossy)
+
+# Nova Canvas generation parameters (part of the cache key)
+GENERATION_CONFIG = {
+    "numberOfImages": 1,
+    "height": THUMBNAIL_HEIGHT,
+    "width": THUMBNAIL_WIDTH,
+    "cfgScale": 8.0,
+    "seed": 0
+}
+
+# Post-processing Configuration
+POSTPROCESS_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Decode/resize/encode processes
+POSTPROCESS_QUEUE_SIZE = 16  # Downloaded images waiting for post-processing
+
 # File Paths
 INPUT_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'products_catalog.csv')
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'product_images')
 OUTPUT_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'products_catalog_with_images.csv')
 LOG_FILE = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'image_generation.log')
 FAILED_FILE = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'failed_images.txt')
+CACHE_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'image_cache')
 
 # Setup logging
 logging.basicConfig(
@@ -65,9 +107,184 @@ logger = logging.getLogger(__name__)
 class ImageError(Exception):
     """Custom exception for errors returned by Amazon Nova Canvas"""
     def __init__(self, message):
+        super().__init__(message)  # Keeps the error picklable across processes
         self.message = message
 
 
+class AdaptiveRateLimiter:
+    """
+    Token-bucket request rate limiter with AIMD concurrency control.
+    
+    Callers acquire() before each invoke_model call and release() after it.
+    Each successful call raises the concurrency limit additively (about +1
+    per limit's worth of successes); a throttled call halves it, at most once
+    per cooldown window so one burst of throttles counts as one signal.
+    """
+    
+    def __init__(self, requests_per_second=MAX_REQUESTS_PER_SECOND, burst=BURST_REQUESTS,
+                 initial_concurrency=INITIAL_CONCURRENCY, max_concurrency=MAX_CONCURRENCY):
+        self.rate = requests_per_second
+        self.capacity = burst
+        self.tokens = burst
+        self.token_updated = time.monotonic()
+        self.limit = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.throttle_count = 0
+        self.condition = threading.Condition()
+    
+    def _take_token(self):
+        """Block until a request token is available."""
+        while True:
+            with self.condition:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.token_updated) * self.rate)
+                self.token_updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+    
+    def acquire(self):
+        """Wait for a concurrency slot, then for a rate token."""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+        self._take_token()
+    
+    def release(self, throttled=False):
+        """Release a slot, adjusting concurrency from the call outcome."""
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttle_count += 1
+                now = time.monotonic()
+                if now - self.last_decrease >= DECREASE_COOLDOWN_SECONDS:
+                    self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+                    self.last_decrease = now
+                    logger.warning(f"Throttled - concurrency limit reduced to {int(self.limit)}")
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self.condition.notify_all()
+
+
+def is_throttling_error(err):
+    """Return True if a ClientError is a Bedrock throttling response."""
+    error_code = err.response.get("Error", {}).get("Code", "")
+    error_message = err.response.get("Error", {}).get("Message", "")
+    return error_code == "ThrottlingException" or "throttl" in error_message.lower()
+
+
+def is_transient_failure(error):
+    """
+    Return True if a failed SKU is worth a scheduled retry.
+    
+    Throttling that outlasted the in-request retries, service-side errors
+    and unexpected local errors are transient; validation errors (e.g. a
+    prompt blocked by content filters) and empty responses are not.
+    """
+    if not isinstance(error, ImageError):
+        return True
+    message = error.message
+    return (message.startswith(("Throttling error", "Unexpected error"))
+            or any(code in message for code in TRANSIENT_ERROR_CODES))
+
+
+class ImageCache:
+    """
+    Content-addressed store of raw generated images.
+    
+    Blobs are keyed by a hash of the prompt plus the generation config, so an
+    image is only paid for once per distinct request. The manifest records,
+    per SKU, which key and render settings produced the current output file,
+    so reruns can tell unchanged SKUs from ones whose prompt changed.
+    """
+    
+    def __init__(self, cache_dir=CACHE_DIR, png_profile=None, quantize_colors=None):
+        self.cache_dir = cache_dir
+        self.png_profile = png_profile or PNG_PROFILE
+        self.quantize_colors = PNG_QUANTIZE_COLORS if quantize_colors is None else quantize_colors
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.manifest_file = os.path.join(cache_dir, 'manifest.json')
+        self.lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.manifest = {'version': 1, 'skus': {}}
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r') as f:
+                self.manifest = json.load(f)
+    
+    @staticmethod
+    def key_for(prompt):
+        """Hash the prompt and generation config into a cache key."""
+        request = {'model': MODEL_ID, 'prompt': prompt, 'config': GENERATION_CONFIG}
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def render_signature(self):
+        """
+        Post-processing settings that shape the output pixels.
+        
+        PNG compression profiles are lossless and left out; palette
+        quantisation (lossy, 'small' profile only) is included.
+        """
+        signature = f"{THUMBNAIL_WIDTH}x{THUMBNAIL_HEIGHT}.{OUTPUT_FORMAT}"
+        if self.png_profile == 'small' and self.quantize_colors:
+            signature += f".q{self.quantize_colors}"
+        return signature
+    
+    def _blob_path(self, key):
+        return os.path.join(self.blob_dir, key[:2], f"{key}.bin")
+    
+    def get(self, key):
+        """Return cached raw image bytes for a key, or None."""
+        path = self._blob_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    def put(self, key, image_bytes):
+        """Store raw image bytes under a key (atomic, safe from worker threads)."""
+        path = self._blob_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(image_bytes)
+        os.replace(tmp_path, path)
+    
+    def entry(self, sku):
+        """Return the manifest entry for a SKU, or None."""
+        return self.manifest['skus'].get(str(sku))
+    
+    def is_current(self, sku, key):
+        """True if the SKU's output file was produced from this key and render settings."""
+        entry = self.entry(sku)
+        return bool(entry) and entry['key'] == key and entry.get('render') == self.render_signature()
+    
+    def record(self, sku, key, prompt, source):
+        """Record that the SKU's output now comes from `key` ('api', 'cache' or 'adopted')."""
+        with self.lock:
+            self.manifest['skus'][str(sku)] = {
+                'key': key,
+                'prompt': prompt,
+                'config': GENERATION_CONFIG,
+                'model': MODEL_ID,
+                'render': self.render_signature(),
+                'source': source,
+                'updated_at': datetime.now().isoformat(),
+            }
+    
+    def save(self):
+        """Persist the manifest atomically."""
+        with self.lock:
+            tmp_file = self.manifest_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_file, self.manifest_file)
+
+
 def create_output_directory():
     """Create output directory for images if it doesn't exist."""
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -111,7 +328,7 @@ def generate_prompt(product_name, description=None, category=None):
     return base_prompt
 
 
-def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES):
+def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES, rate_limiter=None):
     """
     Generate an image using Amazon Nova Canvas with exponential backoff retry logic.
     
@@ -119,6 +336,7 @@ def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES):
         bedrock_client: Boto3 Bedrock runtime client
         prompt: Text prompt for image generation
         max_retries: Maximum number of retry attempts
+        rate_limiter: Optional AdaptiveRateLimiter shared by concurrent workers
     
     Returns:
         bytes: Generated image bytes
@@ -131,13 +349,7 @@ def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES):
         "textToImageParams": {
             "text": prompt
         },
-        "imageGenerationConfig": {
-            "numberOfImages": 1,
-            "height": THUMBNAIL_HEIGHT,
-            "width": THUMBNAIL_WIDTH,
-            "cfgScale": 8.0,
-            "seed": 0
-        }
+        "imageGenerationConfig": GENERATION_CONFIG
     })
     
     accept = "application/json"
@@ -147,12 +359,22 @@ def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES):
         try:
             logger.debug(f"Attempt {attempt + 1}/{max_retries} - Generating image...")
             
-            response = bedrock_client.invoke_model(
-                body=body,
-                modelId=MODEL_ID,
-                accept=accept,
-                contentType=content_type
-            )
+            if rate_limiter:
+                rate_limiter.acquire()
+            throttled = False
+            try:
+                response = bedrock_client.invoke_model(
+                    body=body,
+                    modelId=MODEL_ID,
+                    accept=accept,
+                    contentType=content_type
+                )
+            except ClientError as err:
+                throttled = is_throttling_error(err)
+                raise
+            finally:
+                if rate_limiter:
+                    rate_limiter.release(throttled=throttled)
             
             response_body = json.loads(response.get("body").read())
             
@@ -178,11 +400,11 @@ def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES):
             error_message = err.response.get("Error", {}).get("Message", "")
             
             # Handle throttling with exponential backoff
-            if error_code == "ThrottlingException" or "throttl" in error_message.lower():
+            if is_throttling_error(err):
                 if attempt < max_retries - 1:
                     # Calculate exponential backoff with jitter
                     backoff_time = INITIAL_BACKOFF * (2 ** attempt)
-                    jitter = random.uniform(0, 1)
+                    jitter = random.uniform(0, INITIAL_BACKOFF)
                     wait_time = backoff_time + jitter
                     
                     logger.warning(
@@ -205,7 +427,7 @@ def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES):
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(f"Unexpected error (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                wait_time = INITIAL_BACKOFF * (2 ** attempt) + random.uniform(0, 1)
+                wait_time = INITIAL_BACKOFF * (2 ** attempt) + random.uniform(0, INITIAL_BACKOFF)
                 time.sleep(wait_time)
                 continue
             else:
@@ -214,7 +436,78 @@ def generate_image_with_retry(bedrock_client, prompt, max_retries=MAX_RETRIES):
     raise ImageError(f"Failed to generate image after {max_retries} attempts")
 
 
-def save_image(image_bytes, sku, output_dir):
+def render_thumbnail(image_bytes, width=THUMBNAIL_WIDTH, height=THUMBNAIL_HEIGHT):
+    """
+    Decode image bytes into a square RGB thumbnail on a white background.
+    
+    Transparency is flattened first so resampling runs on 3 channels rather
+    than 4. The content is then resized once, straight to its final scaled
+    size (no resample at all if it already fits exactly), and padded to a
+    square canvas afterwards.
+    
+    Returns:
+        PIL.Image.Image: RGB image of size (width, height)
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft('RGB', (width, height))  # Lets JPEG decode at reduced scale; no-op for PNG
+    
+    # Flatten transparency onto white
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    # Single resample: scale the longer side to fit, keeping aspect ratio
+    scale = min(width / image.size[0], height / image.size[1])
+    content_size = (max(1, round(image.size[0] * scale)), max(1, round(image.size[1] * scale)))
+    if image.size != content_size:
+        image = image.resize(content_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    
+    # Pad to a centred square with white background if needed
+    if image.size != (width, height):
+        canvas = Image.new('RGB', (width, height), (255, 255, 255))
+        canvas.paste(image, ((width - image.size[0]) // 2, (height - image.size[1]) // 2))
+        image = canvas
+    
+    return image
+
+
+def encode_png(image, profile=None, quantize_colors=None):
+    """
+    Encode an image as PNG with one of the PNG_PROFILES.
+    
+    Args:
+        image: PIL image
+        profile: 'fast', 'balanced' or 'small' (default: PNG_PROFILE)
+        quantize_colors: Palette size for the 'small' profile, 0 for lossless
+            (default: PNG_QUANTIZE_COLORS)
+    
+    Returns:
+        bytes: Encoded PNG
+    """
+    profile = profile or PNG_PROFILE
+    if profile not in PNG_PROFILES:
+        raise ValueError(f"Unknown PNG profile: {profile} (choose from {', '.join(PNG_PROFILES)})")
+    quantize_colors = PNG_QUANTIZE_COLORS if quantize_colors is None else quantize_colors
+    if profile == 'small' and quantize_colors:
+        image = image.convert('RGB').quantize(colors=quantize_colors, method=Image.Quantize.MEDIANCUT)
+    buffer = io.BytesIO()
+    image.save(buffer, OUTPUT_FORMAT, **PNG_PROFILES[profile])
+    return buffer.getvalue()
+
+
+def write_file_atomic(filepath, data):
+    """Write bytes via a temporary file so readers never see a partial image."""
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+
+
+def save_image(image_bytes, sku, output_dir, profile=None, quantize_colors=None):
     """
     Save image bytes to file as thumbnail.
     
@@ -222,126 +515,500 @@ def save_image(image_bytes, sku, output_dir):
         image_bytes: Image bytes from API
         sku: Product SKU for filename
         output_dir: Output directory path
+        profile: PNG encoding profile (default: PNG_PROFILE)
+        quantize_colors: Palette size for the 'small' profile (default: PNG_QUANTIZE_COLORS)
     
     Returns:
-        str: Path to saved image file
+        tuple: (path to saved image file, encode seconds, bytes written)
     """
     try:
-        # Open image from bytes
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Convert to RGBA for PNG (supports transparency)
-        if image.mode not in ('RGB', 'RGBA'):
-            image = image.convert('RGBA')
-        
-        # Resize to thumbnail size (in case API returns different size)
-        image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Image.Resampling.LANCZOS)
-        
-        # Create square image with white background if needed
-        if image.size[0] != image.size[1]:
-            # Create square canvas with white background
-            square_size = max(image.size)
-            square_image = Image.new('RGBA', (square_size, square_size), (255, 255, 255, 255))
-            # Center the image
-            offset = ((square_size - image.size[0]) // 2, (square_size - image.size[1]) // 2)
-            square_image.paste(image, offset, image if image.mode == 'RGBA' else None)
-            image = square_image
-        
-        # Resize to exact thumbnail dimensions
-        image = image.resize((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Image.Resampling.LANCZOS)
-        
-        # Convert to RGB for saving (PNG can be RGB or RGBA)
-        if image.mode == 'RGBA':
-            # Create white background and composite
-            rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-            rgb_image.paste(image, mask=image.split()[3] if len(image.split()) == 4 else None)
-            image = rgb_image
+        image = render_thumbnail(image_bytes)
         
         # Save as PNG
         filename = f"{sku}.png"
         filepath = os.path.join(output_dir, filename)
-        image.save(filepath, OUTPUT_FORMAT, optimize=True)
+        encode_start = time.perf_counter()
+        data = encode_png(image, profile, quantize_colors)
+        encode_seconds = time.perf_counter() - encode_start
+        write_file_atomic(filepath, data)
         
-        file_size = os.path.getsize(filepath)
-        logger.debug(f"Saved image: {filepath} ({file_size} bytes)")
+        logger.debug(f"Saved image: {filepath} ({len(data)} bytes, encoded in {encode_seconds * 1000:.1f} ms)")
         
-        return filepath
+        return filepath, encode_seconds, len(data)
         
     except Exception as e:
         raise ImageError(f"Error saving image: {str(e)}")
 
 
-def process_products(products_df, bedrock_client, resume=True):
+def process_image(image_bytes, sku, output_dir, profile=None, quantize_colors=None):
+    """
+    Post-process one image in a worker process.
+    
+    Returns:
+        tuple: (saved file path, CPU seconds spent in this process, encode seconds, bytes written)
+    """
+    cpu_start = time.process_time()
+    filepath, encode_seconds, nbytes = save_image(image_bytes, sku, output_dir, profile, quantize_colors)
+    return filepath, time.process_time() - cpu_start, encode_seconds, nbytes
+
+
+class ImagePostProcessor:
+    """
+    Pipeline stage that decodes, resizes and encodes images in a process pool.
+    
+    Downloader threads call submit(), which puts the image on a bounded queue
+    (blocking when it is full, so downloads cannot outrun post-processing) and
+    returns a Future for the saved path. A feeder thread moves queued images
+    into the process pool, keeping at most two tasks per worker in flight.
+    """
+    
+    def __init__(self, output_dir, workers=POSTPROCESS_WORKERS, queue_size=POSTPROCESS_QUEUE_SIZE,
+                 png_profile=None, quantize_colors=None):
+        self.output_dir = output_dir
+        # Resolved here so worker processes get the parent's settings
+        self.png_profile = png_profile or PNG_PROFILE
+        self.quantize_colors = PNG_QUANTIZE_COLORS if quantize_colors is None else quantize_colors
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.slots = threading.Semaphore(workers * 2)
+        self.lock = threading.Lock()
+        self.cpu_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.bytes_written = 0
+        self.processed = 0
+        self.feeder = threading.Thread(target=self._feed, daemon=True)
+        self.feeder.start()
+    
+    def submit(self, sku, image_bytes):
+        """Queue an image for post-processing; returns a Future for the saved path."""
+        result = Future()
+        self.queue.put((sku, image_bytes, result))
+        return result
+    
+    def _feed(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            sku, image_bytes, result = item
+            self.slots.acquire()
+            task = self.pool.submit(process_image, image_bytes, sku, self.output_dir,
+                                    self.png_profile, self.quantize_colors)
+            task.add_done_callback(partial(self._on_done, result))
+    
+    def _on_done(self, result, task):
+        self.slots.release()
+        try:
+            filepath, cpu_seconds, encode_seconds, nbytes = task.result()
+        except Exception as e:
+            result.set_exception(e if isinstance(e, ImageError) else ImageError(f"Error saving image: {e}"))
+            return
+        with self.lock:
+            self.cpu_seconds += cpu_seconds
+            self.encode_seconds += encode_seconds
+            self.bytes_written += nbytes
+            self.processed += 1
+        result.set_result(filepath)
+    
+    def close(self):
+        """Drain the queue and shut down the process pool."""
+        self.queue.put(None)
+        self.feeder.join()
+        self.pool.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def generate_product_image(bedrock_client, rate_limiter, postprocessor, cache, sku, prompt, key):
+    """Generate the image for one SKU, cache it and hand it to post-processing (runs on a worker thread)."""
+    image_bytes = generate_image_with_retry(bedrock_client, prompt, rate_limiter=rate_limiter)
+    cache.put(key, image_bytes)
+    return postprocessor.submit(sku, image_bytes)
+
+
+def process_products(products_df, bedrock_client, resume=True, max_workers=MAX_CONCURRENCY, rate_limiter=None,
+                     postprocess_workers=POSTPROCESS_WORKERS, cache=None, use_cache=True, journal=None,
+                     wait_for_retries=True, png_profile=None, quantize_colors=None):
     """
-    Process all products and generate images.
+    Process all products and generate images concurrently.
+    
+    Downloads run on a thread pool; decoding, resizing and PNG encoding run
+    in a separate process pool fed by a bounded queue. Each SKU's prompt is
+    hashed with the generation config: SKUs whose output already came from
+    that hash are skipped, and SKUs whose hash is in the cache are restored
+    locally, so only new or changed prompts call the API.
+    
+    Every state change is written to the job journal as it happens.
+    Transient failures are rescheduled with backoff and retried in later
+    rounds of the same run (or the next run if wait_for_retries is False);
+    SKUs the journal marks as permanently failed are skipped.
     
     Args:
         products_df: DataFrame with product data
         bedrock_client: Boto3 Bedrock runtime client
-        resume: If True, skip products that already have images
+        resume: If True, skip products whose image is current
+        max_workers: Download threads (upper bound on concurrency)
+        rate_limiter: AdaptiveRateLimiter (a default one is created if None)
+        postprocess_workers: Image post-processing processes
+        cache: ImageCache (a default one is created if None)
+        use_cache: If False, always call the API (results are still cached)
+        journal: ImageJobJournal with a started run (a default one is created if None)
+        wait_for_retries: Sleep until scheduled retries are due instead of leaving them for the next run
+        png_profile: PNG encoding profile (default: PNG_PROFILE)
+        quantize_colors: Palette size for the 'small' profile (default: PNG_QUANTIZE_COLORS)
     
     Returns:
         tuple: (successful_count, failed_count, failed_skus)
     """
     successful_count = 0
-    failed_count = 0
     failed_skus = []
+    restored_count = 0
+    scheduled_count = 0
+    rate_limiter = rate_limiter or AdaptiveRateLimiter(max_concurrency=max_workers)
+    cache = cache or ImageCache(png_profile=png_profile, quantize_colors=quantize_colors)
+    if journal is None:
+        journal = ImageJobJournal()
+        journal.start_run()
+    
+    # An all-empty image_url column is read as float; make it hold paths
+    products_df['image_url'] = products_df['image_url'].astype(object)
+    rows = {str(row['sku']): (index, row) for index, row in products_df.iterrows()}
     
     total_products = len(products_df)
     logger.info(f"Processing {total_products} products...")
     
-    for index, row in products_df.iterrows():
-        sku = row['sku']
-        product_name = row['name']
-        description = row.get('description', '')
-        category = row.get('category', '')
-        
-        # Check if image already exists (resume mode)
-        image_path = os.path.join(OUTPUT_DIR, f"{sku}.png")
-        if resume and os.path.exists(image_path):
-            logger.info(f"[{index + 1}/{total_products}] Skipping {sku} - image already exists")
-            continue
-        
-        logger.info(f"[{index + 1}/{total_products}] Generating image for {sku}: {product_name}")
-        
-        try:
-            # Generate prompt
-            prompt = generate_prompt(product_name, description, category)
-            logger.debug(f"Prompt: {prompt[:100]}...")
-            
-            # Generate image with retry logic
-            image_bytes = generate_image_with_retry(bedrock_client, prompt)
-            
-            # Save image
-            save_image(image_bytes, sku, OUTPUT_DIR)
-            
-            # Update CSV with local path
-            products_df.at[index, 'image_url'] = f"product_images/{sku}.png"
-            
-            successful_count += 1
-            logger.info(f"[SUCCESS] Successfully generated image for {sku}")
+    def record_failure(sku, error):
+        nonlocal scheduled_count
+        if isinstance(error, ImageError):
+            message = error.message
+        else:
+            message = f"Unexpected error: {error}"
+        next_attempt_at = journal.mark_failed(sku, message, transient=is_transient_failure(error))
+        if next_attempt_at is not None:
+            scheduled_count += 1
+            logger.warning(f"[RETRY] {sku}: {message} - retry scheduled in {next_attempt_at - time.time():.0f}s")
+        else:
+            failed_skus.append(sku)
+            logger.error(f"[FAILED] Failed to generate image for {sku}: {message}")
+    
+    try:
+        with ImagePostProcessor(OUTPUT_DIR, workers=postprocess_workers, png_profile=png_profile,
+                                quantize_colors=quantize_colors) as postprocessor, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
             
-            # Rate limiting: wait between requests
-            if index < total_products - 1:  # Don't wait after last product
-                delay = BASE_DELAY_SECONDS + random.uniform(0, 0.5)  # Add small jitter
-                logger.debug(f"Waiting {delay:.2f} seconds before next request...")
-                time.sleep(delay)
+            def run_round(skus):
+                """Submit one round of SKUs and wait for all of them to finish."""
+                nonlocal successful_count, restored_count
+                downloads = {}
+                saves = {}
+                for sku in skus:
+                    index, row = rows[sku]
+                    product_name = row['name']
+                    description = row.get('description', '')
+                    category = row.get('category', '')
+                    
+                    # Generate prompt and its content hash
+                    prompt = generate_prompt(product_name, description, category)
+                    key = cache.key_for(prompt)
+                    logger.debug(f"Prompt for {sku}: {prompt[:100]}...")
+                    
+                    # Check if the existing image is current (resume mode)
+                    image_path = os.path.join(OUTPUT_DIR, f"{sku}.png")
+                    image_url = f"product_images/{sku}.png"
+                    if resume and os.path.exists(image_path):
+                        if cache.entry(sku) is None:
+                            # Image predates the cache manifest: adopt it rather than pay to regenerate
+                            cache.record(sku, key, prompt, 'adopted')
+                        if cache.is_current(sku, key):
+                            products_df.at[index, 'image_url'] = image_url
+                            job = journal.get(sku)
+                            if job is None or job['state'] != 'succeeded':
+                                journal.mark_succeeded(sku, image_url, prompt_key=key)
+                            logger.info(f"[{index + 1}/{total_products}] Skipping {sku} - image is current")
+                            continue
+                        logger.info(f"[{index + 1}/{total_products}] Prompt or config changed for {sku}")
+                    
+                    journal.mark_running(sku, prompt_key=key)
+                    
+                    # Restore from the cache at zero API cost
+                    cached_bytes = cache.get(key) if use_cache else None
+                    if cached_bytes is not None:
+                        logger.info(f"[{index + 1}/{total_products}] Restoring {sku} from cache")
+                        saves[postprocessor.submit(sku, cached_bytes)] = (index, sku, product_name, prompt, key, 'cache')
+                        continue
+                    
+                    future = executor.submit(generate_product_image, bedrock_client, rate_limiter, postprocessor,
+                                             cache, sku, prompt, key)
+                    downloads[future] = (index, sku, product_name, prompt, key, 'api')
+                
+                # Stage 1: downloads complete and hand off to post-processing
+                for future in as_completed(downloads):
+                    try:
+                        saves[future.result()] = downloads[future]
+                    except Exception as e:
+                        record_failure(downloads[future][1], e)
+                
+                # Stage 2: post-processing results
+                for completed, future in enumerate(as_completed(saves), start=1):
+                    index, sku, product_name, prompt, key, source = saves[future]
+                    try:
+                        future.result()
+                        
+                        # Update CSV with local path
+                        image_url = f"product_images/{sku}.png"
+                        products_df.at[index, 'image_url'] = image_url
+                        cache.record(sku, key, prompt, source)
+                        journal.mark_succeeded(sku, image_url, prompt_key=key)
+                        
+                        successful_count += 1
+                        if source == 'cache':
+                            restored_count += 1
+                        logger.info(f"[SUCCESS] [{completed}/{len(saves)}] "
+                                    f"{'Restored' if source == 'cache' else 'Generated'} image for {sku}: {product_name} "
+                                    f"(concurrency limit {int(rate_limiter.limit)})")
+                    except Exception as e:
+                        record_failure(sku, e)
             
-        except ImageError as e:
-            failed_count += 1
-            failed_skus.append(sku)
-            logger.error(f"[FAILED] Failed to generate image for {sku}: {e.message}")
+            # First round: everything except jobs that failed permanently or are waiting on a retry
+            held = set(journal.skus_in_state('failed', 'retry'))
+            skipped = [sku for sku in rows if sku in held and journal.get(sku)['state'] == 'failed']
+            if skipped:
+                failed_skus.extend(skipped)
+                logger.info(f"Skipping {len(skipped)} permanently failed SKUs (use --retry-failed to requeue)")
+            run_round([sku for sku in rows if sku not in held])
             
-            # Continue with next product
-            continue
-        
-        except Exception as e:
-            failed_count += 1
-            failed_skus.append(sku)
-            logger.error(f"✗ Unexpected error for {sku}: {str(e)}")
-            continue
+            # Later rounds: scheduled retries as they come due
+            while True:
+                due = [sku for sku in journal.due_retries() if sku in rows]
+                if due:
+                    logger.info(f"Retrying {len(due)} scheduled SKUs")
+                    run_round(due)
+                    continue
+                waiting = [sku for sku in journal.skus_in_state('retry') if sku in rows]
+                if not waiting:
+                    break
+                if not wait_for_retries:
+                    failed_skus.extend(waiting)
+                    logger.info(f"{len(waiting)} SKUs have retries scheduled for the next run")
+                    break
+                next_at = min(journal.get(sku)['next_attempt_at'] for sku in waiting)
+                wait_time = max(0.0, next_at - time.time())
+                logger.info(f"Waiting {wait_time:.0f}s for {len(waiting)} scheduled retries...")
+                time.sleep(wait_time)
+    
+    finally:
+        # Keep the manifest for whatever finished, even on interrupt
+        cache.save()
+    
+    if restored_count:
+        logger.info(f"Restored from cache (no API call): {restored_count}")
+    if scheduled_count:
+        logger.info(f"Scheduled retries: {scheduled_count}")
+    if rate_limiter.throttle_count:
+        logger.info(f"Throttled responses: {rate_limiter.throttle_count}")
+    if postprocessor.processed:
+        logger.info(f"Post-processing: {postprocessor.processed} images, "
+                    f"{postprocessor.cpu_seconds / postprocessor.processed * 1000:.1f} ms CPU per image, "
+                    f"PNG '{postprocessor.png_profile}' encode "
+                    f"{postprocessor.encode_seconds / postprocessor.processed * 1000:.1f} ms and "
+                    f"{postprocessor.bytes_written / postprocessor.processed / 1024:.1f} KB per image")
     
-    return successful_count, failed_count, failed_skus
+    return successful_count, len(failed_skus), failed_skus
+
+
+def export_csv_from_journal(journal, input_csv=None, output_csv=None):
+    """
+    Regenerate the image CSV from the job journal.
+    
+    Args:
+        journal: ImageJobJournal
+        input_csv: Product catalog CSV (default: INPUT_CSV)
+        output_csv: Destination (default: OUTPUT_CSV)
+    
+    Returns:
+        int: Products with an image URL
+    """
+    products_df = pd.read_csv(input_csv or INPUT_CSV, dtype={'sku': str})
+    image_urls = journal.image_urls()
+    products_df['image_url'] = products_df['sku'].map(image_urls).astype(object)
+    tmp_csv = (output_csv or OUTPUT_CSV) + '.tmp'
+    products_df.to_csv(tmp_csv, index=False)
+    os.replace(tmp_csv, output_csv or OUTPUT_CSV)
+    return int(products_df['image_url'].notna().sum())
+
+
+def legacy_render_thumbnail(image_bytes):
+    """Original save_image transform chain, kept as the baseline for benchmark_postprocessing."""
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Image.Resampling.LANCZOS)
+    if image.size[0] != image.size[1]:
+        square_size = max(image.size)
+        square_image = Image.new('RGBA', (square_size, square_size), (255, 255, 255, 255))
+        offset = ((square_size - image.size[0]) // 2, (square_size - image.size[1]) // 2)
+        square_image.paste(image, offset, image if image.mode == 'RGBA' else None)
+        image = square_image
+    image = image.resize((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Image.Resampling.LANCZOS)
+    if image.mode == 'RGBA':
+        rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+        rgb_image.paste(image, mask=image.split()[3])
+        image = rgb_image
+    return image
+
+
+def _sample_image_bytes(size, mode='RGB', seed=0):
+    """Build a PNG with photo-like detail (smooth gradient plus noise) for benchmarks."""
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 40)
+    channels = [Image.blend(gradient, noise, rng.uniform(0.2, 0.6)) for _ in range(3)]
+    image = Image.merge('RGB', channels)
+    if mode == 'RGBA':
+        image.putalpha(Image.linear_gradient('L').rotate(90).resize(size))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def benchmark_postprocessing(count=10):
+    """Compare CPU per image of the legacy transform chain and the single-resample path."""
+    cases = [
+        ('512x512 RGB (API default)', (512, 512), 'RGB'),
+        ('1024x1024 RGB', (1024, 1024), 'RGB'),
+        ('1024x1024 RGBA', (1024, 1024), 'RGBA'),
+        ('1280x720 RGB', (1280, 720), 'RGB'),
+        ('1280x720 RGBA', (1280, 720), 'RGBA'),
+        ('300x200 RGB', (300, 200), 'RGB'),
+    ]
+    
+    def cpu_ms(render, samples):
+        start = time.process_time()
+        for image_bytes in samples:
+            render(image_bytes).load()
+        return (time.process_time() - start) / len(samples) * 1000
+    
+    print("="*60)
+    print("IMAGE POST-PROCESSING BENCHMARK (CPU ms per image)")
+    print("="*60)
+    print(f"  {'source':28s} {'legacy':>8s} {'new':>8s} {'saved':>8s}  (decode + transform)")
+    for label, size, mode in cases:
+        samples = [_sample_image_bytes(size, mode, seed) for seed in range(count)]
+        legacy_ms = cpu_ms(legacy_render_thumbnail, samples)
+        new_ms = cpu_ms(render_thumbnail, samples)
+        print(f"  {label:28s} {legacy_ms:8.1f} {new_ms:8.1f} {legacy_ms - new_ms:8.1f}  "
+              f"({(legacy_ms - new_ms) / legacy_ms:.0%})")
+    
+    thumbnail = render_thumbnail(_sample_image_bytes((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)))
+    start = time.process_time()
+    for _ in range(count):
+        encode_png(thumbnail)
+    encode_ms = (time.process_time() - start) / count * 1000
+    print(f"  PNG encode ('{PNG_PROFILE}' profile): {encode_ms:.1f} ms per image (see --compare-png-profiles)")
+    print("="*60)
+
+
+def _encode_profiles(quantize_colors):
+    """(label, profile, quantize_colors) for every profile, plus quantised 'small' if requested."""
+    profiles = [(name, name, 0) for name in PNG_PROFILES]
+    if quantize_colors:
+        profiles.append((f"small+q{quantize_colors}", 'small', quantize_colors))
+    return profiles
+
+
+def compare_png_profiles(count=10, source_dir=None, quantize_colors=256):
+    """
+    Report encode time and size per PNG profile on existing product images.
+    
+    Uses up to `count` images from source_dir (falls back to synthetic
+    samples if there are none). Nothing is written.
+    """
+    source_dir = source_dir or OUTPUT_DIR
+    names = sorted(f for f in os.listdir(source_dir) if f.endswith('.png'))[:count] \
+        if os.path.isdir(source_dir) else []
+    if names:
+        images = []
+        for name in names:
+            with Image.open(os.path.join(source_dir, name)) as image:
+                images.append(image.convert('RGB'))
+        source = f"{len(images)} images from {source_dir}"
+    else:
+        images = [render_thumbnail(_sample_image_bytes((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), seed=seed))
+                  for seed in range(count)]
+        source = f"{len(images)} synthetic samples"
+    
+    print("="*60)
+    print(f"PNG ENCODING PROFILES ({source})")
+    print("="*60)
+    print(f"  {'profile':14s} {'ms/image':>9s} {'KB/image':>9s} {'vs small':>9s}")
+    results = {}
+    for label, profile, colors in _encode_profiles(quantize_colors):
+        start = time.perf_counter()
+        total_bytes = sum(len(encode_png(image, profile, colors)) for image in images)
+        results[label] = ((time.perf_counter() - start) / len(images) * 1000, total_bytes / len(images) / 1024)
+    small_ms, small_kb = results['small']
+    for label, (ms, kb) in results.items():
+        print(f"  {label:14s} {ms:9.1f} {kb:9.1f} {small_ms / ms:7.1f}x / {kb / small_kb:4.0%}")
+    print("="*60)
+    return results
+
+
+def reencode_directory(directory=None, profile=None, quantize_colors=None, workers=POSTPROCESS_WORKERS):
+    """
+    Re-encode every PNG in a directory with the given profile, in place.
+    
+    Pixels are unchanged unless quantisation is enabled; files are replaced
+    atomically. Prints per-image encode time and bytes, plus totals.
+    
+    Returns:
+        tuple: (images re-encoded, bytes before, bytes after)
+    """
+    directory = directory or OUTPUT_DIR
+    profile = profile or PNG_PROFILE
+    quantize_colors = PNG_QUANTIZE_COLORS if quantize_colors is None else quantize_colors
+    paths = [os.path.join(directory, f) for f in sorted(os.listdir(directory)) if f.endswith('.png')]
+    
+    print("="*60)
+    print(f"RE-ENCODING {len(paths)} IMAGES: profile '{profile}'"
+          f"{f', {quantize_colors} colors' if profile == 'small' and quantize_colors else ''}")
+    print("="*60)
+    bytes_before = bytes_after = 0
+    encode_seconds = 0.0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tasks = [pool.submit(_reencode_file, path, profile, quantize_colors) for path in paths]
+        for path, task in zip(paths, tasks):
+            before, after, seconds = task.result()
+            bytes_before += before
+            bytes_after += after
+            encode_seconds += seconds
+            print(f"  {os.path.basename(path):16s} {before / 1024:8.1f} KB -> {after / 1024:8.1f} KB  "
+                  f"{seconds * 1000:7.1f} ms")
+    if paths:
+        print(f"✓ {len(paths)} images in {time.perf_counter() - start:.2f}s "
+              f"({encode_seconds / len(paths) * 1000:.1f} ms encode per image): "
+              f"{bytes_before / 1024:.1f} KB -> {bytes_after / 1024:.1f} KB "
+              f"({bytes_after / bytes_before - 1:+.1%})")
+    else:
+        print(f"⚠ No PNG files in {directory}")
+    print("="*60)
+    return len(paths), bytes_before, bytes_after
+
+
+def _reencode_file(path, profile, quantize_colors):
+    """Re-encode one PNG in place (runs in a worker process)."""
+    before = os.path.getsize(path)
+    with Image.open(path) as image:
+        image.load()
+    encode_start = time.perf_counter()
+    data = encode_png(image, profile, quantize_colors)
+    seconds = time.perf_counter() - encode_start
+    write_file_atomic(path, data)
+    return before, len(data), seconds
 
 
 def save_failed_skus(failed_skus):
@@ -353,7 +1020,7 @@ def save_failed_skus(failed_skus):
         logger.info(f"Saved {len(failed_skus)} failed SKUs to {FAILED_FILE}")
 
 
-def main():
+def main(use_cache=True, retry_failed=False, wait_for_retries=True, png_profile=None, quantize_colors=None):
     """Main execution function."""
     logger.info("="*60)
     logger.info("AGENTIC RETAIL OS - IMAGE GENERATION")
@@ -361,7 +1028,7 @@ def main():
     logger.info(f"Model: {MODEL_ID}")
     logger.info(f"Region: {BEDROCK_REGION}")
     logger.info(f"Thumbnail size: {THUMBNAIL_WIDTH}x{THUMBNAIL_HEIGHT}")
-    logger.info(f"Base delay: {BASE_DELAY_SECONDS} seconds")
+    logger.info(f"Rate limit: {MAX_REQUESTS_PER_SECOND} req/s, concurrency {INITIAL_CONCURRENCY}-{MAX_CONCURRENCY} (AIMD)")
     logger.info("")
     
     try:
@@ -381,18 +1048,27 @@ def main():
             config=Config(read_timeout=300)  # 5 minute timeout for image generation
         )
         
-        # Process products
+        # Process products (every state change is journaled as it happens)
         start_time = time.time()
-        successful_count, failed_count, failed_skus = process_products(
-            products_df, 
-            bedrock_client, 
-            resume=True
-        )
-        elapsed_time = time.time() - start_time
-        
-        # Save updated CSV
-        logger.info(f"\nSaving updated CSV to: {OUTPUT_CSV}")
-        products_df.to_csv(OUTPUT_CSV, index=False)
+        with ImageJobJournal() as journal:
+            journal.start_run({'use_cache': use_cache, 'retry_failed': retry_failed})
+            if retry_failed:
+                logger.info(f"Requeued {journal.reset_failed()} failed SKUs")
+            successful_count, failed_count, failed_skus = process_products(
+                products_df, 
+                bedrock_client, 
+                resume=True,
+                use_cache=use_cache,
+                journal=journal,
+                wait_for_retries=wait_for_retries,
+                png_profile=png_profile,
+                quantize_colors=quantize_colors
+            )
+            elapsed_time = time.time() - start_time
+            
+            # Save updated CSV
+            logger.info(f"\nSaving updated CSV to: {OUTPUT_CSV}")
+            export_csv_from_journal(journal)
         
         # Save failed SKUs
         if failed_skus:
@@ -412,12 +1088,13 @@ def main():
         logger.info(f"Updated CSV: {OUTPUT_CSV}")
         if failed_skus:
             logger.info(f"Failed SKUs: {FAILED_FILE}")
+        logger.info(f"Job journal: {journal.path} (inspect with --journal-status)")
         logger.info("")
         logger.info("Next steps:")
         logger.info("  1. Review generated images")
         logger.info("  2. Upload images to S3 bucket")
         logger.info("  3. Update CSV with S3 URLs (or use S3 paths directly)")
-        logger.info("  4. Import to DynamoDB via NoSQL Workbench")
+        logger.info("  4. Load into DynamoDB: python load_dynamodb.py")
         logger.info("="*60)
         
     except FileNotFoundError as e:
@@ -432,6 +1109,49 @@ def main():
         raise
 
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Generate product images with Amazon Nova Canvas')
+    parser.add_argument('--benchmark-postprocess', nargs='?', type=int, const=10, metavar='IMAGES',
+                        help='Compare CPU per image of the legacy and single-resample post-processing')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Call the API for every changed SKU even if its prompt is cached')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Requeue SKUs the job journal marked as permanently failed')
+    parser.add_argument('--no-wait-retries', action='store_true',
+                        help='Leave scheduled retries for the next run instead of sleeping until they are due')
+    parser.add_argument('--journal-status', action='store_true',
+                        help='Print job counts, recent runs and failures from the job journal and exit')
+    parser.add_argument('--export-csv', action='store_true',
+                        help='Regenerate the image CSV from the job journal and exit')
+    parser.add_argument('--png-profile', choices=list(PNG_PROFILES), default=PNG_PROFILE,
+                        help=f"PNG encoding profile (default: {PNG_PROFILE})")
+    parser.add_argument('--quantize', type=int, default=PNG_QUANTIZE_COLORS, metavar='COLORS',
+                        help="Quantise 'small' output to a palette of COLORS (lossy; 0 = off)")
+    parser.add_argument('--reencode', action='store_true',
+                        help='Re-encode existing product_images with --png-profile and exit')
+    parser.add_argument('--compare-png-profiles', nargs='?', type=int, const=10, metavar='IMAGES',
+                        help='Report encode time and size per PNG profile on existing images and exit')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    if args.benchmark_postprocess:
+        benchmark_postprocessing(args.benchmark_postprocess)
+    elif args.compare_png_profiles:
+        compare_png_profiles(args.compare_png_profiles, quantize_colors=args.quantize or 256)
+    elif args.reencode:
+        reencode_directory(profile=args.png_profile, quantize_colors=args.quantize)
+    elif args.journal_status:
+        with ImageJobJournal() as journal:
+            journal.print_summary()
+    elif args.export_csv:
+        with ImageJobJournal() as journal:
+            count = export_csv_from_journal(journal)
+        print(f"✓ Wrote {OUTPUT_CSV} ({count} products with images)")
+    else:
+        main(use_cache=not args.no_cache, retry_failed=args.retry_failed,
+             wait_for_retries=not args.no_wait_retries, png_profile=args.png_profile,
+             quantize_colors=args.quantize)
 
@@ -0,0 +1,374 @@
+"""
+Synthetic Retail Data Generator for Agentic Retail OS
+Generates large catalogs and transaction histories for load and soak testing.
+
+The generator is fitted to the statistics the transform pipeline already
+computes (per-SKU sales frequency, basket sizes, prices, time of day), so a
+100k-SKU / tens-of-millions-of-lines dataset has the same shape as the UCI data:
+- Hot-SKU skew: Zipf popularity fitted to sales_frequency
+- Basket sizes and line quantities sampled from the observed distributions
+- Log-normal prices fitted to average unit prices
+- Time-of-day and day-of-week patterns from InvoiceDate
+
+Output is streamed to disk in chunks from a seeded RNG, so runs are
+reproducible and memory stays bounded regardless of size.
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+import time
+
+from transform_data import (
+    CATEGORY_CLASSIFIER, CATEGORY_KEYWORDS, SUPPLIERS,
+    filter_clean_rows, compute_product_stats, parse_invoice_datetimes, load_raw_export,
+    calculate_stock_level, calculate_reorder_threshold,
+)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail')
+
+# Profile sources (used when no raw export is given)
+SKU_STATS_CSV = os.path.join(DATA_DIR, 'sku_sales_stats.csv')
+PRODUCTS_CSV = os.path.join(DATA_DIR, 'products_catalog.csv')
+TRANSACTIONS_CSV = os.path.join(DATA_DIR, 'transactions_history.csv')
+
+# Output
+OUTPUT_DIR = os.path.join(DATA_DIR, 'synthetic')
+PROFILE_FILE = os.path.join(OUTPUT_DIR, 'synthetic_profile.json')
+
+# Generation defaults
+DEFAULT_SKUS = 100000
+DEFAULT_TRANSACTIONS = 1000000
+DEFAULT_CHUNK_SIZE = 200000  # Transactions per chunk
+DEFAULT_SEED = 42
+DEFAULT_START_DATE = '2011-01-01'
+DEFAULT_DAYS = 365
+MAX_BASKET_SIZE = 100
+MAX_LINE_QUANTITY = 200
+
+# Vocabulary for synthetic product names (nouns double as category keywords)
+ADJECTIVES = [
+    'Vintage', 'Retro', 'Red', 'Blue', 'Pink', 'White', 'Large', 'Small', 'Mini', 'Jumbo',
+    'Floral', 'Spotty', 'Striped', 'Heart', 'Star', 'Wooden', 'Glass', 'Ceramic', 'Paper', 'Set Of 3',
+]
+GENERIC_NOUNS = ['cakestand', 'clock', 'frame', 'basket', 'box', 'tin', 'sign', 'cushion', 'planter', 'bunting']
+
+
+def _pmf(values, max_value):
+    """Return a normalised probability mass function over 0..max_value."""
+    counts = np.bincount(np.clip(np.asarray(values, dtype=int), 0, max_value), minlength=max_value + 1)
+    counts = counts.astype(float)
+    counts[0] = 0
+    return (counts / counts.sum()).tolist()
+
+
+def fit_zipf_exponent(frequencies):
+    """Fit a Zipf exponent to per-SKU sales frequencies (log-log slope of rank vs frequency)."""
+    freq = np.sort(np.asarray(frequencies, dtype=float))[::-1]
+    freq = freq[freq > 0]
+    if len(freq) < 3:
+        return 1.0
+    ranks = np.arange(1, len(freq) + 1)
+    slope, _ = np.polyfit(np.log(ranks), np.log(freq), 1)
+    return float(np.clip(-slope, 0.3, 2.5))
+
+
+def build_profile(raw_path=None):
+    """
+    Fit generator statistics from a raw sales export, or from pipeline outputs.
+
+    Args:
+        raw_path: Raw export (.xlsx/.csv). If None, uses sku_sales_stats.csv,
+            products_catalog.csv and transactions_history.csv instead.
+
+    Returns:
+        dict: Profile with price, popularity, basket, quantity and time distributions
+    """
+    if raw_path:
+        df_clean = filter_clean_rows(load_raw_export(raw_path))
+        df_clean = df_clean[df_clean['Quantity'] > 0]
+        product_stats = compute_product_stats(df_clean)
+        frequencies = product_stats['sales_frequency']
+        prices = product_stats['avg_price'] * 100
+        basket_sizes = df_clean.groupby('InvoiceNo').size()
+        quantities = df_clean['Quantity']
+        invoice_dates = parse_invoice_datetimes(df_clean.drop_duplicates('InvoiceNo')['InvoiceDate']).dropna()
+        source = raw_path
+    else:
+        stats_file = SKU_STATS_CSV if os.path.exists(SKU_STATS_CSV) else PRODUCTS_CSV
+        stats = pd.read_csv(stats_file)
+        frequencies = stats['sales_frequency'] if 'sales_frequency' in stats else stats['stock_quantity']
+        prices = stats['avg_price'] * 100 if 'avg_price' in stats else stats['price']
+        transactions = pd.read_csv(TRANSACTIONS_CSV)
+        items = transactions['items'].apply(json.loads)
+        basket_sizes = items.apply(len)
+        quantities = [item['quantity'] for basket in items for item in basket]
+        invoice_dates = pd.to_datetime(transactions['timestamp'].str.rstrip('Z'), errors='coerce').dropna()
+        source = f"{stats_file} + {TRANSACTIONS_CSV}"
+        print("⚠ No raw export given - fitting to pipeline outputs (basket sizes come from the MVP sample)")
+
+    log_prices = np.log(np.asarray(prices, dtype=float)[np.asarray(prices) > 0])
+    hours = np.bincount(invoice_dates.dt.hour, minlength=24).astype(float)
+    weekdays = np.bincount(invoice_dates.dt.weekday, minlength=7).astype(float)
+
+    return {
+        'source': source,
+        'price_log_mean': float(log_prices.mean()),
+        'price_log_std': float(max(log_prices.std(), 0.1)),
+        'zipf_exponent': fit_zipf_exponent(frequencies),
+        'basket_size_pmf': _pmf(basket_sizes, MAX_BASKET_SIZE),
+        'quantity_pmf': _pmf(quantities, MAX_LINE_QUANTITY),
+        'hour_pmf': (hours / hours.sum()).tolist(),
+        # Smooth weekdays so days missing from the sample (e.g. Saturday in UCI) keep a small share
+        'weekday_pmf': ((weekdays + weekdays.sum() * 0.01) / (weekdays.sum() * 1.07)).tolist(),
+    }
+
+
+def load_or_build_profile(raw_path=None, refresh=False, profile_file=None):
+    """Load the saved profile, or fit and save a new one."""
+    profile_file = profile_file or PROFILE_FILE
+    if not refresh and not raw_path and os.path.exists(profile_file):
+        with open(profile_file, 'r') as f:
+            return json.load(f)
+    profile = build_profile(raw_path)
+    os.makedirs(os.path.dirname(profile_file), exist_ok=True)
+    with open(profile_file, 'w') as f:
+        json.dump(profile, f, indent=2)
+    return profile
+
+
+def generate_catalog(profile, n_skus, rng, expected_lines):
+    """
+    Generate a product catalog in the products_catalog.csv schema.
+
+    Args:
+        profile: Fitted profile
+        n_skus: Number of SKUs
+        rng: numpy Generator
+        expected_lines: Total line items that will be generated (for stock levels)
+
+    Returns:
+        tuple: (products DataFrame, popularity CDF over catalog rows)
+    """
+    keywords = [keyword for words in CATEGORY_KEYWORDS.values() for keyword in words] + GENERIC_NOUNS
+    adjectives = rng.choice(ADJECTIVES, size=n_skus)
+    nouns = rng.choice(keywords, size=n_skus)
+    names = pd.Series(adjectives).str.cat(pd.Series(nouns).str.title(), sep=' ')
+    names = names.str.cat((pd.Series(np.arange(n_skus)) % 97).astype(str), sep=' No ')
+
+    skus = pd.Series(np.arange(n_skus)).map('SYN{:06d}'.format)
+    descriptions = names.str.upper()
+    prices = np.maximum(1, np.round(rng.lognormal(profile['price_log_mean'], profile['price_log_std'], n_skus))).astype(int)
+
+    # Zipf popularity, randomly assigned to SKUs so hot items are spread across categories
+    weights = np.arange(1, n_skus + 1, dtype=float) ** -profile['zipf_exponent']
+    weights = rng.permutation(weights / weights.sum())
+    sales_frequency = np.round(weights * expected_lines).astype(int)
+
+    supplier_index = rng.integers(0, len(SUPPLIERS), n_skus)
+    stock = [calculate_stock_level(freq, 0, False) for freq in sales_frequency]
+    thresholds = [calculate_reorder_threshold(s, freq, False) for s, freq in zip(stock, sales_frequency)]
+    now = pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    products = pd.DataFrame({
+        'sku': skus,
+        'name': names,
+        'description': descriptions,
+        'category': CATEGORY_CLASSIFIER.classify_series(descriptions),
+        'price': prices,
+        'cost': (prices * 0.6).astype(int),
+        'stock_quantity': stock,
+        'reorder_threshold': thresholds,
+        'unit': 'each',
+        'supplier_name': [SUPPLIERS[i]['name'] for i in supplier_index],
+        'supplier_contact': [SUPPLIERS[i]['contact'] for i in supplier_index],
+        'image_url': '',
+        'created_at': now,
+        'updated_at': now,
+        'is_active': True,
+    })
+    return products, np.cumsum(weights)
+
+
+def generate_line_chunk(profile, products, popularity_cdf, rng, first_txn_id, day_offsets, start_date):
+    """
+    Generate one chunk of line items for the given transaction days.
+
+    Args:
+        day_offsets: Day offset (from start_date) of each transaction in the chunk
+
+    Returns:
+        pd.DataFrame: Line items sorted by timestamp, one row per item
+    """
+    n_txns = len(day_offsets)
+    basket_sizes = rng.choice(len(profile['basket_size_pmf']), size=n_txns, p=profile['basket_size_pmf'])
+    n_lines = int(basket_sizes.sum())
+
+    # Timestamp per transaction: day + hour-of-day pattern + uniform minute
+    hours = rng.choice(24, size=n_txns, p=profile['hour_pmf'])
+    minutes = rng.integers(0, 60, size=n_txns)
+    seconds = (day_offsets * 86400 + hours * 3600 + minutes * 60).astype('timedelta64[s]')
+    txn_times = np.datetime64(start_date, 's') + seconds
+    order = np.argsort(txn_times, kind='stable')
+    txn_times = txn_times[order]
+    basket_sizes = basket_sizes[order]
+
+    txn_ids = np.repeat(np.arange(first_txn_id, first_txn_id + n_txns), basket_sizes)
+    rows = np.minimum(np.searchsorted(popularity_cdf, rng.random(n_lines)), len(products) - 1)
+    quantities = rng.choice(len(profile['quantity_pmf']), size=n_lines, p=profile['quantity_pmf'])
+    unit_prices = products['price'].values[rows]
+
+    return pd.DataFrame({
+        'transaction_id': txn_ids,
+        'timestamp': np.repeat(np.char.add(np.datetime_as_string(txn_times, unit='s'), 'Z'), basket_sizes),
+        'sku': products['sku'].values[rows],
+        'name': products['name'].values[rows],
+        'quantity': quantities,
+        'unit_price': unit_prices,
+        'line_total': quantities * unit_prices,
+    })
+
+
+def to_raw_export(lines, products):
+    """Convert line items to the raw UCI export layout (feeds transform_data.py)."""
+    # Format each distinct transaction time once, as "12/1/2010 8:26"
+    codes, uniques = pd.factorize(lines['timestamp'])
+    times = pd.Series(pd.to_datetime(pd.Series(uniques).str.rstrip('Z')))
+    formatted = (times.dt.month.astype(str) + '/' + times.dt.day.astype(str) + '/' + times.dt.year.astype(str)
+                 + ' ' + times.dt.hour.astype(str) + ':' + times.dt.minute.astype(str).str.zfill(2))
+    return pd.DataFrame({
+        'InvoiceNo': lines['transaction_id'],
+        'StockCode': lines['sku'],
+        'Description': lines['name'].str.upper(),
+        'Quantity': lines['quantity'],
+        'InvoiceDate': formatted.values[codes],
+        'UnitPrice': lines['unit_price'] / 100.0,
+        'CustomerID': 10000 + lines['transaction_id'] % 5000,
+        'Country': 'United Kingdom',
+    })
+
+
+def generate(profile, n_skus, n_transactions, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED,
+             start_date=DEFAULT_START_DATE, days=DEFAULT_DAYS, output_format='items', output_dir=None):
+    """
+    Generate a synthetic catalog and transaction history, streaming chunks to disk.
+
+    Args:
+        output_format: 'items' (line-item CSV.gz), 'parquet' (line-item Parquet parts)
+            or 'raw' (raw export CSV.gz for transform_data.py)
+
+    Returns:
+        dict: Row counts, elapsed time and throughput
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    seeds = np.random.SeedSequence(seed)
+    catalog_seed, *chunk_seeds = seeds.spawn(1 + -(-n_transactions // chunk_size))
+    np.random.seed(seed)  # calculate_stock_level uses the global RNG
+
+    start_time = time.perf_counter()
+    mean_basket = float(np.dot(np.arange(len(profile['basket_size_pmf'])), profile['basket_size_pmf']))
+    products, popularity_cdf = generate_catalog(
+        profile, n_skus, np.random.default_rng(catalog_seed), n_transactions * mean_basket
+    )
+    products_file = os.path.join(output_dir, 'synthetic_products.csv')
+    products.to_csv(products_file, index=False)
+    print(f"✓ Catalog: {len(products):,} SKUs -> {products_file}")
+
+    # Spread transactions over the date range following the weekday pattern
+    day_weights = np.array(profile['weekday_pmf'])[(pd.Timestamp(start_date).weekday() + np.arange(days)) % 7]
+    day_cdf = np.cumsum(day_weights / day_weights.sum())
+    txn_days = np.minimum(np.searchsorted(day_cdf, (np.arange(n_transactions) + 0.5) / n_transactions), days - 1)
+
+    if output_format == 'parquet':
+        lines_path = os.path.join(output_dir, 'synthetic_transaction_items_parquet')
+        os.makedirs(lines_path, exist_ok=True)
+    else:
+        name = 'synthetic_raw_export.csv.gz' if output_format == 'raw' else 'synthetic_transaction_items.csv.gz'
+        lines_path = os.path.join(output_dir, name)
+        if os.path.exists(lines_path):
+            os.remove(lines_path)
+
+    total_lines = 0
+    for chunk_index, chunk_seed in enumerate(chunk_seeds):
+        first = chunk_index * chunk_size
+        chunk_days = txn_days[first:first + chunk_size]
+        lines = generate_line_chunk(profile, products, popularity_cdf, np.random.default_rng(chunk_seed),
+                                    536365 + first, chunk_days, start_date)
+        if output_format == 'parquet':
+            lines.to_parquet(os.path.join(lines_path, f"part-{chunk_index:05d}.parquet"), index=False)
+        else:
+            frame = to_raw_export(lines, products) if output_format == 'raw' else lines
+            frame.to_csv(lines_path, mode='a', header=chunk_index == 0, index=False, compression='gzip')
+        total_lines += len(lines)
+
+        elapsed = time.perf_counter() - start_time
+        print(f"  Chunk {chunk_index + 1}/{len(chunk_seeds)}: {first + len(chunk_days):,} transactions, "
+              f"{total_lines:,} lines ({total_lines / elapsed * 60:,.0f} rows/min)")
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        'skus': n_skus,
+        'transactions': n_transactions,
+        'lines': total_lines,
+        'elapsed': elapsed,
+        'rows_per_minute': total_lines / elapsed * 60 if elapsed else 0.0,
+        'products_file': products_file,
+        'lines_path': lines_path,
+    }
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Generate synthetic retail data for load testing')
+    parser.add_argument('--skus', type=int, default=DEFAULT_SKUS, help='Number of SKUs in the catalog')
+    parser.add_argument('--transactions', type=int, default=DEFAULT_TRANSACTIONS, help='Number of transactions')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Transactions per chunk')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='RNG seed (same seed = same data)')
+    parser.add_argument('--start-date', default=DEFAULT_START_DATE, help='First day of generated history')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='Days of history')
+    parser.add_argument('--format', choices=['items', 'parquet', 'raw'], default='items',
+                        help='items: line-item CSV.gz, parquet: line-item Parquet, raw: UCI-style export')
+    parser.add_argument('--raw-input', help='Raw UCI export to fit the profile to (default: pipeline outputs)')
+    parser.add_argument('--refresh-profile', action='store_true', help='Refit the profile even if one is saved')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Output directory')
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+
+    print("="*60)
+    print("AGENTIC RETAIL OS - SYNTHETIC DATA GENERATION")
+    print("="*60)
+    profile_file = os.path.join(args.output_dir, os.path.basename(PROFILE_FILE))
+    profile = load_or_build_profile(args.raw_input, args.refresh_profile, profile_file)
+    print(f"Profile: {profile['source']}")
+    print(f"  Zipf exponent: {profile['zipf_exponent']:.2f}, "
+          f"median price: {np.exp(profile['price_log_mean']) / 100:.2f}")
+    print(f"SKUs: {args.skus:,}, transactions: {args.transactions:,}, seed: {args.seed}")
+    print()
+
+    result = generate(profile, args.skus, args.transactions, args.chunk_size, args.seed,
+                      args.start_date, args.days, args.format, args.output_dir)
+
+    print("\n" + "="*60)
+    print("SYNTHETIC DATA SUMMARY")
+    print("="*60)
+    print(f"SKUs: {result['skus']:,}")
+    print(f"Transactions: {result['transactions']:,}")
+    print(f"Line items: {result['lines']:,}")
+    print(f"Elapsed: {result['elapsed']:.1f}s ({result['rows_per_minute']:,.0f} rows/min)")
+    print(f"\nOutput files:")
+    print(f"  {result['products_file']}")
+    print(f"  {result['lines_path']}")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
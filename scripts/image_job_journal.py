@@ -0,0 +1,261 @@
+"""
+Crash-safe job journal for generate_images.py.
+
+Records every per-SKU state transition in SQLite (WAL mode) as it happens,
+so a run that dies halfway can resume without redoing finished work, and
+the image CSV can be regenerated from the journal at any time.
+
+Job states:
+- pending: queued, not yet attempted
+- running: submitted to the API (a crash leaves it here; resume re-queues it)
+- retry: failed transiently, waiting for next_attempt_at
+- succeeded: image written
+- failed: failed permanently, or ran out of scheduled attempts
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+JOURNAL_DB = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'image_jobs.sqlite3')
+
+# Scheduled retries (on top of the per-request retries in generate_image_with_retry)
+MAX_JOB_ATTEMPTS = 4
+RETRY_BASE_SECONDS = 30.0
+RETRY_MAX_SECONDS = 600.0
+
+STATES = ('pending', 'running', 'retry', 'succeeded', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    sku TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL,
+    prompt_key TEXT,
+    image_url TEXT,
+    last_error TEXT,
+    run_id TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, next_attempt_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    sku TEXT NOT NULL,
+    from_state TEXT,
+    to_state TEXT NOT NULL,
+    error TEXT,
+    at REAL NOT NULL
+);
+"""
+
+
+def retry_delay(attempts, base=None, cap=None):
+    """Exponential backoff with full jitter for the next scheduled attempt."""
+    base = RETRY_BASE_SECONDS if base is None else base
+    cap = RETRY_MAX_SECONDS if cap is None else cap
+    return random.uniform(base, min(cap, base * (2 ** max(0, attempts - 1))))
+
+
+class ImageJobJournal:
+    """
+    SQLite-backed per-SKU job journal.
+
+    Each transition is its own committed transaction, so the journal is
+    current up to the last finished SKU whenever the process stops. The
+    connection is shared by the download threads behind a lock.
+    """
+
+    def __init__(self, path=None, max_attempts=None):
+        self.path = path or JOURNAL_DB
+        self.max_attempts = max_attempts or MAX_JOB_ATTEMPTS
+        self.run_id = None
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # durable across process crashes in WAL mode
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.run_id:
+            self.finish_run('interrupted' if exc_type else 'completed')
+        self.close()
+
+    # Runs
+
+    def start_run(self, params=None):
+        """
+        Start a run and re-queue jobs a crashed run left in 'running'.
+
+        Returns:
+            str: The new run ID
+        """
+        self.run_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute("UPDATE runs SET status = 'interrupted', finished_at = ? WHERE status = 'running'",
+                              (now,))
+            self.conn.execute("INSERT INTO runs (run_id, started_at, status, params) VALUES (?, ?, 'running', ?)",
+                              (self.run_id, now, json.dumps(params or {})))
+            stale = [row['sku'] for row in self.conn.execute("SELECT sku FROM jobs WHERE state = 'running'")]
+            for sku in stale:
+                self._transition(sku, 'pending', error='interrupted run', now=now)
+            self.conn.execute("COMMIT")
+        return self.run_id
+
+    def finish_run(self, status='completed'):
+        with self.lock:
+            self.conn.execute("UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                              (status, time.time(), self.run_id))
+        self.run_id = None
+
+    # Jobs
+
+    def _transition(self, sku, to_state, error=None, now=None, **fields):
+        """Update one job and log the event (caller holds the lock and transaction)."""
+        now = now or time.time()
+        row = self.conn.execute("SELECT state FROM jobs WHERE sku = ?", (sku,)).fetchone()
+        from_state = row['state'] if row else None
+        if row is None:
+            self.conn.execute("INSERT INTO jobs (sku, state, updated_at) VALUES (?, ?, ?)", (sku, to_state, now))
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        self.conn.execute(
+            f"UPDATE jobs SET state = ?, last_error = ?, run_id = ?, updated_at = ?"
+            f"{', ' + assignments if assignments else ''} WHERE sku = ?",
+            (to_state, error, self.run_id, now, *fields.values(), sku))
+        self.conn.execute("INSERT INTO events (run_id, sku, from_state, to_state, error, at) VALUES (?, ?, ?, ?, ?, ?)",
+                          (self.run_id, sku, from_state, to_state, error, now))
+
+    def _commit_transition(self, sku, to_state, error=None, **fields):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._transition(sku, to_state, error=error, **fields)
+            self.conn.execute("COMMIT")
+
+    def get(self, sku):
+        """Return the job row for a SKU as a dict, or None."""
+        row = self.conn.execute("SELECT * FROM jobs WHERE sku = ?", (str(sku),)).fetchone()
+        return dict(row) if row else None
+
+    def mark_running(self, sku, prompt_key=None):
+        """Record an attempt starting (increments attempts)."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            job = self.conn.execute("SELECT state, attempts FROM jobs WHERE sku = ?", (str(sku),)).fetchone()
+            # A changed prompt for a finished SKU starts a fresh attempt budget
+            attempts = (job['attempts'] if job and job['state'] != 'succeeded' else 0) + 1
+            self._transition(str(sku), 'running', attempts=attempts, prompt_key=prompt_key, next_attempt_at=None)
+            self.conn.execute("COMMIT")
+
+    def mark_succeeded(self, sku, image_url, prompt_key=None):
+        """Record the SKU's image as written."""
+        self._commit_transition(str(sku), 'succeeded', image_url=image_url, prompt_key=prompt_key,
+                                next_attempt_at=None)
+
+    def mark_failed(self, sku, error, transient):
+        """
+        Record a failed attempt.
+
+        Transient failures are scheduled for another attempt with backoff
+        until max_attempts is reached; anything else fails permanently.
+
+        Returns:
+            float: next_attempt_at for a scheduled retry, or None if failed
+        """
+        job = self.get(sku) or {'attempts': 1}
+        if transient and job['attempts'] < self.max_attempts:
+            next_attempt_at = time.time() + retry_delay(job['attempts'])
+            self._commit_transition(str(sku), 'retry', error=str(error), next_attempt_at=next_attempt_at)
+            return next_attempt_at
+        self._commit_transition(str(sku), 'failed', error=str(error), next_attempt_at=None)
+        return None
+
+    def reset_failed(self):
+        """Move permanently failed jobs back to pending with a fresh attempt budget."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            skus = [row['sku'] for row in self.conn.execute("SELECT sku FROM jobs WHERE state = 'failed'")]
+            for sku in skus:
+                self._transition(sku, 'pending', attempts=0)
+            self.conn.execute("COMMIT")
+        return len(skus)
+
+    def due_retries(self, now=None):
+        """SKUs in 'retry' whose next attempt time has passed."""
+        rows = self.conn.execute("SELECT sku FROM jobs WHERE state = 'retry' AND next_attempt_at <= ? "
+                                 "ORDER BY next_attempt_at", (now or time.time(),))
+        return [row['sku'] for row in rows]
+
+    def next_retry_at(self):
+        """Earliest scheduled retry time, or None."""
+        row = self.conn.execute("SELECT MIN(next_attempt_at) AS at FROM jobs WHERE state = 'retry'").fetchone()
+        return row['at']
+
+    def skus_in_state(self, *states):
+        placeholders = ', '.join('?' for _ in states)
+        return [row['sku'] for row in
+                self.conn.execute(f"SELECT sku FROM jobs WHERE state IN ({placeholders}) ORDER BY sku", states)]
+
+    def image_urls(self):
+        """{sku: image_url} for every succeeded job."""
+        return {row['sku']: row['image_url'] for row in
+                self.conn.execute("SELECT sku, image_url FROM jobs WHERE state = 'succeeded'")}
+
+    # Inspection
+
+    def summary(self):
+        """Job counts per state, recent runs and the latest errors."""
+        counts = {state: 0 for state in STATES}
+        for row in self.conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+            counts[row['state']] = row['n']
+        runs = [dict(row) for row in
+                self.conn.execute("SELECT * FROM runs ORDER BY started_at DESC LIMIT 5")]
+        errors = [dict(row) for row in
+                  self.conn.execute("SELECT sku, state, attempts, next_attempt_at, last_error FROM jobs "
+                                    "WHERE state IN ('retry', 'failed') ORDER BY updated_at DESC LIMIT 10")]
+        return {'counts': counts, 'runs': runs, 'errors': errors}
+
+    def print_summary(self):
+        summary = self.summary()
+        print("="*60)
+        print(f"IMAGE JOB JOURNAL: {self.path}")
+        print("="*60)
+        for state, count in summary['counts'].items():
+            print(f"  {state:10s} {count:6d}")
+        if summary['runs']:
+            print("\nRecent runs:")
+            for run in summary['runs']:
+                started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started_at']))
+                print(f"  {run['run_id']}  {started}  {run['status']}")
+        if summary['errors']:
+            print("\nRecent failures:")
+            for job in summary['errors']:
+                when = ''
+                if job['state'] == 'retry' and job['next_attempt_at']:
+                    when = f" (retry in {max(0, job['next_attempt_at'] - time.time()):.0f}s)"
+                print(f"  {job['sku']:10s} {job['state']:7s} attempts={job['attempts']}{when}: {job['last_error']}")
+        print("="*60)
@@ -0,0 +1,43 @@
+"""
+Import the Lambda handlers under infra/modules/lambda/code from scripts.
+
+Each Lambda deploys as a single lambda_function.py, so every handler has the
+same module name and a sys.path import picks whichever directory comes first.
+load_lambda() imports a handler by explicit path under its own name instead
+(inventory -> inventory_lambda), leaving sys.path alone. The clerk agent,
+the loader and the benchmarks use it to share Lambda code such as the
+inventory catalog snapshot.
+"""
+
+import importlib.util
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+LAMBDA_CODE_DIR = os.path.join(PROJECT_ROOT, 'infra', 'modules', 'lambda', 'code')
+
+
+def load_lambda(name):
+    """
+    Import infra/modules/lambda/code/{name}/lambda_function.py once per process.
+
+    Args:
+        name: Lambda code directory, e.g. 'inventory' or 'auth'
+
+    Returns:
+        module: The handler module, registered in sys.modules as '{name}_lambda'
+    """
+    module_name = f"{name}_lambda"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    path = os.path.join(LAMBDA_CODE_DIR, name, 'lambda_function.py')
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
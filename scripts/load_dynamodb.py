@@ -0,0 +1,376 @@
+"""
+DynamoDB Bulk Loader for Agentic Retail OS
+Streams the transformed catalog and transaction history into DynamoDB.
+
+Features:
+- Streams source files in chunks (never loads a whole file)
+- BatchWriteItem in 25-item batches across a thread pool
+- Retries UnprocessedItems with jittered exponential backoff
+- Client-side rate limiting to a target WCU
+- Resumable from a checkpoint file, keyed by target and table and tied to
+  the source file it was counted against (stand-in runs are not persisted)
+- Throughput report (items/sec, retries, throttled items)
+- In-process DynamoDB stand-in for offline runs and benchmarks
+- Bumps the catalog version after a products load so warm Lambda catalog
+  snapshots reload
+"""
+
+import pandas as pd
+import boto3
+import argparse
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from dynamodb_batch import BATCH_SIZE, DYNAMODB_REGION, LoadError, TokenBucket, to_dynamodb_item, write_batch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail')
+
+# Input files
+PRODUCTS_CSV = os.path.join(DATA_DIR, 'products_catalog_with_images.csv')
+TRANSACTIONS_JSONL = os.path.join(DATA_DIR, 'transactions_history.jsonl.gz')
+TRANSACTIONS_CSV = os.path.join(DATA_DIR, 'transactions_history.csv')
+CHECKPOINT_FILE = os.path.join(DATA_DIR, 'dynamodb_load_checkpoint.json')
+
+# DynamoDB Configuration
+PRODUCTS_TABLE = 'Products'
+TRANSACTIONS_TABLE = 'Transactions'
+MAX_WORKERS = 8
+TARGET_WCU = 1000  # Write capacity units per second (0 = unlimited)
+CHUNK_SIZE = 5000  # Rows read from CSV per chunk
+CHECKPOINT_EVERY = 20  # Save checkpoint every N completed batches
+
+class LocalDynamoDBStandIn:
+    """
+    Minimal in-process stand-in for the DynamoDB client's batch_write_item.
+
+    Stores items in memory keyed by table and primary key, with configurable
+    per-call latency and a probability of returning each item as unprocessed
+    (as DynamoDB does when a partition is throttled).
+    """
+
+    def __init__(self, latency_ms=5.0, unprocessed_rate=0.05, seed=0):
+        self.latency_ms = latency_ms
+        self.unprocessed_rate = unprocessed_rate
+        self.random = random.Random(seed)
+        self.tables = {}
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def batch_write_item(self, RequestItems):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0 * (0.5 + self.random.random()))
+        unprocessed = {}
+        with self.lock:
+            self.calls += 1
+            for table_name, requests in RequestItems.items():
+                if len(requests) > BATCH_SIZE:
+                    raise ValueError(f"Too many items in batch: {len(requests)}")
+                table = self.tables.setdefault(table_name, {})
+                for request in requests:
+                    if self.random.random() < self.unprocessed_rate:
+                        unprocessed.setdefault(table_name, []).append(request)
+                        continue
+                    item = request['PutRequest']['Item']
+                    key = tuple(sorted((k, json.dumps(v, sort_keys=True)) for k, v in item.items()
+                                       if k in ('sku', 'transaction_id', 'timestamp')))
+                    table[key] = item
+        return {'UnprocessedItems': unprocessed}
+
+
+def iter_products(path=None, chunksize=CHUNK_SIZE):
+    """Stream product records from the catalog CSV."""
+    path = path or PRODUCTS_CSV
+    for chunk in pd.read_csv(path, dtype={'sku': str}, chunksize=chunksize):
+        for record in chunk.to_dict('records'):
+            record['is_active'] = bool(record.get('is_active', True))
+            yield record
+
+
+def transactions_source(path=None):
+    """Transactions file to load: the override, else JSON Lines if present, else the history CSV."""
+    return path or (TRANSACTIONS_JSONL if os.path.exists(TRANSACTIONS_JSONL) else TRANSACTIONS_CSV)
+
+
+def iter_transactions(path=None, chunksize=CHUNK_SIZE):
+    """Stream transaction records from JSON Lines (preferred) or the history CSV."""
+    path = transactions_source(path)
+    if path.endswith(('.jsonl', '.jsonl.gz')):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            records = (json.loads(line) for line in f if line.strip())
+            yield from (_with_date(record) for record in records)
+        return
+
+    for chunk in pd.read_csv(path, dtype={'transaction_id': str}, chunksize=chunksize):
+        for record in chunk.to_dict('records'):
+            record['items'] = [{**item, 'sku': str(item['sku'])} for item in json.loads(record['items'])]
+            yield _with_date(record)
+
+
+def _with_date(record):
+    """Add the YYYY-MM-DD `date` attribute used by the Transactions date-index GSI."""
+    record['transaction_id'] = str(record['transaction_id'])
+    record['date'] = str(record['timestamp'])[:10]
+    return record
+
+
+def load_checkpoint(path=None):
+    """Load the loader checkpoint file ({target|table: entry})."""
+    path = path or CHECKPOINT_FILE
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_checkpoint(checkpoint, path=None):
+    """Persist the loader checkpoint atomically."""
+    path = path or CHECKPOINT_FILE
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def source_fingerprint(path):
+    """Identify a source file version by absolute path, size and mtime."""
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class LoadCheckpoint:
+    """
+    Items durably written per table, for resuming an interrupted load.
+
+    Entries are keyed by target (region or endpoint) and table name, and
+    record the source file version the offset counts against, so an offset
+    is never applied to another target or to a changed file.
+
+    Args:
+        target: Where the load writes, e.g. 'aws:us-east-1' or an endpoint URL
+        path: Checkpoint file (CHECKPOINT_FILE by default)
+        persist: False keeps progress in memory only (stand-in runs)
+        reset: Start every table from zero, overwriting existing entries
+    """
+
+    def __init__(self, target, path=None, persist=True, reset=False):
+        self.target = target
+        self.path = path or CHECKPOINT_FILE
+        self.persist = persist
+        self.reset = reset
+        self.entries = load_checkpoint(self.path) if persist else {}
+
+    def key(self, table_name):
+        return f"{self.target}|{table_name}"
+
+    def resume(self, table_name, source_path):
+        """
+        Offset to resume table_name from (0 for a fresh load).
+
+        Raises:
+            LoadError: If the checkpoint was recorded against a different
+                version of the source file
+        """
+        source = source_fingerprint(source_path)
+        entry = self.entries.get(self.key(table_name))
+        if entry and entry['written'] and not self.reset and entry['source'] != source:
+            raise LoadError(f"Checkpoint for {table_name} on {self.target} was recorded against "
+                            f"{entry['source']['path']} ({entry['source']['size']} bytes, different version); "
+                            f"refusing to resume - rerun with --reset-checkpoint")
+        written = entry['written'] if entry and not self.reset else 0
+        self.entries[self.key(table_name)] = {'source': source, 'written': written}
+        return written
+
+    def update(self, table_name, written):
+        """Record the contiguous items written and save (unless in-memory only)."""
+        self.entries[self.key(table_name)]['written'] = written
+        if self.persist:
+            save_checkpoint(self.entries, self.path)
+
+
+def load_table(client, table_name, records, checkpoint, source_path, workers=MAX_WORKERS, target_wcu=TARGET_WCU):
+    """
+    Stream records into a table with parallel batch writes.
+
+    The checkpoint stores how many leading records are durably written.
+    Batches can finish out of order, so it only advances over a contiguous
+    run of completed batches; on resume those records are skipped and any
+    rewritten items are idempotent puts.
+
+    Args:
+        checkpoint: LoadCheckpoint for this target
+        source_path: File the records are read from (ties the offset to its version)
+
+    Returns:
+        dict: Throughput stats for the table
+    """
+    skip = checkpoint.resume(table_name, source_path)
+    limiter = TokenBucket(target_wcu)
+    stats = {'lock': threading.Lock(), 'items': 0, 'batches': 0, 'retries': 0, 'unprocessed': 0, 'skipped': skip}
+
+    completed = {}  # batch start offset -> batch length
+    contiguous = skip
+    batches_since_save = 0
+    pending = set()
+    start_time = time.perf_counter()
+
+    def batches():
+        batch, offset = [], skip
+        for index, record in enumerate(records):
+            if index < skip:
+                continue
+            batch.append(to_dynamodb_item(record))
+            if len(batch) == BATCH_SIZE:
+                yield offset, batch
+                offset += len(batch)
+                batch = []
+        if batch:
+            yield offset, batch
+
+    def submit(executor, offset, batch):
+        future = executor.submit(write_batch, client, table_name, batch, limiter, stats)
+        future.offset, future.size = offset, len(batch)
+        pending.add(future)
+
+    def drain(return_when):
+        nonlocal contiguous, batches_since_save
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            pending.discard(future)
+            future.result()  # Propagate LoadError
+            completed[future.offset] = future.size
+            stats['items'] += future.size
+            stats['batches'] += 1
+            batches_since_save += 1
+        while contiguous in completed:
+            contiguous += completed.pop(contiguous)
+        if batches_since_save >= CHECKPOINT_EVERY:
+            checkpoint.update(table_name, contiguous)
+            batches_since_save = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for offset, batch in batches():
+                # Bound in-flight batches so the source is streamed, not buffered
+                while len(pending) >= workers * 2:
+                    drain(FIRST_COMPLETED)
+                submit(executor, offset, batch)
+            while pending:
+                drain(FIRST_COMPLETED)
+    finally:
+        checkpoint.update(table_name, contiguous)
+
+    stats['elapsed'] = time.perf_counter() - start_time
+    stats['items_per_sec'] = stats['items'] / stats['elapsed'] if stats['elapsed'] else 0.0
+    del stats['lock']
+    return stats
+
+
+def print_report(table_name, stats):
+    """Print the throughput report for one table."""
+    print(f"✓ {table_name}: {stats['items']} items in {stats['batches']} batches "
+          f"({stats['elapsed']:.2f}s, {stats['items_per_sec']:,.0f} items/sec)")
+    print(f"  Skipped (checkpoint): {stats['skipped']}, retries: {stats['retries']}, "
+          f"unprocessed items retried: {stats['unprocessed']}")
+
+
+def mark_catalog_changed(client, table_name):
+    """
+    Bump the catalog version with no change list, so every warm catalog
+    snapshot (inventory Lambda, clerk) reloads in full at its next check.
+
+    Returns:
+        int: New catalog version
+    """
+    # Imported here so loading does not depend on the Lambda code unless it is needed
+    from lambda_modules import load_lambda
+    return load_lambda('inventory').bump_catalog_version(client, table_name)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Bulk load catalog and transactions into DynamoDB')
+    parser.add_argument('--tables', nargs='+', choices=['products', 'transactions'],
+                        default=['products', 'transactions'], help='Which tables to load')
+    parser.add_argument('--table-prefix', default='', help="Table name prefix, e.g. 'dev-'")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Concurrent batch writers')
+    parser.add_argument('--target-wcu', type=int, default=TARGET_WCU, help='Client-side WCU/sec limit (0 = unlimited)')
+    parser.add_argument('--region', default=DYNAMODB_REGION, help='AWS region')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    parser.add_argument('--local-standin', action='store_true', help='Write to the in-process stand-in instead of DynamoDB')
+    parser.add_argument('--unprocessed-rate', type=float, default=0.05, help='Stand-in unprocessed item probability')
+    parser.add_argument('--products-file', help='Override products CSV path')
+    parser.add_argument('--transactions-file', help='Override transactions JSONL/CSV path')
+    parser.add_argument('--reset-checkpoint', action='store_true',
+                        help="Ignore and overwrite this target's checkpoint (required after a source file changes)")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+
+    print("="*60)
+    print("AGENTIC RETAIL OS - DYNAMODB BULK LOAD")
+    print("="*60)
+
+    if args.local_standin:
+        client = LocalDynamoDBStandIn(unprocessed_rate=args.unprocessed_rate)
+        target = 'local-standin'
+        print("Target: in-process DynamoDB stand-in (checkpoint not saved)")
+    else:
+        client = boto3.client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+        target = args.endpoint_url or f"aws:{args.region}"
+        print(f"Target: {args.endpoint_url or args.region}")
+    print(f"Workers: {args.workers}, target WCU: {args.target_wcu or 'unlimited'}")
+    print()
+
+    checkpoint = LoadCheckpoint(target, persist=not args.local_standin, reset=args.reset_checkpoint)
+    products_file = args.products_file or PRODUCTS_CSV
+    transactions_file = transactions_source(args.transactions_file)
+    sources = {
+        'products': (PRODUCTS_TABLE, products_file, lambda: iter_products(products_file)),
+        'transactions': (TRANSACTIONS_TABLE, transactions_file, lambda: iter_transactions(transactions_file)),
+    }
+
+    # Refuse stale checkpoints before writing anything
+    for name in args.tables:
+        base_table, source_path, _ = sources[name]
+        try:
+            checkpoint.resume(f"{args.table_prefix}{base_table}", source_path)
+        except LoadError as e:
+            print(f"✗ {e.message}")
+            raise
+
+    try:
+        for name in args.tables:
+            base_table, source_path, records = sources[name]
+            table_name = f"{args.table_prefix}{base_table}"
+            print(f"Loading {table_name} from {os.path.basename(source_path)} "
+                  f"(resuming after {checkpoint.resume(table_name, source_path)} items)...")
+            stats = load_table(client, table_name, records(), checkpoint, source_path,
+                               workers=args.workers, target_wcu=args.target_wcu)
+            print_report(table_name, stats)
+            if name == 'products' and not args.local_standin:
+                version = mark_catalog_changed(client, table_name)
+                print(f"✓ Catalog version bumped to {version}")
+    except LoadError as e:
+        print(f"✗ {e.message}")
+        if checkpoint.persist:
+            print(f"  Progress saved to {CHECKPOINT_FILE}; rerun to resume")
+        raise
+
+    print("\n✓ Load complete!")
+    if checkpoint.persist:
+        print(f"  Checkpoint: {CHECKPOINT_FILE} (use --reset-checkpoint to reload from scratch)")
+
+
+if __name__ == '__main__':
+    main()
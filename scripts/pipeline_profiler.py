@@ -0,0 +1,221 @@
+"""
+Per-stage profiling for the data pipeline scripts.
+
+Records wall time, CPU time, memory and row counts in/out for each stage,
+optionally captures cProfile output per stage, writes a JSON report, and
+compares a report against a stored baseline to flag regressions.
+
+Memory is per stage: resident set size is sampled on a background thread
+while the stage runs, and rss_growth_mb is the stage's peak minus its RSS
+at entry. Where current RSS cannot be read (no /proc), it falls back to the
+growth of the process peak (ru_maxrss), which reads 0 for a stage that
+stays below an earlier stage's peak.
+"""
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# A stage is a regression if it is this much slower/larger than baseline...
+DEFAULT_THRESHOLD = 0.20
+# ...and the absolute difference is above these noise floors
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_MB_DELTA = 10.0
+RSS_SAMPLE_SECONDS = 0.01
+
+
+def peak_rss_mb():
+    """Return the process peak resident set size in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb():
+    """Return the current resident set size in MB (None if unavailable)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+class RSSSampler:
+    """Track the highest current RSS seen while running (background thread)."""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the peak RSS in MB."""
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+        return self.peak
+
+
+class StageProfiler:
+    """
+    Collects per-stage metrics for a pipeline run.
+
+    Usage:
+        profiler = StageProfiler(enabled=True)
+        with profiler.stage('step2_extract_products', rows_in=len(df)) as stage:
+            products_df, df_clean = step2_extract_products(df)
+            stage['rows_out'] = len(products_df)
+    """
+
+    def __init__(self, enabled=False, cprofile_dir=None):
+        self.enabled = enabled
+        self.cprofile_dir = cprofile_dir if enabled else None
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows_in=0):
+        """Measure one stage; the caller sets stage['rows_out'] inside the block."""
+        record = {'name': name, 'rows_in': int(rows_in), 'rows_out': 0}
+        if not self.enabled:
+            yield record
+            return
+
+        profile = cProfile.Profile() if self.cprofile_dir else None
+        rss_start = current_rss_mb()
+        sampler = RSSSampler().start() if rss_start is not None else None
+        maxrss_start = peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+            if sampler:
+                stage_peak = sampler.stop()
+                record['rss_start_mb'] = round(rss_start, 1)
+                record['peak_rss_mb'] = round(stage_peak, 1)
+                record['rss_growth_mb'] = round(stage_peak - rss_start, 1)
+                record['rss_method'] = 'sampled'
+            elif maxrss_start is not None:
+                record['peak_rss_mb'] = round(peak_rss_mb(), 1)
+                record['rss_growth_mb'] = round(peak_rss_mb() - maxrss_start, 1)
+                record['rss_method'] = 'maxrss'
+            else:
+                record['peak_rss_mb'] = record['rss_growth_mb'] = None
+            record['rows_out'] = int(record['rows_out'])
+            if profile:
+                os.makedirs(self.cprofile_dir, exist_ok=True)
+                record['cprofile'] = os.path.join(self.cprofile_dir, f"{name}.prof")
+                profile.dump_stats(record['cprofile'])
+            self.stages.append(record)
+
+    def report(self, **metadata):
+        """Build the JSON-serialisable report for this run."""
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            **metadata,
+            'total_wall_seconds': round(time.perf_counter() - self.started, 4),
+            'peak_rss_mb': peak_rss_mb(),  # Process lifetime peak (ru_maxrss)
+            'stages': self.stages,
+        }
+
+    def print_summary(self):
+        """Print a per-stage table."""
+        print("\n" + "="*60)
+        print("PIPELINE PROFILE")
+        print("="*60)
+        print(f"{'stage':32s} {'wall s':>8s} {'cpu s':>8s} {'peak MB':>8s} {'+MB':>7s} "
+              f"{'rows in':>10s} {'rows out':>10s}")
+        for stage in self.stages:
+            rss = stage['peak_rss_mb'] if stage['peak_rss_mb'] is not None else float('nan')
+            growth = stage['rss_growth_mb'] if stage['rss_growth_mb'] is not None else float('nan')
+            print(f"{stage['name']:32s} {stage['wall_seconds']:8.3f} {stage['cpu_seconds']:8.3f} "
+                  f"{rss:8.1f} {growth:7.1f} {stage['rows_in']:10d} {stage['rows_out']:10d}")
+        print("="*60)
+
+
+def write_report(report, path):
+    """Write a profile report as JSON."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def load_report(path):
+    """Load a profile report."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare_reports(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two profile reports stage by stage.
+
+    Times are compared per input row when the row counts differ, so a run on
+    a larger input is not flagged just for processing more data.
+
+    Returns:
+        list: Regression descriptions (empty if none)
+    """
+    baseline_stages = {stage['name']: stage for stage in baseline['stages']}
+    regressions = []
+
+    print(f"{'stage':32s} {'metric':12s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+    for stage in current['stages']:
+        base = baseline_stages.get(stage['name'])
+        if base is None:
+            print(f"{stage['name']:32s} (not in baseline)")
+            continue
+
+        scale = 1.0
+        if stage['rows_in'] and base['rows_in'] and stage['rows_in'] != base['rows_in']:
+            scale = base['rows_in'] / stage['rows_in']
+
+        for metric, floor in (('wall_seconds', MIN_SECONDS_DELTA), ('cpu_seconds', MIN_SECONDS_DELTA),
+                              ('rss_growth_mb', MIN_RSS_MB_DELTA)):
+            if base.get(metric) is None or stage.get(metric) is None:
+                continue
+            value = stage[metric] * (scale if metric != 'rss_growth_mb' else 1.0)
+            change = (value - base[metric]) / base[metric] if base[metric] else 0.0
+            flagged = change > threshold and value - base[metric] > floor
+            marker = '  ✗' if flagged else ''
+            print(f"{stage['name']:32s} {metric:12s} {base[metric]:10.3f} {value:10.3f} {change:+8.1%}{marker}")
+            if flagged:
+                regressions.append(f"{stage['name']} {metric}: {base[metric]:.3f} -> {value:.3f} ({change:+.1%})")
+
+        if stage['rows_out'] != base['rows_out'] and stage['rows_in'] == base['rows_in']:
+            print(f"{stage['name']:32s} rows_out changed: {base['rows_out']} -> {stage['rows_out']}")
+
+    return regressions
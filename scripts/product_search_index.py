@@ -0,0 +1,376 @@
+"""
+Prebuilt product search index for cashier lookup by partial name or SKU.
+
+Builds a compact inverted index from products_catalog_with_images.csv and
+ships it as a static JSON artifact for the web app. The same file backs the
+clerk agent's product_search tool through ProductSearchIndex.
+
+Features:
+- Normalised tokens (lowercase, accents stripped) from SKU, name, category and description
+- Sorted token list + posting lists: prefix queries are a bisect, not a scan
+- Documents stored in popularity order (sales_frequency), so posting lists are
+  already ranked and queries stop after `limit` hits
+- Fuzzy fallback for misspelt terms: trigram candidates, then edit distance
+- Benchmark mode reporting per-query latency percentiles
+"""
+
+import argparse
+import bisect
+import json
+import os
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+# File Paths
+PRODUCTS_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'products_catalog_with_images.csv')
+SKU_STATS_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'sku_sales_stats.csv')
+TRANSACTIONS_CSV = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'transactions_history.csv')
+SEARCH_INDEX_JSON = os.path.join(PROJECT_ROOT, 'web', 'public', 'data', 'search_index.json')
+
+# Index Configuration
+INDEX_VERSION = 1
+DOC_FIELDS = ['sku', 'name', 'category', 'price', 'stock_quantity', 'image_url', 'popularity']
+DEFAULT_LIMIT = 10
+MAX_INTERSECT_POSTINGS = 20000  # Commoner terms are checked per candidate instead of intersected
+SCAN_COST_RATIO = 25  # Checking one doc in Python ~ sorting this many postings in NumPy
+MIN_FUZZY_LENGTH = 3
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase, strip accents and split into alphanumeric tokens."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def load_popularity(products_df, sku_stats_csv=None, transactions_csv=None):
+    """
+    Per-SKU popularity: sales_frequency from the catalog or sku_sales_stats.csv,
+    else the number of transaction lines per SKU, else 0.
+
+    Returns:
+        pd.Series: Popularity indexed like products_df
+    """
+    if 'sales_frequency' in products_df:
+        return products_df['sales_frequency'].fillna(0).astype(int)
+
+    sku_stats_csv = sku_stats_csv or SKU_STATS_CSV
+    if os.path.exists(sku_stats_csv):
+        stats = pd.read_csv(sku_stats_csv, dtype={'sku': str}, usecols=['sku', 'sales_frequency'])
+        frequency = stats.set_index('sku')['sales_frequency']
+        return products_df['sku'].map(frequency).fillna(0).astype(int)
+
+    transactions_csv = transactions_csv or TRANSACTIONS_CSV
+    if os.path.exists(transactions_csv):
+        counts = {}
+        for chunk in pd.read_csv(transactions_csv, usecols=['items'], chunksize=50000):
+            for items in chunk['items'].dropna():
+                for item in json.loads(items):
+                    sku = str(item['sku'])
+                    counts[sku] = counts.get(sku, 0) + 1
+        print(f"⚠ {sku_stats_csv} not found - ranking by transaction line counts")
+        return products_df['sku'].map(counts).fillna(0).astype(int)
+
+    print("⚠ No sales statistics found - results are ranked by catalog order")
+    return pd.Series(0, index=products_df.index)
+
+
+def build_index(products_df, popularity):
+    """
+    Build the search index.
+
+    Args:
+        products_df: Catalog with sku, name, category, description, price, stock_quantity, image_url
+        popularity: Per-row popularity (higher ranks first)
+
+    Returns:
+        dict: JSON-ready index {version, fields, docs, tokens, postings}
+    """
+    products_df = products_df.assign(popularity=np.asarray(popularity))
+    # Stable sort keeps catalog order among equally popular products
+    products_df = products_df.sort_values('popularity', ascending=False, kind='stable').reset_index(drop=True)
+
+    postings = {}
+    for doc_id, row in enumerate(products_df[['sku', 'name', 'category', 'description']].itertuples(index=False)):
+        for token in set(normalize(' '.join(str(value) for value in row if isinstance(value, str)))):
+            postings.setdefault(token, []).append(doc_id)
+
+    tokens = sorted(postings)
+    docs = products_df.reindex(columns=DOC_FIELDS)
+    docs['image_url'] = docs['image_url'].fillna('')
+    docs = docs.fillna(0).astype(object).values.tolist()
+    return {
+        'version': INDEX_VERSION,
+        'fields': DOC_FIELDS,
+        'docs': docs,
+        'tokens': tokens,
+        # Doc IDs ascend, i.e. each posting list is already in popularity order
+        'postings': [postings[token] for token in tokens],
+    }
+
+
+def write_index(index, path=None):
+    """Write the index as compact JSON (atomically). Returns bytes written."""
+    path = path or SEARCH_INDEX_JSON
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(index, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+    return os.path.getsize(path)
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _sorted_unique(doc_ids):
+    """Sorted unique doc IDs (np.sort + dedupe is much faster than np.unique here)."""
+    doc_ids = np.sort(doc_ids)
+    if len(doc_ids) < 2:
+        return doc_ids
+    return doc_ids[np.concatenate(([True], doc_ids[1:] != doc_ids[:-1]))]
+
+
+def _trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductSearchIndex:
+    """
+    Query side of the prebuilt index.
+
+    Each query term matches any token it is a prefix of; if none, word
+    tokens within a small edit distance. A product matches when every term
+    does. Results are an exact SKU hit first, then popularity order.
+
+    Posting lists are held as one flat NumPy array with offsets, so the
+    documents for a prefix (a contiguous token range) are a single slice
+    and multi-term queries are sorted-array intersections.
+
+    Usage:
+        index = ProductSearchIndex.load()
+        index.search('heart holder', limit=5)
+    """
+
+    def __init__(self, index):
+        self.fields = index['fields']
+        self.docs = index['docs']
+        self.tokens = index['tokens']
+        self.sku_field = self.fields.index('sku')
+        self.sku_to_doc = {str(doc[self.sku_field]).lower(): doc_id for doc_id, doc in enumerate(self.docs)}
+
+        lengths = np.fromiter((len(doc_ids) for doc_ids in index['postings']), dtype=np.int64,
+                              count=len(self.tokens))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self.flat = np.fromiter((doc_id for doc_ids in index['postings'] for doc_id in doc_ids), dtype=np.int32,
+                                count=int(self.offsets[-1]))
+        # Per-doc token IDs for candidate checks and the dense-term scan
+        self.doc_tokens = [[] for _ in self.docs]
+        for token_id, doc_ids in enumerate(index['postings']):
+            for doc_id in doc_ids:
+                self.doc_tokens[doc_id].append(token_id)
+
+        # Fuzzy matching covers words only; misspelt SKUs are not worth guessing
+        self.trigram_index = {}
+        for token_id, token in enumerate(self.tokens):
+            if token.isalpha() and len(token) >= MIN_FUZZY_LENGTH:
+                for gram in _trigrams(token):
+                    self.trigram_index.setdefault(gram, []).append(token_id)
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or SEARCH_INDEX_JSON, 'r') as f:
+            return cls(json.load(f))
+
+    def _token_range(self, prefix):
+        """Token IDs [lo, hi) starting with prefix."""
+        lo = bisect.bisect_left(self.tokens, prefix)
+        hi = bisect.bisect_left(self.tokens, prefix + '\uffff', lo)
+        return lo, hi
+
+    def _fuzzy_tokens(self, term):
+        """Word token IDs within edit distance 1 (2 for long terms) of term."""
+        if len(term) < MIN_FUZZY_LENGTH or not term.isalpha():
+            return []
+        shared = {}
+        for gram in _trigrams(term):
+            for token_id in self.trigram_index.get(gram, ()):
+                shared[token_id] = shared.get(token_id, 0) + 1
+        limit = 1 if len(term) < 7 else 2
+        # Each edit destroys at most 3 trigrams
+        needed = max(1, len(_trigrams(term)) - 3 * limit)
+        return sorted(token_id for token_id, count in shared.items()
+                      if count >= needed and edit_distance(term, self.tokens[token_id], limit) <= limit)
+
+    def _term(self, term):
+        """
+        Resolve one query term.
+
+        Returns:
+            tuple: (posting count, sort cost, docs function, per-doc match function)
+        """
+        lo, hi = self._token_range(term)
+        if lo < hi:
+            def docs():
+                doc_ids = self.flat[self.offsets[lo]:self.offsets[hi]]
+                return doc_ids if hi - lo == 1 else _sorted_unique(doc_ids)
+            count = int(self.offsets[hi] - self.offsets[lo])
+            # A single token's posting list is already sorted: a free slice
+            return count, 0 if hi - lo == 1 else count, docs, \
+                lambda doc_tokens: any(lo <= token_id < hi for token_id in doc_tokens)
+
+        token_ids = self._fuzzy_tokens(term)
+        token_set = set(token_ids)
+
+        def fuzzy_docs():
+            if not token_ids:
+                return np.empty(0, dtype=np.int32)
+            return _sorted_unique(np.concatenate([self.flat[self.offsets[t]:self.offsets[t + 1]] for t in token_ids]))
+        count = sum(int(self.offsets[t + 1] - self.offsets[t]) for t in token_ids)
+        return count, count, fuzzy_docs, lambda doc_tokens: any(token_id in token_set for token_id in doc_tokens)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Find products matching every term of query.
+
+        Args:
+            query: Free text, e.g. 'red alarm', 'hart holdr' or '85123'
+            limit: Maximum results
+
+        Returns:
+            list: Product dicts (DOC_FIELDS) in rank order
+        """
+        terms = normalize(query)
+        if not terms:
+            return []
+
+        results = []
+        exact = self.sku_to_doc.get(''.join(terms))
+        if exact is not None:
+            results.append(exact)
+
+        resolved = sorted((self._term(term) for term in set(terms)), key=lambda term: term[0])
+        if resolved[0][0] == 0:
+            return [self._doc(doc_id) for doc_id in results]
+
+        # Docs a rank-order scan would visit before `limit` hits, assuming independent terms
+        selectivity = float(np.prod([min(1.0, count / len(self.docs)) for count, _, _, _ in resolved]))
+        expected_scan = limit / selectivity
+        if resolved[0][0] <= MAX_INTERSECT_POSTINGS and expected_scan * SCAN_COST_RATIO > resolved[0][1]:
+            # Intersect the rarer terms' sorted doc arrays; check the rest per candidate
+            candidates = resolved[0][2]()
+            unchecked = []
+            for count, _, docs, match in resolved[1:]:
+                if count <= MAX_INTERSECT_POSTINGS:
+                    candidates = np.intersect1d(candidates, docs(), assume_unique=True)
+                else:
+                    unchecked.append(match)
+            candidates = candidates[:limit + 1].tolist() if not unchecked else candidates.tolist()
+        else:
+            # Common terms: scan docs in rank order and stop early
+            unchecked = [match for _, _, _, match in resolved]
+            candidates = range(len(self.docs))
+
+        for doc_id in candidates:
+            if len(results) >= limit:
+                break
+            if doc_id != exact and all(match(self.doc_tokens[doc_id]) for match in unchecked):
+                results.append(doc_id)
+        return [self._doc(doc_id) for doc_id in results[:limit]]
+
+    def _doc(self, doc_id):
+        return dict(zip(self.fields, self.docs[doc_id]))
+
+
+def build(products_csv=None, output=None):
+    """
+    Build and write the index from the catalog CSV.
+
+    Returns:
+        dict: The index
+    """
+    start = time.perf_counter()
+    products_df = pd.read_csv(products_csv or PRODUCTS_CSV, dtype={'sku': str})
+    index = build_index(products_df, load_popularity(products_df))
+    size = write_index(index, output)
+    print(f"✓ Indexed {len(index['docs']):,} products, {len(index['tokens']):,} tokens "
+          f"({size / 1024:.1f} KB) in {time.perf_counter() - start:.2f}s -> {output or SEARCH_INDEX_JSON}")
+    return index
+
+
+def benchmark(search_index, queries=2000, seed=0):
+    """Time random prefix, multi-term, SKU and misspelt queries drawn from the catalog."""
+    rng = np.random.default_rng(seed)
+    name_field = search_index.fields.index('name')
+    workload = {'prefix': [], 'two terms': [], 'sku': [], 'fuzzy': []}
+    for doc_id in rng.integers(0, len(search_index.docs), queries):
+        doc = search_index.docs[doc_id]
+        words = normalize(doc[name_field]) or ['x']
+        word = words[rng.integers(len(words))]
+        workload['prefix'].append(word[:max(1, int(rng.integers(1, len(word) + 1)))])
+        workload['two terms'].append(' '.join(words[:2]))
+        workload['sku'].append(str(doc[search_index.sku_field]))
+        position = int(rng.integers(len(word)))
+        workload['fuzzy'].append(word[:position] + 'q' + word[position + 1:] if len(word) >= 4 else word)
+
+    print(f"{'query type':12s} {'p50 us':>8s} {'p99 us':>8s} {'max us':>9s} {'avg hits':>9s}")
+    for name, items in workload.items():
+        timings, hits = [], 0
+        for query in items:
+            start = time.perf_counter()
+            hits += len(search_index.search(query))
+            timings.append((time.perf_counter() - start) * 1e6)
+        p50, p99 = np.percentile(timings, [50, 99])
+        print(f"{name:12s} {p50:8.1f} {p99:8.1f} {max(timings):9.1f} {hits / len(items):9.1f}")
+
+
+def main(products_csv=None, output=None, run_benchmark=False, queries=None):
+    """Main execution function."""
+    print("="*60)
+    print("BUILDING PRODUCT SEARCH INDEX")
+    print("="*60)
+    index = build(products_csv, output)
+
+    if run_benchmark:
+        start = time.perf_counter()
+        search_index = ProductSearchIndex(index)
+        print(f"✓ Loaded query structures in {time.perf_counter() - start:.2f}s\n")
+        benchmark(search_index)
+    for query in queries or []:
+        print(f"\n'{query}':")
+        for product in ProductSearchIndex(index).search(query):
+            print(f"  {product['sku']:10s} {product['name'][:40]:40s} popularity={product['popularity']}")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Build the static product search index')
+    parser.add_argument('--products', help=f'Catalog CSV (default: {PRODUCTS_CSV})')
+    parser.add_argument('--output', help=f'Index JSON (default: {SEARCH_INDEX_JSON})')
+    parser.add_argument('--benchmark', action='store_true', help='Time random queries against the built index')
+    parser.add_argument('--query', action='append', help='Print results for a query (repeatable)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(products_csv=args.products, output=args.output, run_benchmark=args.benchmark, queries=args.query)
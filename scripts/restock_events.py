@@ -0,0 +1,254 @@
+"""
+Event-driven low-stock detection for Agentic Retail OS.
+
+Sales decrement stock with ReturnValues='UPDATED_NEW', so the new quantity
+comes back with the write. A restock request is raised only when a line
+takes a product from above its reorder threshold to at or below it, so
+there is no need to scan the whole Products table to find low stock.
+Running this module is the reconciliation sweep, which catches anything
+event detection missed (manual stock edits, failed writes). Schedule it
+rarely, e.g. daily.
+
+Features:
+- Threshold-crossing detection from the post-update stock level
+- Per-SKU de-duplication window (no repeat requests while stock hovers
+  around the threshold)
+- Restock requests buffered and written to Restock_Requests with
+  BatchWriteItem (25 per batch, UnprocessedItems retried)
+- Reconciliation sweep: filtered, paginated Products scan that skips SKUs
+  that already have an open restock request
+- recommended_quantity tops stock up to the order-up-to level from
+  restock_forecast.py when a forecast has been built (2x the reorder
+  threshold otherwise)
+"""
+
+import argparse
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+
+from dynamodb_batch import BATCH_SIZE, DYNAMODB_REGION, LoadError, TokenBucket, to_dynamodb_item, write_batch
+from restock_forecast import FORECAST_CSV, RESTOCK_TARGET_MULTIPLIER, load_order_up_to
+
+# Configuration
+PRODUCTS_TABLE = 'Products'
+RESTOCK_REQUESTS_TABLE = 'Restock_Requests'
+STATUS_INDEX = 'status-index'
+OPEN_STATUSES = ['pending', 'approved', 'ordered']
+DEDUPE_WINDOW_SECONDS = 6 * 3600
+EVENT_SOURCE = 'transaction-processing'
+SWEEP_SOURCE = 'reconciliation-sweep'
+SWEEP_FIELDS = ['sku', 'name', 'stock_quantity', 'reorder_threshold', 'supplier_name']
+
+_deserializer = TypeDeserializer()
+
+
+def crossed_threshold(stock_after, quantity, reorder_threshold):
+    """
+    True if removing `quantity` units took stock from above the reorder
+    threshold to at or below it.
+
+    Args:
+        stock_after: Stock level returned by the update (UPDATED_NEW)
+        quantity: Units removed by this line
+        reorder_threshold: Product's reorder threshold
+    """
+    return stock_after <= reorder_threshold < stock_after + quantity
+
+
+def recommended_quantity(current_stock, reorder_threshold, order_up_to=None):
+    """
+    Units needed to bring stock up to the forecast order-up-to level, or to
+    RESTOCK_TARGET_MULTIPLIER x the threshold when there is no forecast.
+    """
+    target = order_up_to if order_up_to is not None else int(reorder_threshold) * RESTOCK_TARGET_MULTIPLIER
+    return max(int(target) - int(current_stock), 1)
+
+
+def restock_request(product, current_stock, source, order_up_to=None):
+    """Restock_Requests record (see docs/02-technical-architecture-design.md)."""
+    return {
+        'request_id': str(uuid.uuid4()),
+        'product_sku': product['sku'],
+        'product_name': product.get('name'),
+        'current_stock': int(current_stock),
+        'reorder_threshold': int(product['reorder_threshold']),
+        'recommended_quantity': recommended_quantity(current_stock, product['reorder_threshold'], order_up_to),
+        'status': 'pending',
+        'generated_by_agent': source,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'supplier_name': product.get('supplier_name'),
+    }
+
+
+class RestockEventEmitter:
+    """
+    Collects restock events and writes them to Restock_Requests in batches.
+
+    A SKU that raised an event is not raised again within window_seconds,
+    however often its stock crosses the threshold. Events are buffered and
+    written when BATCH_SIZE are pending (unless auto_flush is off) or on flush().
+
+    Args:
+        client: DynamoDB client
+        table_name: Restock_Requests table
+        window_seconds: Per-SKU de-duplication window
+        source: generated_by_agent value for the requests
+        order_up_to: sku -> forecast order-up-to level (see restock_forecast.load_order_up_to)
+        auto_flush: Write as soon as BATCH_SIZE events are pending. Turn it off on
+            a sale path so record_sale never raises; the caller flushes once per sale
+    """
+
+    def __init__(self, client, table_name=None, window_seconds=DEDUPE_WINDOW_SECONDS, source=EVENT_SOURCE,
+                 order_up_to=None, clock=time.monotonic, auto_flush=True):
+        self.client = client
+        self.table_name = table_name or RESTOCK_REQUESTS_TABLE
+        self.window_seconds = window_seconds
+        self.source = source
+        self.order_up_to = order_up_to or {}
+        self.clock = clock
+        self.auto_flush = auto_flush
+        self.last_emitted = {}  # sku -> clock time of the last event
+        self.pending = []
+        self.limiter = TokenBucket(0)
+        self.stats = {'lock': threading.Lock(), 'events': 0, 'suppressed': 0, 'written': 0, 'batches': 0,
+                      'retries': 0, 'unprocessed': 0}
+
+    def record_sale(self, product, stock_after, quantity):
+        """
+        Check one decremented line and queue a restock request if it crossed the threshold.
+
+        Args:
+            product: Static product fields (sku, name, reorder_threshold, supplier_name)
+            stock_after: New stock_quantity from the update
+            quantity: Units sold
+
+        Returns:
+            bool: True if an event was queued
+        """
+        if not crossed_threshold(stock_after, quantity, product['reorder_threshold']):
+            return False
+        return self.emit(product, stock_after)
+
+    def emit(self, product, current_stock):
+        """Queue a restock request unless the SKU raised one within the window."""
+        now = self.clock()
+        last = self.last_emitted.get(product['sku'])
+        if last is not None and now - last < self.window_seconds:
+            self.stats['suppressed'] += 1
+            return False
+        self.last_emitted[product['sku']] = now
+        request = restock_request(product, current_stock, self.source, self.order_up_to.get(product['sku']))
+        self.pending.append(to_dynamodb_item(request))
+        self.stats['events'] += 1
+        if self.auto_flush and len(self.pending) >= BATCH_SIZE:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Write all pending requests (BatchWriteItem, 25 per call)."""
+        while self.pending:
+            batch, self.pending = self.pending[:BATCH_SIZE], self.pending[BATCH_SIZE:]
+            try:
+                write_batch(self.client, self.table_name, batch, self.limiter, self.stats)
+            except LoadError:
+                # Let the SKUs raise again; the reconciliation sweep is the backstop
+                for item in batch:
+                    self.last_emitted.pop(item['product_sku']['S'], None)
+                raise
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+
+
+def open_request_skus(client, table_name):
+    """SKUs that already have a pending/approved/ordered restock request."""
+    skus = set()
+    paginator = client.get_paginator('query')
+    for status in OPEN_STATUSES:
+        for page in paginator.paginate(TableName=table_name, IndexName=STATUS_INDEX,
+                                       KeyConditionExpression='#status = :status',
+                                       ExpressionAttributeNames={'#status': 'status', '#sku': 'product_sku'},
+                                       ExpressionAttributeValues={':status': {'S': status}},
+                                       ProjectionExpression='#sku'):
+            skus.update(item['product_sku']['S'] for item in page.get('Items', []))
+    return skus
+
+
+def iter_low_stock(client, table_name):
+    """Products at or below their reorder threshold (filter applied server-side)."""
+    fields = {f"#f{i}": field for i, field in enumerate(SWEEP_FIELDS)}
+    names = {**fields, '#stock': 'stock_quantity', '#threshold': 'reorder_threshold'}
+    paginator = client.get_paginator('scan')
+    for page in paginator.paginate(TableName=table_name, ProjectionExpression=', '.join(fields),
+                                   FilterExpression='#stock <= #threshold', ExpressionAttributeNames=names):
+        for item in page.get('Items', []):
+            yield {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def reconcile(client, products_table, restock_table, dry_run=False, order_up_to=None):
+    """
+    Raise restock requests for low-stock products that have no open request.
+
+    Returns:
+        dict: low_stock, already_open, created counts
+    """
+    already_open = open_request_skus(client, restock_table)
+    emitter = RestockEventEmitter(client, restock_table, window_seconds=0, source=SWEEP_SOURCE,
+                                  order_up_to=order_up_to)
+    summary = {'low_stock': 0, 'already_open': 0, 'created': 0}
+    for product in iter_low_stock(client, products_table):
+        summary['low_stock'] += 1
+        if product['sku'] in already_open:
+            summary['already_open'] += 1
+            continue
+        summary['created'] += 1
+        if dry_run:
+            print(f"  would request {product['sku']}: stock {product['stock_quantity']} "
+                  f"<= threshold {product['reorder_threshold']}")
+        else:
+            emitter.emit(product, product['stock_quantity'])
+    emitter.flush()
+    return summary
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Reconciliation sweep: raise restock requests missed by events')
+    parser.add_argument('--table-prefix', default='', help="Table name prefix, e.g. 'dev-'")
+    parser.add_argument('--region', default=DYNAMODB_REGION, help='AWS region')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be requested without writing')
+    parser.add_argument('--forecast', help=f'restock_forecast.py output for quantities (default: {FORECAST_CSV})')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("="*60)
+    print("RESTOCK RECONCILIATION SWEEP")
+    print("="*60)
+
+    client = boto3.client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    products_table = f"{args.table_prefix}{PRODUCTS_TABLE}"
+    restock_table = f"{args.table_prefix}{RESTOCK_REQUESTS_TABLE}"
+    order_up_to = load_order_up_to(args.forecast)
+    if order_up_to:
+        print(f"✓ Quantities from forecast order-up-to levels ({len(order_up_to):,} SKUs)")
+    else:
+        print(f"⚠ No forecast found - quantities default to {RESTOCK_TARGET_MULTIPLIER}x the reorder threshold")
+    summary = reconcile(client, products_table, restock_table, dry_run=args.dry_run, order_up_to=order_up_to)
+
+    print(f"✓ {summary['low_stock']} products at or below their reorder threshold")
+    print(f"  {summary['already_open']} already have an open request")
+    if summary['created']:
+        print(f"{'⚠ Would create' if args.dry_run else '✓ Created'} {summary['created']} restock requests")
+    else:
+        print("✓ Nothing missed by event detection")
+
+
+if __name__ == '__main__':
+    main()
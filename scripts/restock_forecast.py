@@ -0,0 +1,445 @@
+"""
+Restock Quantity Forecasting for Agentic Retail OS
+Computes recommended_quantity for every SKU in one vectorised pass.
+
+Transaction line items (the line-item Parquet dataset or JSON Lines history
+written by transform_data.py, a line-item CSV, or the Transactions table)
+are binned into a SKU x day demand matrix, and
+every statistic is computed for all SKUs at once with NumPy:
+- Sales velocity: mean units/day over the last MA_WINDOW_DAYS
+- Day-of-week seasonality: per-SKU weekday indices, shrunk towards the
+  store-wide weekday profile so sparse SKUs do not get noisy indices
+- Seasonality-aware moving average: trailing mean of deseasonalised demand,
+  re-seasonalised over the days of the lead time and review period
+- Safety stock: z(service level) x deseasonalised demand std x sqrt(lead time)
+- Order-up-to policy: a SKU needs restock when stock is at or below
+  max(reorder_threshold, reorder point); it is topped up to cover the lead
+  time + review period + safety stock, and never below the fallback target
+  of RESTOCK_TARGET_MULTIPLIER x reorder_threshold
+- SKUs with sales on fewer than MIN_SALE_DAYS days in the window are not
+  forecast: they keep the fallback threshold and target (method=fallback)
+
+Output is a CSV keyed by sku; restock_events.py sizes restock requests
+from its order_up_to levels.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+from statistics import NormalDist
+
+import boto3
+import numpy as np
+import pandas as pd
+from boto3.dynamodb.types import TypeDeserializer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail')
+
+# File paths
+PRODUCTS_CSV = os.path.join(DATA_DIR, 'products_catalog.csv')
+TRANSACTION_ITEMS_PARQUET_DIR = os.path.join(DATA_DIR, 'transaction_items_parquet')  # One row per line item
+TRANSACTIONS_JSONL = os.path.join(DATA_DIR, 'transactions_history.jsonl.gz')
+TRANSACTIONS_CSV = os.path.join(DATA_DIR, 'transactions_history.csv')  # Last resort: JSON items column
+FORECAST_CSV = os.path.join(DATA_DIR, 'restock_forecast.csv')
+
+# Forecast Configuration
+HISTORY_DAYS = 182  # Days of history in the demand matrix
+MA_WINDOW_DAYS = 28  # Moving-average window for the demand level
+SIGMA_WINDOW_DAYS = 56  # Window for demand variability
+LEAD_TIME_DAYS = 7  # Supplier lead time
+REVIEW_PERIOD_DAYS = 7  # Days until the next restock review
+SERVICE_LEVEL = 0.95  # Probability of not stocking out during the lead time
+SEASONAL_SHRINKAGE_WEEKS = 8  # Weight of the store-wide weekday profile, in weeks of SKU history
+MIN_SEASONAL_INDEX = 0.1
+MIN_SALE_DAYS = 14  # Days with sales a SKU needs in the window before its forecast is used
+RESTOCK_TARGET_MULTIPLIER = 2  # Fallback order-up-to level: 2x the reorder threshold
+CHUNK_SIZE = 500000  # CSV rows per chunk
+TRANSACTIONS_TABLE = 'Transactions'
+DATE_INDEX = 'date-index'
+DYNAMODB_REGION = 'us-east-1'
+
+OUTPUT_COLUMNS = [
+    'sku', 'name', 'stock_quantity', 'reorder_threshold', 'velocity_per_day', 'forecast_lead_time_demand',
+    'safety_stock', 'reorder_point', 'order_up_to', 'days_of_cover', 'needs_restock', 'recommended_quantity',
+    'method',
+]
+
+_deserializer = TypeDeserializer()
+
+
+def _lines_from_items_column(chunk):
+    """Explode the JSON `items` column of the history CSV into (timestamp, sku, quantity) rows."""
+    items = chunk['items'].map(json.loads)
+    exploded = chunk.assign(items=items).explode('items').dropna(subset=['items'])
+    lines = pd.DataFrame(exploded['items'].tolist())
+    return pd.DataFrame({
+        'timestamp': exploded['timestamp'].to_numpy(),
+        'sku': lines['sku'].astype(str).to_numpy(),
+        'quantity': lines['quantity'].to_numpy(),
+    })
+
+
+def read_lines_parquet(dataset_dir=None, batch_size=CHUNK_SIZE):
+    """
+    Stream line items from the exploded Parquet dataset (one row per line item).
+
+    Yields:
+        pd.DataFrame: timestamp, sku, quantity
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(dataset_dir or TRANSACTION_ITEMS_PARQUET_DIR, format='parquet')
+    for batch in dataset.to_batches(columns=['timestamp', 'sku', 'quantity'], batch_size=batch_size):
+        yield batch.to_pandas()
+
+
+def read_lines_jsonl(path=None, chunksize=CHUNK_SIZE):
+    """
+    Stream line items from the JSON Lines history (items already structured).
+
+    Yields:
+        pd.DataFrame: timestamp, sku, quantity
+    """
+    opener = gzip.open if (path or TRANSACTIONS_JSONL).endswith('.gz') else open
+    rows = {'timestamp': [], 'sku': [], 'quantity': []}
+    with opener(path or TRANSACTIONS_JSONL, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            transaction = json.loads(line)
+            for item in transaction['items']:
+                rows['timestamp'].append(transaction['timestamp'])
+                rows['sku'].append(str(item['sku']))
+                rows['quantity'].append(item['quantity'])
+            if len(rows['sku']) >= chunksize:
+                yield pd.DataFrame(rows)
+                rows = {'timestamp': [], 'sku': [], 'quantity': []}
+    if rows['sku']:
+        yield pd.DataFrame(rows)
+
+
+def default_history_source():
+    """Best available history written by transform_data.py: line-item Parquet, then JSON Lines, then CSV."""
+    if os.path.isdir(TRANSACTION_ITEMS_PARQUET_DIR):
+        try:
+            import pyarrow.dataset  # noqa: F401
+            return TRANSACTION_ITEMS_PARQUET_DIR
+        except ImportError:
+            pass
+    if os.path.exists(TRANSACTIONS_JSONL):
+        return TRANSACTIONS_JSONL
+    return TRANSACTIONS_CSV
+
+
+def read_lines(path=None):
+    """
+    Stream line items from a history file or dataset (see default_history_source).
+
+    Yields:
+        pd.DataFrame: timestamp, sku, quantity
+    """
+    path = path or default_history_source()
+    if os.path.isdir(path):
+        return read_lines_parquet(path)
+    if path.endswith(('.jsonl', '.jsonl.gz')):
+        return read_lines_jsonl(path)
+    return read_lines_csv(path)
+
+
+def read_lines_csv(path=None, chunksize=CHUNK_SIZE):
+    """
+    Stream line items from a transactions CSV.
+
+    Accepts a line-item CSV such as generate_synthetic_data.py writes (one
+    row per line with `sku` and `quantity` columns) or, as a fallback, the
+    history CSV (one row per transaction with a JSON `items` column).
+
+    Yields:
+        pd.DataFrame: timestamp, sku, quantity
+    """
+    path = path or TRANSACTIONS_CSV
+    columns = pd.read_csv(path, nrows=0).columns
+    if 'items' in columns:
+        for chunk in pd.read_csv(path, usecols=['timestamp', 'items'], chunksize=chunksize):
+            yield _lines_from_items_column(chunk)
+    else:
+        for chunk in pd.read_csv(path, usecols=['timestamp', 'sku', 'quantity'], dtype={'sku': str},
+                                 chunksize=chunksize):
+            yield chunk
+
+
+def read_lines_dynamodb(start_date, days, table_name=None, region=None, endpoint_url=None):
+    """
+    Line items for a date range from the Transactions table.
+
+    Queries the date-index GSI one day at a time, so only the forecast window
+    is read (no table scan).
+
+    Yields:
+        pd.DataFrame: timestamp, sku, quantity (one frame per day)
+    """
+    client = boto3.client('dynamodb', region_name=region or DYNAMODB_REGION, endpoint_url=endpoint_url)
+    paginator = client.get_paginator('query')
+    for day in pd.date_range(start_date, periods=days, freq='D').strftime('%Y-%m-%d'):
+        rows = {'timestamp': [], 'sku': [], 'quantity': []}
+        for page in paginator.paginate(TableName=table_name or TRANSACTIONS_TABLE, IndexName=DATE_INDEX,
+                                       KeyConditionExpression='#date = :date',
+                                       ExpressionAttributeNames={'#date': 'date', '#ts': 'timestamp',
+                                                                 '#items': 'items'},
+                                       ExpressionAttributeValues={':date': {'S': day}},
+                                       ProjectionExpression='#ts, #items'):
+            for item in page.get('Items', []):
+                timestamp = item['timestamp']['S']
+                for line in _deserializer.deserialize(item.get('items', {'L': []})):
+                    rows['timestamp'].append(timestamp)
+                    rows['sku'].append(str(line['sku']))
+                    rows['quantity'].append(int(line['quantity']))
+        if rows['sku']:
+            yield pd.DataFrame(rows)
+
+
+def build_demand_matrix(line_chunks, skus, end_date=None, days=HISTORY_DAYS):
+    """
+    Bin line items into a SKU x day matrix of units sold.
+
+    Args:
+        line_chunks: Iterable of DataFrames (timestamp, sku, quantity)
+        skus: Catalog SKUs (matrix row order)
+        end_date: Last day of the window (default: last day with sales)
+        days: Window length
+
+    Returns:
+        tuple: (demand float32 array [len(skus), days], first day as pd.Timestamp)
+    """
+    sku_index = pd.Index(skus)
+    codes, day_numbers, quantities = [], [], []
+    for chunk in line_chunks:
+        rows = sku_index.get_indexer(chunk['sku'].astype(str))
+        known = rows >= 0
+        # Parse each distinct timestamp once
+        timestamp_codes, timestamps = pd.factorize(chunk['timestamp'].astype(str))
+        days_since_epoch = (pd.to_datetime(pd.Series(timestamps).str[:10], format='%Y-%m-%d')
+                            .to_numpy().astype('datetime64[D]').astype(np.int64))
+        codes.append(rows[known])
+        day_numbers.append(days_since_epoch[timestamp_codes][known])
+        quantities.append(chunk['quantity'].to_numpy()[known].astype(np.float64))
+
+    codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.int64)
+    day_numbers = np.concatenate(day_numbers) if day_numbers else np.empty(0, dtype=np.int64)
+    quantities = np.concatenate(quantities) if quantities else np.empty(0)
+
+    if end_date is not None:
+        last_day = pd.Timestamp(end_date).to_datetime64().astype('datetime64[D]').astype(np.int64)
+    elif len(day_numbers):
+        last_day = int(day_numbers.max())
+    else:
+        last_day = pd.Timestamp.now().to_datetime64().astype('datetime64[D]').astype(np.int64)
+    first_day = last_day - days + 1
+
+    in_window = (day_numbers >= first_day) & (day_numbers <= last_day)
+    flat = codes[in_window] * days + (day_numbers[in_window] - first_day)
+    demand = np.bincount(flat, weights=quantities[in_window], minlength=len(skus) * days)
+    demand = np.maximum(demand, 0).astype(np.float32).reshape(len(skus), days)
+    return demand, pd.Timestamp(np.datetime64(int(first_day), 'D'))
+
+
+def seasonal_indices(demand, weekdays, shrinkage_weeks=SEASONAL_SHRINKAGE_WEEKS):
+    """
+    Per-SKU day-of-week indices (mean 1), shrunk towards the store-wide profile.
+
+    Args:
+        demand: SKU x day matrix
+        weekdays: Weekday (0=Mon) of each matrix column
+
+    Returns:
+        np.ndarray: [n_skus, 7] seasonal indices
+    """
+    one_hot = np.zeros((len(weekdays), 7), dtype=np.float32)
+    one_hot[np.arange(len(weekdays)), weekdays] = 1
+    weeks_per_day = np.maximum(one_hot.sum(axis=0), 1)
+
+    sku_weekday_mean = (demand @ one_hot) / weeks_per_day
+    sku_mean = demand.mean(axis=1, keepdims=True)
+
+    store = demand.sum(axis=0) @ one_hot / weeks_per_day
+    store_profile = store / store.mean() if store.mean() > 0 else np.ones(7, dtype=np.float32)
+
+    shrunk = ((weeks_per_day * sku_weekday_mean + shrinkage_weeks * sku_mean * store_profile)
+              / (weeks_per_day + shrinkage_weeks))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indices = np.where(sku_mean > 0, shrunk / sku_mean, store_profile)
+    indices = np.maximum(indices, MIN_SEASONAL_INDEX)
+    return (indices / indices.mean(axis=1, keepdims=True)).astype(np.float32)
+
+
+def forecast(demand, first_day, stock, reorder_threshold, lead_time=LEAD_TIME_DAYS, review_period=REVIEW_PERIOD_DAYS,
+             service_level=SERVICE_LEVEL, ma_window=MA_WINDOW_DAYS, sigma_window=SIGMA_WINDOW_DAYS,
+             min_sale_days=MIN_SALE_DAYS):
+    """
+    Vectorised restock recommendation for every SKU.
+
+    Args:
+        demand: SKU x day units sold (last column is the most recent day)
+        first_day: Date of the first column
+        stock: Current stock_quantity per SKU
+        reorder_threshold: reorder_threshold per SKU
+        min_sale_days: SKUs with fewer days of sales use the fallback
+            (reorder at the threshold, top up to RESTOCK_TARGET_MULTIPLIER x threshold)
+
+    Returns:
+        dict: Column name -> array, one entry per SKU
+    """
+    n_days = demand.shape[1]
+    weekdays = (first_day.weekday() + np.arange(n_days)) % 7
+    indices = seasonal_indices(demand, weekdays)
+
+    # Deseasonalise only the columns the moving average and std need
+    recent = max(ma_window, sigma_window)
+    recent_weekdays = weekdays[-recent:]
+    deseasonalised = demand[:, -recent:] / indices[:, recent_weekdays]
+    level = deseasonalised[:, -ma_window:].mean(axis=1)
+    sigma = deseasonalised[:, -sigma_window:].std(axis=1, ddof=1)
+
+    # Re-seasonalise the level over the coming days
+    future_weekdays = (first_day.weekday() + n_days + np.arange(lead_time + review_period)) % 7
+    lead_time_demand = level * indices[:, future_weekdays[:lead_time]].sum(axis=1)
+    cover_demand = level * indices[:, future_weekdays].sum(axis=1)
+
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * sigma * np.sqrt(lead_time)
+    reorder_point = lead_time_demand + safety_stock
+
+    stock = np.asarray(stock, dtype=np.float64)
+    reorder_threshold = np.asarray(reorder_threshold, dtype=np.float64)
+    fallback_target = np.maximum(RESTOCK_TARGET_MULTIPLIER * reorder_threshold, reorder_threshold + 1)
+    forecastable = (demand > 0).sum(axis=1) >= min_sale_days
+    order_up_to = np.where(forecastable, np.maximum(np.ceil(cover_demand + safety_stock), fallback_target),
+                           fallback_target)
+    needs_restock = stock <= np.where(forecastable, np.maximum(reorder_threshold, reorder_point), reorder_threshold)
+    recommended = np.where(needs_restock, np.maximum(order_up_to - stock, 0), 0).astype(np.int64)
+
+    velocity = demand[:, -ma_window:].mean(axis=1)
+    with np.errstate(divide='ignore'):
+        days_of_cover = np.where(velocity > 0, np.maximum(stock, 0) / velocity, np.inf)
+
+    return {
+        'velocity_per_day': velocity.round(3),
+        'forecast_lead_time_demand': lead_time_demand.round(2),
+        'safety_stock': safety_stock.round(2),
+        'reorder_point': reorder_point.round(2),
+        'order_up_to': order_up_to.astype(np.int64),
+        'days_of_cover': days_of_cover.round(1),
+        'needs_restock': needs_restock,
+        'recommended_quantity': recommended,
+        'method': np.where(forecastable, 'forecast', 'fallback'),
+    }
+
+
+def run(products_csv=None, transactions=None, source='file', output=None, end_date=None, days=HISTORY_DAYS,
+        table_prefix='', region=None, endpoint_url=None):
+    """
+    Load history and catalog, forecast, and write the recommendations CSV.
+
+    Returns:
+        tuple: (recommendations DataFrame, timings dict)
+    """
+    timings = {}
+    start = time.perf_counter()
+    products = pd.read_csv(products_csv or PRODUCTS_CSV, dtype={'sku': str},
+                           usecols=['sku', 'name', 'stock_quantity', 'reorder_threshold'])
+    products = products.drop_duplicates('sku').reset_index(drop=True)
+    timings['catalog'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if source == 'dynamodb':
+        if end_date is None:
+            raise ValueError('--end-date is required with --source dynamodb')
+        first = pd.Timestamp(end_date) - pd.Timedelta(days=days - 1)
+        lines = read_lines_dynamodb(first, days, f"{table_prefix}{TRANSACTIONS_TABLE}", region, endpoint_url)
+    else:
+        lines = read_lines(transactions)
+    demand, first_day = build_demand_matrix(lines, products['sku'].to_numpy(), end_date, days)
+    timings['demand_matrix'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = forecast(demand, first_day, products['stock_quantity'].fillna(0).to_numpy(),
+                      products['reorder_threshold'].fillna(0).to_numpy())
+    timings['forecast'] = time.perf_counter() - start
+
+    recommendations = products.assign(**result)[OUTPUT_COLUMNS]
+    output = output or FORECAST_CSV
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    recommendations.to_csv(output, index=False)
+    timings['units_in_window'] = float(demand.sum())
+    timings['first_day'] = first_day.date().isoformat()
+    timings['last_day'] = (first_day + pd.Timedelta(days=days - 1)).date().isoformat()
+    return recommendations, timings
+
+
+def load_order_up_to(path=None):
+    """
+    sku -> forecast order-up-to level ({} if the forecast has not been built).
+
+    Restock requests raised later subtract the stock at that moment, so the
+    level is used rather than the recommended_quantity computed here.
+    """
+    path = path or FORECAST_CSV
+    if not os.path.exists(path):
+        return {}
+    frame = pd.read_csv(path, dtype={'sku': str}, usecols=['sku', 'order_up_to'])
+    return dict(zip(frame['sku'], frame['order_up_to'].astype(int)))
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Forecast restock quantities for every SKU')
+    parser.add_argument('--products', help=f'Catalog CSV with stock_quantity and reorder_threshold '
+                                           f'(default: {PRODUCTS_CSV})')
+    parser.add_argument('--transactions', help='Line-item Parquet dataset, JSON Lines history or CSV '
+                                               f'(default: {TRANSACTION_ITEMS_PARQUET_DIR}, else '
+                                               f'{TRANSACTIONS_JSONL}, else {TRANSACTIONS_CSV})')
+    parser.add_argument('--source', choices=['file', 'dynamodb'], default='file', help='Where to read sales history')
+    parser.add_argument('--output', help=f'Recommendations CSV (default: {FORECAST_CSV})')
+    parser.add_argument('--end-date', help='Last day of history to use, YYYY-MM-DD (default: last day with sales)')
+    parser.add_argument('--days', type=int, default=HISTORY_DAYS, help='Days of history in the demand matrix')
+    parser.add_argument('--table-prefix', default='', help="Table name prefix for --source dynamodb, e.g. 'dev-'")
+    parser.add_argument('--region', default=DYNAMODB_REGION, help='AWS region')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("="*60)
+    print("RESTOCK QUANTITY FORECAST")
+    print("="*60)
+
+    recommendations, timings = run(args.products, args.transactions, args.source, args.output, args.end_date,
+                                   args.days, args.table_prefix, args.region, args.endpoint_url)
+    restock = recommendations[recommendations['needs_restock']]
+    print(f"✓ {len(recommendations):,} SKUs, history {timings['first_day']} to {timings['last_day']} "
+          f"({timings['units_in_window']:,.0f} units sold)")
+    print(f"  Catalog {timings['catalog']:.2f}s, history + demand matrix {timings['demand_matrix']:.2f}s, "
+          f"forecast {timings['forecast']:.2f}s")
+    fallback = int((recommendations['method'] == 'fallback').sum())
+    if fallback:
+        print(f"⚠ {fallback:,} SKUs sold on fewer than {MIN_SALE_DAYS} days - "
+              f"using {RESTOCK_TARGET_MULTIPLIER}x reorder threshold instead of a forecast")
+    print(f"✓ {len(restock):,} SKUs need restock, {int(restock['recommended_quantity'].sum()):,} units recommended")
+    print(f"✓ Saved to {args.output or FORECAST_CSV}")
+
+    if len(restock):
+        print("\nLargest recommendations:")
+        top = restock.nlargest(10, 'recommended_quantity')
+        for row in top.itertuples():
+            print(f"  {row.sku:>10s}  {str(row.name)[:36]:36s} stock {row.stock_quantity:>5} "
+                  f"threshold {row.reorder_threshold:>4}  velocity {row.velocity_per_day:6.2f}/day "
+                  f"-> order {row.recommended_quantity:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,16 +8,33 @@ Steps:
 3. Group transactions → Transaction History
 4. Simulate inventory → Add stock levels
 5. Normalize data → Clean, format, validate
+
+Incremental mode (--incremental FILE) processes only the rows of a new sales
+export that are past the stored watermark, updating per-SKU aggregates and
+appending new transactions instead of rebuilding from full history.
+
+Transaction history contract: a full rebuild writes the 25 MVP-selected
+transactions (see step3_group_transactions); incremental runs keep those and
+append every new transaction for catalog SKUs. --verify-incremental checks
+the outputs against exactly that (baseline selection + all later invoices).
+Rows dated at or before the watermark are skipped and counted; late-arriving
+rows need a full rebuild.
 """
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import uuid
 import re
 from collections import defaultdict
+import argparse
+import glob
+import gzip
+import json
 import os
 
+from pipeline_profiler import StageProfiler, write_report, load_report, compare_reports, DEFAULT_THRESHOLD
+
 # Get script directory and set paths relative to project root
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
@@ -27,6 +44,20 @@ INPUT_FILE = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail', 'Online Retail
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'datasets', 'uci-retail')
 TAX_RATE = 0.08  # 8% UK VAT approximation
 DATE_SHIFT_DAYS = 0  # Shift dates to recent (0 = keep original, 365 = shift 1 year forward)
+INVOICE_DATE_FORMAT = '%m/%d/%Y %H:%M'  # Raw export format, e.g. "12/1/2010 8:26"
+
+# Incremental mode state (watermark + per-SKU aggregates)
+STATE_FILE = os.path.join(OUTPUT_DIR, 'transform_state.json')
+SKU_STATS_FILE = os.path.join(OUTPUT_DIR, 'sku_sales_stats.csv')
+
+# Columnar / line-delimited transaction outputs
+TRANSACTIONS_JSONL = os.path.join(OUTPUT_DIR, 'transactions_history.jsonl.gz')
+TRANSACTIONS_PARQUET_DIR = os.path.join(OUTPUT_DIR, 'transactions_history_parquet')  # Nested items list
+TRANSACTION_ITEMS_PARQUET_DIR = os.path.join(OUTPUT_DIR, 'transaction_items_parquet')  # One row per line item
+
+# Profiling reports (--profile)
+PROFILE_DIR = os.path.join(OUTPUT_DIR, 'profile_reports')
+PROFILE_BASELINE = os.path.join(PROFILE_DIR, 'baseline.json')
 
 # Category inference keywords
 CATEGORY_KEYWORDS = {
@@ -63,20 +94,102 @@ def normalize_product_name(description):
     return name
 
 
-def infer_category(description):
-    """Infer product category from description keywords."""
-    if pd.isna(description) or description == '':
-        return 'General'
+def _keyword_trie_regex(keywords):
+    """
+    Build a prefix-factored regex matching any of the keywords.
     
-    description_lower = description.lower()
+    Shared prefixes are merged into a trie, so matching at a position costs the
+    keyword length rather than the number of keywords. Optional suffixes are
+    greedy, so the longest keyword starting at a position is the one returned.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True  # Terminal marker
     
-    # Check each category
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in description_lower:
-                return category
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
     
-    return 'General'
+    return build(trie)
+
+
+class CategoryClassifier:
+    """
+    Compiled keyword matcher for category inference.
+    
+    Equivalent to testing every keyword of every category in order (first
+    category wins), but scans each description once with a single combined
+    regex and memoises results per distinct description.
+    """
+    
+    def __init__(self, category_keywords, default='General'):
+        self.categories = list(category_keywords)
+        self.default = default
+        
+        # Highest-priority (lowest index) category for each keyword
+        priority = {}
+        for index, keywords in enumerate(category_keywords.values()):
+            for keyword in keywords:
+                priority.setdefault(keyword.lower(), index)
+        
+        # The regex returns the longest keyword at each position, so fold in
+        # the priority of any shorter keywords that are prefixes of it
+        self._priority = {
+            keyword: min(priority[keyword[:i]] for i in range(1, len(keyword) + 1) if keyword[:i] in priority)
+            for keyword in priority
+        }
+        self._pattern = re.compile('(?=(' + _keyword_trie_regex(priority) + '))')
+        self._cache = {}
+    
+    def _match(self, description_lower):
+        """Return the winning category for an already lowercased description."""
+        best = None
+        for match in self._pattern.finditer(description_lower):
+            index = self._priority[match.group(1)]
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return self.default if best is None else self.categories[best]
+    
+    def classify(self, description):
+        """Classify a single description (memoised)."""
+        if pd.isna(description) or description == '':
+            return self.default
+        category = self._cache.get(description)
+        if category is None:
+            category = self._match(description.lower())
+            self._cache[description] = category
+        return category
+    
+    def classify_series(self, descriptions):
+        """Classify a whole column, matching each distinct description only once."""
+        unique = pd.Series(descriptions.dropna().unique())
+        lowered = unique.astype(str).str.lower()
+        mapping = {}
+        for description, description_lower in zip(unique, lowered):
+            category = self._cache.get(description)
+            if category is None:
+                category = self._match(description_lower) if description_lower else self.default
+                self._cache[description] = category
+            mapping[description] = category
+        return descriptions.map(mapping).fillna(self.default)
+
+
+CATEGORY_CLASSIFIER = CategoryClassifier(CATEGORY_KEYWORDS)
+
+
+def infer_category(description):
+    """Infer product category from description keywords."""
+    return CATEGORY_CLASSIFIER.classify(description)
 
 
 def convert_price_to_cents(price):
@@ -86,28 +199,76 @@ def convert_price_to_cents(price):
     return int(round(float(price) * 100))
 
 
+def parse_invoice_datetimes(values):
+    """
+    Parse a column of invoice dates to datetimes in one vectorised pass.
+    
+    The export format ("12/1/2010 8:26") is tried first; only values that fail
+    it are re-parsed with format inference. Unparseable values become NaT.
+    """
+    values = pd.Series(values)
+    # Nanosecond resolution throughout, so re-parsed values keep their precision
+    parsed = pd.to_datetime(values, format=INVOICE_DATE_FORMAT, errors='coerce').dt.as_unit('ns')
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry].astype(str), format='mixed', errors='coerce').dt.as_unit('ns')
+    return parsed
+
+
+def parse_dates(values):
+    """
+    Parse a column of invoice dates to ISO 8601 strings.
+    
+    Output matches Timestamp.isoformat() + 'Z' at the source precision:
+    whole-second times have no fraction, sub-second times keep 6 or 9 digits.
+    
+    Args:
+        values: Series of raw InvoiceDate values (strings or datetimes)
+    
+    Returns:
+        tuple: (Series of ISO strings, None where unparseable; boolean mask of
+        rows that had a value but failed to parse)
+    """
+    values = pd.Series(values)
+    parsed = parse_invoice_datetimes(values)
+    failed = parsed.isna() & values.notna()
+    
+    # Shift dates if needed (for demo purposes)
+    if DATE_SHIFT_DAYS > 0:
+        parsed = parsed + pd.Timedelta(days=DATE_SHIFT_DAYS)
+    
+    # Format each distinct timestamp once (many rows share an invoice time)
+    unique, inverse = np.unique(parsed.values.astype('datetime64[ns]'), return_inverse=True)
+    seconds = unique.astype('datetime64[s]')
+    formatted = seconds.astype(str).astype(object)
+    # Sub-second parts are rare (the export has minute precision); append them as isoformat does
+    remainder = (unique - seconds).astype('int64')
+    for i in np.flatnonzero(~np.isnat(unique) & (remainder > 0)):
+        ns = int(remainder[i])
+        formatted[i] += f".{ns // 1000:06d}" if ns % 1000 == 0 else f".{ns:09d}"
+    iso = pd.Series((formatted + 'Z')[inverse.ravel()], index=parsed.index, dtype=object)
+    iso = iso.where(parsed.notna(), None)
+    return iso, failed
+
+
 def parse_date(date_str):
-    """Parse date string to ISO 8601 format."""
+    """Parse a single date string to ISO 8601 format (None if unparseable)."""
     if pd.isna(date_str):
         return None
-    
-    try:
-        # Handle format: "12/1/2010 8:26"
-        dt = pd.to_datetime(date_str, format='%m/%d/%Y %H:%M', errors='coerce')
-        if pd.isna(dt):
-            # Try alternative format
-            dt = pd.to_datetime(date_str, errors='coerce')
-        
-        if pd.isna(dt):
-            return None
-        
-        # Shift date if needed (for demo purposes)
-        if DATE_SHIFT_DAYS > 0:
-            dt = dt + timedelta(days=DATE_SHIFT_DAYS)
-        
-        return dt.isoformat() + 'Z'
-    except:
-        return None
+    iso, _ = parse_dates(pd.Series([date_str]))
+    return iso.iloc[0]
+
+
+def report_date_failures(df, failed):
+    """Print and save rows whose InvoiceDate could not be parsed."""
+    if not failed.any():
+        return
+    failures = df[failed]
+    failures_file = os.path.join(OUTPUT_DIR, 'date_parse_failures.csv')
+    failures.to_csv(failures_file, index=False)
+    print(f"⚠ {len(failures)} rows with unparseable InvoiceDate "
+          f"({failures['InvoiceNo'].nunique()} invoices), e.g. {failures['InvoiceDate'].iloc[0]!r}")
+    print(f"  Saved to: {failures_file}")
 
 
 def calculate_stock_level(sales_frequency, total_quantity_sold, is_low_stock):
@@ -160,12 +321,170 @@ def assign_supplier(sku, category):
     return supplier['name'], supplier['contact']
 
 
+def filter_clean_rows(df):
+    """Filter out POST items and invalid rows from raw sales data."""
+    return df[
+        (df['StockCode'].notna()) &
+        (df['Description'].notna()) &
+        (df['UnitPrice'] > 0) &
+        (~df['StockCode'].astype(str).str.upper().str.contains('POST', na=False))
+    ].copy()
+
+
+def compute_product_stats(df_clean):
+    """Aggregate cleaned sales rows into per-SKU description, price and sales stats."""
+    # Group by StockCode to get unique products
+    product_stats = df_clean.groupby('StockCode').agg({
+        'Description': lambda x: x.mode()[0] if len(x.mode()) > 0 else x.iloc[0],  # Most common description
+        'UnitPrice': 'mean',  # Average price
+        'Quantity': ['sum', 'count'],  # Total sold, frequency
+    }).reset_index()
+    
+    product_stats.columns = ['sku', 'description', 'avg_price', 'total_quantity_sold', 'sales_frequency']
+    return product_stats
+
+
+def transactions_to_csv_frame(transactions):
+    """Build a CSV-ready DataFrame, JSON-encoding each transaction's items list."""
+    transactions_for_csv = []
+    for txn in transactions:
+        txn_copy = txn.copy()
+        # Compact, so convert_csv_to_json.py can splice it into compact output unchanged
+        txn_copy['items'] = json.dumps(txn['items'], separators=(',', ':'))
+        transactions_for_csv.append(txn_copy)
+    return pd.DataFrame(transactions_for_csv)
+
+
+def _normalize_transaction(txn):
+    """Return a copy of a transaction with SKUs as strings (matches the DynamoDB schema)."""
+    txn_copy = txn.copy()
+    txn_copy['items'] = [{**item, 'sku': str(item['sku'])} for item in txn['items']]
+    return txn_copy
+
+
+def save_transactions_jsonl(transactions, path=None, append=False):
+    """
+    Write transactions as gzip-compressed JSON Lines (one transaction per line).
+    
+    Appending adds a new gzip member, which standard gzip readers treat as a
+    continuation of the same stream.
+    """
+    path = path or TRANSACTIONS_JSONL
+    with gzip.open(path, 'at' if append else 'wt', encoding='utf-8') as f:
+        for txn in transactions:
+            f.write(json.dumps(_normalize_transaction(txn), separators=(',', ':')))
+            f.write('\n')
+    return path
+
+
+def iter_transactions_jsonl(path=None):
+    """Stream transactions from a JSON Lines file (optionally gzip-compressed)."""
+    path = path or TRANSACTIONS_JSONL
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _parquet_schemas():
+    """Return (nested transactions schema, exploded line items schema)."""
+    import pyarrow as pa
+    
+    item_fields = [
+        ('sku', pa.string()),
+        ('name', pa.string()),
+        ('quantity', pa.int32()),
+        ('unit_price', pa.int64()),
+        ('line_total', pa.int64()),
+    ]
+    transaction_schema = pa.schema([
+        ('transaction_id', pa.string()),
+        ('timestamp', pa.string()),
+        ('user_id', pa.string()),
+        ('cashier_name', pa.string()),
+        ('items', pa.list_(pa.struct(item_fields))),
+        ('subtotal', pa.int64()),
+        ('tax', pa.int64()),
+        ('discount_total', pa.int64()),
+        ('total', pa.int64()),
+        ('payment_method', pa.string()),
+        ('status', pa.string()),
+    ])
+    items_schema = pa.schema([
+        ('transaction_id', pa.string()),
+        ('timestamp', pa.string()),
+    ] + item_fields)
+    return transaction_schema, items_schema
+
+
+def _next_part_path(dataset_dir, append):
+    """Return the next part file path in a Parquet dataset directory."""
+    os.makedirs(dataset_dir, exist_ok=True)
+    parts = sorted(glob.glob(os.path.join(dataset_dir, 'part-*.parquet')))
+    if not append:
+        for part in parts:
+            os.remove(part)
+        parts = []
+    return os.path.join(dataset_dir, f"part-{len(parts):05d}.parquet")
+
+
+def save_transactions_parquet(transactions, append=False):
+    """
+    Write transactions to Parquet datasets: nested (items as list<struct>) and
+    exploded (one row per line item). Each call writes a new part file, so
+    incremental runs append without rewriting history.
+    
+    Returns:
+        tuple: (nested part path, items part path), or None if pyarrow is missing
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("⚠ pyarrow not installed - skipping Parquet outputs (pip install pyarrow)")
+        return None
+    
+    transaction_schema, items_schema = _parquet_schemas()
+    records = [_normalize_transaction(txn) for txn in transactions]
+    line_items = [
+        {'transaction_id': txn['transaction_id'], 'timestamp': txn['timestamp'], **item}
+        for txn in records for item in txn['items']
+    ]
+    
+    nested_path = _next_part_path(TRANSACTIONS_PARQUET_DIR, append)
+    items_path = _next_part_path(TRANSACTION_ITEMS_PARQUET_DIR, append)
+    pq.write_table(pa.Table.from_pylist(records, schema=transaction_schema), nested_path, compression='zstd')
+    pq.write_table(pa.Table.from_pylist(line_items, schema=items_schema), items_path, compression='zstd')
+    return nested_path, items_path
+
+
+def iter_transactions_parquet(dataset_dir=None, batch_size=10000):
+    """Stream transactions from a nested Parquet dataset in record batches."""
+    dataset_dir = dataset_dir or TRANSACTIONS_PARQUET_DIR
+    import pyarrow.dataset as ds
+    
+    for batch in ds.dataset(dataset_dir, format='parquet').to_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def _path_size(path):
+    """Return the size in bytes of a file or of all files under a directory."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
 def step1_convert_excel_to_csv():
     """Step 1: Convert Excel to CSV."""
     print("Step 1: Converting Excel to CSV...")
     
     try:
-        df = pd.read_excel(INPUT_FILE)
+        if INPUT_FILE.lower().endswith(('.xlsx', '.xls')):
+            df = pd.read_excel(INPUT_FILE)
+        else:
+            df = pd.read_csv(INPUT_FILE)
         output_csv = os.path.join(OUTPUT_DIR, 'Online_Retail_Raw.csv')
         df.to_csv(output_csv, index=False)
         print(f"✓ Converted to: {output_csv}")
@@ -180,28 +499,14 @@ def step2_extract_products(df):
     """Step 2: Extract unique products and create product catalog."""
     print("\nStep 2: Extracting unique products...")
     
-    # Filter out POST items and invalid data
-    df_clean = df[
-        (df['StockCode'].notna()) &
-        (df['Description'].notna()) &
-        (df['UnitPrice'] > 0) &
-        (~df['StockCode'].str.upper().str.contains('POST', na=False))
-    ].copy()
-    
-    # Group by StockCode to get unique products
-    product_stats = df_clean.groupby('StockCode').agg({
-        'Description': lambda x: x.mode()[0] if len(x.mode()) > 0 else x.iloc[0],  # Most common description
-        'UnitPrice': 'mean',  # Average price
-        'Quantity': ['sum', 'count'],  # Total sold, frequency
-    }).reset_index()
-    
-    product_stats.columns = ['sku', 'description', 'avg_price', 'total_quantity_sold', 'sales_frequency']
+    df_clean = filter_clean_rows(df)
+    product_stats = compute_product_stats(df_clean)
     
     # Normalize product names
     product_stats['name'] = product_stats['description'].apply(normalize_product_name)
     
     # Infer categories
-    product_stats['category'] = product_stats['description'].apply(infer_category)
+    product_stats['category'] = CATEGORY_CLASSIFIER.classify_series(product_stats['description'])
     
     # Convert prices to cents
     product_stats['price'] = product_stats['avg_price'].apply(convert_price_to_cents)
@@ -299,10 +604,8 @@ def step2_extract_products(df):
     return products_df, df_clean
 
 
-def step3_group_transactions(df_clean, products_df):
-    """Step 3: Group transactions and create transaction history."""
-    print("\nStep 3: Grouping transactions...")
-    
+def build_transactions(df_clean, products_df):
+    """Group cleaned sales rows for catalog SKUs into transaction records."""
     # Filter to only include products in our catalog
     valid_skus = set(products_df['sku'].values)
     df_clean = df_clean[df_clean['StockCode'].isin(valid_skus)].copy()
@@ -311,6 +614,10 @@ def step3_group_transactions(df_clean, products_df):
     product_lookup = dict(zip(products_df['sku'], products_df['name']))
     price_lookup = dict(zip(products_df['sku'], products_df['price']))
     
+    # Parse all invoice dates once, up front
+    df_clean['timestamp'], failed = parse_dates(df_clean['InvoiceDate'])
+    report_date_failures(df_clean, failed)
+    
     # Group by InvoiceNo
     transactions = []
     
@@ -320,10 +627,9 @@ def step3_group_transactions(df_clean, products_df):
             continue
         
         # Get transaction date (use first row's date)
-        invoice_date = group['InvoiceDate'].iloc[0]
-        timestamp = parse_date(invoice_date)
+        timestamp = group['timestamp'].iloc[0]
         
-        if not timestamp:
+        if pd.isna(timestamp):
             continue
         
         # Build items array
@@ -367,6 +673,15 @@ def step3_group_transactions(df_clean, products_df):
             'status': 'completed'
         })
     
+    return transactions
+
+
+def step3_group_transactions(df_clean, products_df):
+    """Step 3: Group transactions and create transaction history."""
+    print("\nStep 3: Grouping transactions...")
+    
+    transactions = build_transactions(df_clean, products_df)
+    
     # Select diverse transactions for MVP (mix of sizes)
     # Sort by item count and select diverse set
     transactions.sort(key=lambda x: len(x['items']))
@@ -427,21 +742,23 @@ def step5_save_outputs(products_df, transactions):
     print(f"  Products: {len(products_df)}")
     
     # Save transactions (handle complex items structure)
-    # For CSV, we'll need to convert items list to JSON string
-    transactions_for_csv = []
-    for txn in transactions:
-        txn_copy = txn.copy()
-        # Convert items list to JSON string for CSV
-        import json
-        txn_copy['items'] = json.dumps(txn['items'])
-        transactions_for_csv.append(txn_copy)
-    
-    transactions_df = pd.DataFrame(transactions_for_csv)
+    transactions_df = transactions_to_csv_frame(transactions)
     transactions_file = os.path.join(OUTPUT_DIR, 'transactions_history.csv')
     transactions_df.to_csv(transactions_file, index=False)
     print(f"✓ Transactions history: {transactions_file}")
     print(f"  Transactions: {len(transactions)}")
     
+    # Save line-delimited and columnar copies (items kept as structured lists)
+    save_transactions_jsonl(transactions)
+    print(f"✓ Transactions JSON Lines: {TRANSACTIONS_JSONL}")
+    parquet_paths = save_transactions_parquet(transactions)
+    if parquet_paths:
+        print(f"✓ Transactions Parquet: {TRANSACTIONS_PARQUET_DIR}")
+        print(f"✓ Line items Parquet: {TRANSACTION_ITEMS_PARQUET_DIR}")
+    print(f"  Sizes: CSV {_path_size(transactions_file):,} B, "
+          f"JSONL.gz {_path_size(TRANSACTIONS_JSONL):,} B, "
+          f"Parquet {_path_size(TRANSACTIONS_PARQUET_DIR):,} B")
+    
     # Summary
     print("\n" + "="*60)
     print("TRANSFORMATION SUMMARY")
@@ -459,11 +776,372 @@ def step5_save_outputs(products_df, transactions):
     print(f"\nOutput files:")
     print(f"  {products_file}")
     print(f"  {transactions_file}")
+    print(f"  {TRANSACTIONS_JSONL}")
+    if parquet_paths:
+        print(f"  {TRANSACTIONS_PARQUET_DIR}/")
+        print(f"  {TRANSACTION_ITEMS_PARQUET_DIR}/")
     print("="*60)
 
 
-def main():
-    """Main execution function."""
+def load_raw_export(path):
+    """Load a raw sales export (.xlsx or .csv) with SKU and invoice columns as strings."""
+    dtypes = {'StockCode': str, 'InvoiceNo': str}
+    if path.lower().endswith(('.xlsx', '.xls')):
+        return pd.read_excel(path, dtype=dtypes)
+    return pd.read_csv(path, dtype=dtypes)
+
+
+def invoice_order_keys(df):
+    """Return (invoice datetime, invoice number) columns used for watermark ordering."""
+    invoice_dates = parse_invoice_datetimes(df['InvoiceDate'])
+    invoice_nos = df['InvoiceNo'].astype(str)
+    return invoice_dates, invoice_nos
+
+
+def past_watermark(invoice_dates, invoice_nos, watermark):
+    """Boolean mask of dated rows ordered after the watermark (all dated rows if there is none)."""
+    mask = invoice_dates.notna()
+    if watermark:
+        wm_date = pd.Timestamp(watermark['invoice_date'])
+        wm_no = watermark['invoice_no']
+        mask &= (invoice_dates > wm_date) | ((invoice_dates == wm_date) & (invoice_nos > wm_no))
+    return mask
+
+
+def max_watermark(invoice_dates, invoice_nos):
+    """Return the highest (InvoiceDate, InvoiceNo) key as a watermark dict, or None."""
+    keys = pd.DataFrame({'date': invoice_dates, 'no': invoice_nos}).dropna(subset=['date'])
+    if keys.empty:
+        return None
+    last = keys.sort_values(['date', 'no']).iloc[-1]
+    return {'invoice_date': last['date'].isoformat(), 'invoice_no': last['no']}
+
+
+def aggregate_sku_state(df_clean):
+    """
+    Aggregate cleaned sales rows into mergeable per-SKU state.
+    
+    Sums and counts (rather than means/modes) are kept so that the state of
+    several deltas can be merged and still reproduce compute_product_stats.
+    
+    Returns:
+        dict: {sku: {total_quantity_sold, sales_frequency, price_sum, price_count, descriptions}}
+    """
+    state = {}
+    if df_clean.empty:
+        return state
+    
+    skus = df_clean['StockCode'].astype(str)
+    grouped = df_clean.groupby(skus)
+    totals = pd.DataFrame({
+        'total_quantity_sold': grouped['Quantity'].sum(),
+        'sales_frequency': grouped['Quantity'].count(),
+        'price_sum': grouped['UnitPrice'].sum(),
+        'price_count': grouped['UnitPrice'].count(),
+    })
+    description_counts = df_clean.groupby([skus, df_clean['Description']]).size()
+    
+    for sku, row in totals.iterrows():
+        state[sku] = {
+            'total_quantity_sold': int(row['total_quantity_sold']),
+            'sales_frequency': int(row['sales_frequency']),
+            'price_sum': float(row['price_sum']),
+            'price_count': int(row['price_count']),
+            'descriptions': {},
+        }
+    for (sku, description), count in description_counts.items():
+        state[sku]['descriptions'][description] = int(count)
+    
+    return state
+
+
+def merge_sku_state(state, delta_state):
+    """Merge delta per-SKU aggregates into the persistent state in place."""
+    for sku, delta in delta_state.items():
+        current = state.setdefault(sku, {
+            'total_quantity_sold': 0,
+            'sales_frequency': 0,
+            'price_sum': 0.0,
+            'price_count': 0,
+            'descriptions': {},
+        })
+        current['total_quantity_sold'] += delta['total_quantity_sold']
+        current['sales_frequency'] += delta['sales_frequency']
+        current['price_sum'] += delta['price_sum']
+        current['price_count'] += delta['price_count']
+        for description, count in delta['descriptions'].items():
+            current['descriptions'][description] = current['descriptions'].get(description, 0) + count
+    return state
+
+
+def sku_state_to_stats(state):
+    """Convert per-SKU state into the same columns as compute_product_stats."""
+    rows = []
+    for sku, agg in state.items():
+        # Most common description; ties resolved like Series.mode (sorted, first)
+        top_count = max(agg['descriptions'].values())
+        description = min(d for d, c in agg['descriptions'].items() if c == top_count)
+        rows.append({
+            'sku': sku,
+            'description': description,
+            'avg_price': agg['price_sum'] / agg['price_count'] if agg['price_count'] else 0.0,
+            'total_quantity_sold': agg['total_quantity_sold'],
+            'sales_frequency': agg['sales_frequency'],
+        })
+    columns = ['sku', 'description', 'avg_price', 'total_quantity_sold', 'sales_frequency']
+    return pd.DataFrame(rows, columns=columns).sort_values('sku').reset_index(drop=True)
+
+
+def build_incremental_state(df, transactions=()):
+    """
+    Build a fresh incremental state (watermark + SKU aggregates) from raw sales rows.
+    
+    Args:
+        df: Raw sales rows of the full rebuild
+        transactions: Transactions the full rebuild wrote (the MVP selection),
+            recorded so --verify-incremental knows the baseline of the history
+    """
+    invoice_dates, invoice_nos = invoice_order_keys(df)
+    dated = df[invoice_dates.notna()]
+    watermark = max_watermark(invoice_dates, invoice_nos)
+    return {
+        'watermark': watermark,
+        'rows_processed': int(len(dated)),
+        'rows_skipped': 0,
+        'baseline_watermark': watermark,
+        'baseline_transaction_ids': [str(txn['transaction_id']) for txn in transactions],
+        'skus': aggregate_sku_state(filter_clean_rows(dated)),
+    }
+
+
+def empty_incremental_state():
+    """State for incremental runs with no full rebuild behind them (empty baseline)."""
+    return {'watermark': None, 'rows_processed': 0, 'rows_skipped': 0,
+            'baseline_watermark': None, 'baseline_transaction_ids': [], 'skus': {}}
+
+
+def load_incremental_state():
+    """Load the incremental state file, or None if no run has recorded one yet."""
+    if not os.path.exists(STATE_FILE):
+        return None
+    with open(STATE_FILE, 'r') as f:
+        return json.load(f)
+
+
+def save_incremental_state(state):
+    """Persist incremental state atomically and refresh the per-SKU stats CSV."""
+    tmp_file = STATE_FILE + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, STATE_FILE)
+    
+    stats_df = sku_state_to_stats(state['skus'])
+    stats_df.to_csv(SKU_STATS_FILE, index=False)
+
+
+def run_incremental(export_paths):
+    """
+    Process only the rows of new sales exports that are past the stored watermark.
+    
+    Rows ordered at or before the watermark (InvoiceDate, InvoiceNo) are skipped,
+    so re-feeding an export is a no-op. Skipped rows are counted; an export that
+    mixes new and skipped rows warns, since those are late arrivals that only a
+    full rebuild picks up. New rows update the per-SKU aggregates and every new
+    invoice for catalog SKUs is appended to the transaction outputs (the MVP
+    selection applies to full rebuilds only).
+    
+    Args:
+        export_paths: Raw sales export files (.xlsx/.csv), in chronological order
+    
+    Returns:
+        dict: Updated incremental state
+    """
+    state = load_incremental_state()
+    if state is None:
+        state = empty_incremental_state()
+        print("⚠ No incremental state found - starting from an empty watermark")
+    
+    products_df = pd.read_csv(os.path.join(OUTPUT_DIR, 'products_catalog.csv'), dtype={'sku': str})
+    transactions_file = os.path.join(OUTPUT_DIR, 'transactions_history.csv')
+    
+    for path in export_paths:
+        print(f"\nIncremental: {path}")
+        df = load_raw_export(path)
+        invoice_dates, invoice_nos = invoice_order_keys(df)
+        
+        is_new = past_watermark(invoice_dates, invoice_nos, state['watermark'])
+        delta = df[is_new]
+        undated = int(invoice_dates.isna().sum())
+        skipped = len(df) - len(delta) - undated
+        print(f"  Rows: {len(df)} (new: {len(delta)}, at or before watermark: {skipped}, unparseable date: {undated})")
+        state['rows_skipped'] = state.get('rows_skipped', 0) + skipped
+        if delta.empty:
+            save_incremental_state(state)
+            continue
+        if skipped:
+            print(f"  ⚠ Skipped {skipped} rows dated at or before the watermark alongside new rows - "
+                  f"late arrivals are not applied incrementally; run a full rebuild to include them")
+        
+        delta_clean = filter_clean_rows(delta)
+        merge_sku_state(state['skus'], aggregate_sku_state(delta_clean))
+        
+        transactions = build_transactions(delta_clean, products_df)
+        if transactions:
+            write_header = not os.path.exists(transactions_file)
+            transactions_to_csv_frame(transactions).to_csv(
+                transactions_file, mode='a', header=write_header, index=False
+            )
+            save_transactions_jsonl(transactions, append=True)
+            save_transactions_parquet(transactions, append=True)
+        
+        state['watermark'] = max_watermark(invoice_dates[is_new], invoice_nos[is_new])
+        state['rows_processed'] += int(len(delta))
+        save_incremental_state(state)
+        
+        print(f"  ✓ Updated {delta_clean['StockCode'].nunique()} SKUs, appended {len(transactions)} transactions")
+        print(f"  Watermark: {state['watermark']['invoice_date']} / {state['watermark']['invoice_no']}")
+    
+    return state
+
+
+def _line_items(items):
+    """Comparable (sku, quantity, unit_price) tuples for a transaction's items."""
+    return sorted((str(item['sku']), int(item['quantity']), int(item['unit_price'])) for item in items)
+
+
+def read_transaction_outputs():
+    """
+    Transactions in each written output as {output name: [(transaction_id, line items)]}.
+    
+    Parquet is included when pyarrow is installed and the dataset exists.
+    """
+    outputs = {}
+    transactions_file = os.path.join(OUTPUT_DIR, 'transactions_history.csv')
+    if os.path.exists(transactions_file):
+        df = pd.read_csv(transactions_file, dtype={'transaction_id': str}, usecols=['transaction_id', 'items'])
+        outputs['csv'] = [(txn_id, _line_items(json.loads(items))) for txn_id, items in zip(df['transaction_id'], df['items'])]
+    if os.path.exists(TRANSACTIONS_JSONL):
+        outputs['jsonl'] = [(str(txn['transaction_id']), _line_items(txn['items']))
+                            for txn in iter_transactions_jsonl()]
+    if os.path.isdir(TRANSACTIONS_PARQUET_DIR):
+        try:
+            outputs['parquet'] = [(str(txn['transaction_id']), _line_items(txn['items']))
+                                  for txn in iter_transactions_parquet()]
+        except ImportError:
+            pass
+    return outputs
+
+
+def check_transaction_outputs(state, df):
+    """
+    Compare the transaction outputs with the incremental contract: the baseline
+    MVP selection followed by every transaction from rows past the baseline watermark.
+    
+    Args:
+        state: Incremental state
+        df: All raw sales rows (full history)
+    
+    Returns:
+        tuple: (number of expected transactions, list of problems)
+    """
+    products_df = pd.read_csv(os.path.join(OUTPUT_DIR, 'products_catalog.csv'), dtype={'sku': str})
+    df_clean = filter_clean_rows(df)
+    rebuilt = {str(txn['transaction_id']): _line_items(txn['items'])
+               for txn in build_transactions(df_clean, products_df)}
+    
+    invoice_dates, invoice_nos = invoice_order_keys(df_clean)
+    later = set(invoice_nos[past_watermark(invoice_dates, invoice_nos, state.get('baseline_watermark'))])
+    baseline_ids = state.get('baseline_transaction_ids', [])
+    appended_ids = {txn_id for txn_id in rebuilt if txn_id in later}
+    
+    outputs = read_transaction_outputs()
+    if not outputs:
+        return len(baseline_ids) + len(appended_ids), ["no transaction outputs found"]
+    
+    problems = []
+    for name, records in outputs.items():
+        ids = [txn_id for txn_id, _ in records]
+        if len(ids) != len(set(ids)):
+            problems.append(f"{name}: {len(ids) - len(set(ids))} duplicate transactions")
+        if ids[:len(baseline_ids)] != baseline_ids:
+            problems.append(f"{name}: baseline MVP selection not preserved")
+        appended = set(ids[len(baseline_ids):])
+        if appended != appended_ids:
+            problems.append(f"{name}: appended transactions differ from full rebuild "
+                            f"(missing: {len(appended_ids - appended)}, extra: {len(appended - appended_ids)})")
+        mismatched = [txn_id for txn_id, items in records if txn_id in rebuilt and rebuilt[txn_id] != items]
+        if mismatched:
+            problems.append(f"{name}: line items differ for {len(mismatched)} transactions, e.g. {mismatched[0]}")
+    return len(baseline_ids) + len(appended_ids), problems
+
+
+def verify_incremental_state(export_paths):
+    """
+    Check that the incremental state and transaction outputs match a full
+    rebuild over the given exports.
+    
+    Args:
+        export_paths: Every raw export fed to the pipeline so far (full history)
+    
+    Returns:
+        bool: True if SKU aggregates, watermark and transaction outputs match
+    """
+    state = load_incremental_state()
+    if state is None:
+        print(f"✗ No incremental state at {STATE_FILE}")
+        return False
+    
+    df = pd.concat([load_raw_export(path) for path in export_paths], ignore_index=True)
+    invoice_dates, invoice_nos = invoice_order_keys(df)
+    expected = compute_product_stats(filter_clean_rows(df[invoice_dates.notna()]))
+    expected['sku'] = expected['sku'].astype(str)
+    expected = expected.sort_values('sku').reset_index(drop=True)
+    actual = sku_state_to_stats(state['skus'])
+    
+    problems = []
+    if set(expected['sku']) != set(actual['sku']):
+        missing = set(expected['sku']) - set(actual['sku'])
+        extra = set(actual['sku']) - set(expected['sku'])
+        problems.append(f"SKU sets differ (missing: {len(missing)}, extra: {len(extra)})")
+    else:
+        for column in ['description', 'total_quantity_sold', 'sales_frequency']:
+            diff = expected[column].values != actual[column].values
+            if diff.any():
+                problems.append(f"{column} differs for {int(diff.sum())} SKUs, e.g. {expected['sku'][diff.argmax()]}")
+        price_diff = ~np.isclose(expected['avg_price'].values, actual['avg_price'].values)
+        if price_diff.any():
+            problems.append(f"avg_price differs for {int(price_diff.sum())} SKUs")
+    
+    expected_watermark = max_watermark(invoice_dates, invoice_nos)
+    if expected_watermark != state['watermark']:
+        problems.append(f"watermark {state['watermark']} != {expected_watermark}")
+    
+    transaction_count, transaction_problems = check_transaction_outputs(state, df[invoice_dates.notna()])
+    problems.extend(transaction_problems)
+    
+    if state.get('rows_skipped'):
+        print(f"  Rows skipped at or before the watermark so far: {state['rows_skipped']}")
+    if problems:
+        print("✗ Incremental state does not match full rebuild:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return False
+    
+    print(f"✓ Incremental state matches full rebuild ({len(actual)} SKUs, {state['rows_processed']} rows, "
+          f"{transaction_count} transactions)")
+    return True
+
+
+def main(profile=False, cprofile=False, save_baseline=False):
+    """
+    Main execution function.
+    
+    Args:
+        profile: Record wall/CPU time, peak RSS and rows in/out per step and
+            write a JSON report to PROFILE_DIR
+        cprofile: Also dump cProfile stats per step (implies profile)
+        save_baseline: Store the report as the baseline for --compare-profile
+    """
     print("="*60)
     print("AGENTIC RETAIL OS - DATA TRANSFORMATION")
     print("="*60)
@@ -471,28 +1149,61 @@ def main():
     print(f"Output directory: {OUTPUT_DIR}")
     print()
     
+    profile = profile or cprofile or save_baseline
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    profiler = StageProfiler(
+        enabled=profile,
+        cprofile_dir=os.path.join(PROFILE_DIR, f"cprofile_{run_id}") if cprofile else None,
+    )
+    
     try:
         # Step 1: Convert Excel to CSV
-        df = step1_convert_excel_to_csv()
+        with profiler.stage('step1_convert_excel_to_csv') as stage:
+            df = step1_convert_excel_to_csv()
+            stage['rows_out'] = len(df)
         
         # Step 2: Extract products
-        products_df, df_clean = step2_extract_products(df)
+        with profiler.stage('step2_extract_products', rows_in=len(df)) as stage:
+            products_df, df_clean = step2_extract_products(df)
+            stage['rows_out'] = len(products_df)
         
         # Step 3: Group transactions
-        transactions = step3_group_transactions(df_clean, products_df)
+        with profiler.stage('step3_group_transactions', rows_in=len(df_clean)) as stage:
+            transactions = step3_group_transactions(df_clean, products_df)
+            stage['rows_out'] = len(transactions)
         
         # Step 4: Normalize data
-        products_df, transactions = step4_normalize_data(products_df, transactions)
+        with profiler.stage('step4_normalize_data', rows_in=len(products_df) + len(transactions)) as stage:
+            products_df, transactions = step4_normalize_data(products_df, transactions)
+            stage['rows_out'] = len(products_df) + len(transactions)
         
         # Step 5: Save outputs
-        step5_save_outputs(products_df, transactions)
+        with profiler.stage('step5_save_outputs', rows_in=len(products_df) + len(transactions)) as stage:
+            step5_save_outputs(products_df, transactions)
+            stage['rows_out'] = len(products_df) + len(transactions)
+        
+        # Record watermark and SKU aggregates for later incremental runs
+        with profiler.stage('save_incremental_state', rows_in=len(df)) as stage:
+            state = build_incremental_state(df, transactions)
+            save_incremental_state(state)
+            stage['rows_out'] = len(state['skus'])
+        print(f"✓ Incremental state: {STATE_FILE}")
+        
+        if profile:
+            profiler.print_summary()
+            report = profiler.report(input_file=INPUT_FILE, run_id=run_id)
+            report_file = write_report(report, os.path.join(PROFILE_DIR, f"transform_profile_{run_id}.json"))
+            print(f"✓ Profile report: {report_file}")
+            if save_baseline:
+                write_report(report, PROFILE_BASELINE)
+                print(f"✓ Saved as baseline: {PROFILE_BASELINE}")
         
         print("\n✓ Transformation complete!")
         print("\nNext steps:")
         print("  1. Review products_catalog.csv")
         print("  2. Review transactions_history.csv")
         print("  3. Run image generation script")
-        print("  4. Import to DynamoDB via NoSQL Workbench")
+        print("  4. Load into DynamoDB: python load_dynamodb.py")
         
     except Exception as e:
         print(f"\n✗ Error during transformation: {e}")
@@ -501,6 +1212,184 @@ def main():
         raise
 
 
+def compare_profile(report_file, baseline_file=None, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare a --profile report against the stored baseline.
+    
+    Returns:
+        bool: True if no stage regressed beyond the threshold
+    """
+    baseline_file = baseline_file or PROFILE_BASELINE
+    current = load_report(report_file)
+    baseline = load_report(baseline_file)
+    
+    print("="*60)
+    print("PROFILE COMPARISON")
+    print("="*60)
+    print(f"Current:  {report_file} ({current.get('input_file')})")
+    print(f"Baseline: {baseline_file} ({baseline.get('input_file')})")
+    print(f"Threshold: {threshold:.0%}")
+    print()
+    regressions = compare_reports(current, baseline, threshold)
+    print()
+    if regressions:
+        print(f"✗ {len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return False
+    print("✓ No regressions against baseline")
+    return True
+
+
+def infer_category_naive(description, category_keywords=CATEGORY_KEYWORDS):
+    """Reference nested-loop category inference (baseline for benchmarks)."""
+    if pd.isna(description) or description == '':
+        return 'General'
+    
+    description_lower = description.lower()
+    
+    for category, keywords in category_keywords.items():
+        for keyword in keywords:
+            if keyword in description_lower:
+                return category
+    
+    return 'General'
+
+
+def build_synthetic_taxonomy(n_categories, keywords_per_category, seed=42):
+    """Generate a random keyword taxonomy, seeded with the real CATEGORY_KEYWORDS first."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    taxonomy = {category: list(keywords) for category, keywords in CATEGORY_KEYWORDS.items()}
+    while len(taxonomy) < n_categories:
+        keywords = [''.join(rng.choice(letters, size=rng.integers(3, 10))) for _ in range(keywords_per_category)]
+        taxonomy[f'Category {len(taxonomy)}'] = keywords
+    return taxonomy
+
+
+def benchmark_category_classifier(n_rows=20000, seed=42):
+    """
+    Compare the compiled classifier with the nested-loop baseline.
+    
+    Runs the current taxonomy and a scaled one (hundreds of categories,
+    thousands of keywords) over synthetic descriptions, checks that both
+    implementations agree and prints rows/sec for each.
+    """
+    import time
+    
+    rng = np.random.default_rng(seed)
+    scenarios = [
+        ('current', CATEGORY_KEYWORDS),
+        ('scaled', build_synthetic_taxonomy(300, 10, seed)),
+    ]
+    
+    print("="*60)
+    print("CATEGORY CLASSIFIER BENCHMARK")
+    print("="*60)
+    for label, taxonomy in scenarios:
+        keywords = [keyword for words in taxonomy.values() for keyword in words]
+        filler = ['vintage', 'set', 'of', 'red', 'large', 'small', 'retro', 'design', 'pack', 'blue']
+        # ~20% distinct descriptions, as in real sales exports
+        distinct = [
+            ' '.join(rng.choice(filler + keywords[:len(keywords) // 2] if i % 2 else filler, size=4)).upper()
+            for i in range(max(1, n_rows // 5))
+        ]
+        descriptions = pd.Series(rng.choice(distinct, size=n_rows))
+        
+        start = time.perf_counter()
+        expected = descriptions.apply(lambda d: infer_category_naive(d, taxonomy))
+        naive_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        classifier = CategoryClassifier(taxonomy)
+        compile_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = classifier.classify_series(descriptions)
+        compiled_seconds = time.perf_counter() - start
+        
+        mismatches = int((expected != actual).sum())
+        print(f"\n{label}: {len(taxonomy)} categories, {len(keywords)} keywords, {n_rows} rows")
+        print(f"  Nested loop: {naive_seconds:.3f}s ({n_rows / naive_seconds:,.0f} rows/sec)")
+        print(f"  Compiled:    {compiled_seconds:.3f}s ({n_rows / compiled_seconds:,.0f} rows/sec), compile {compile_seconds:.3f}s")
+        print(f"  Speedup: {naive_seconds / compiled_seconds:.1f}x, mismatches: {mismatches}")
+        if mismatches:
+            raise AssertionError(f"Compiled classifier disagrees with nested loop on {mismatches} rows")
+    print("="*60)
+
+
+def benchmark_output_formats():
+    """Compare size and full read time of the CSV, JSON Lines and Parquet transaction outputs."""
+    import time
+    
+    transactions_file = os.path.join(OUTPUT_DIR, 'transactions_history.csv')
+    
+    def read_csv():
+        df = pd.read_csv(transactions_file)
+        return [json.loads(items) for items in df['items']]
+    
+    readers = [
+        ('CSV + json.loads(items)', transactions_file, read_csv),
+        ('JSONL.gz (streamed)', TRANSACTIONS_JSONL, lambda: list(iter_transactions_jsonl(TRANSACTIONS_JSONL))),
+        ('Parquet nested (streamed)', TRANSACTIONS_PARQUET_DIR, lambda: list(iter_transactions_parquet(TRANSACTIONS_PARQUET_DIR))),
+        ('Parquet line items', TRANSACTION_ITEMS_PARQUET_DIR, lambda: pd.read_parquet(TRANSACTION_ITEMS_PARQUET_DIR)),
+    ]
+    
+    print("="*60)
+    print("TRANSACTION OUTPUT FORMATS")
+    print("="*60)
+    for label, path, reader in readers:
+        if not os.path.exists(path):
+            print(f"  {label:28s} missing ({path})")
+            continue
+        start = time.perf_counter()
+        reader()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:28s} {_path_size(path):>12,} B  read {elapsed * 1000:8.1f} ms")
+    print("="*60)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Transform UCI Online Retail data for Agentic Retail OS')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--incremental', nargs='+', metavar='EXPORT',
+                      help='Process only new rows from these sales exports (in chronological order)')
+    mode.add_argument('--verify-incremental', nargs='+', metavar='EXPORT',
+                      help='Check incremental state against a full rebuild over all these exports')
+    mode.add_argument('--benchmark-categories', nargs='?', type=int, const=20000, metavar='ROWS',
+                      help='Benchmark the compiled category classifier against the nested loop')
+    mode.add_argument('--benchmark-formats', action='store_true',
+                      help='Compare size and read time of the transaction output formats')
+    mode.add_argument('--compare-profile', metavar='REPORT',
+                      help='Compare a --profile report against the baseline (see --baseline)')
+    parser.add_argument('--baseline', metavar='REPORT',
+                        help=f'Baseline report for --compare-profile (default: {PROFILE_BASELINE})')
+    parser.add_argument('--input', help='Raw input file (.xlsx or .csv) instead of the default Excel file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record per-step wall/CPU time, peak RSS and row counts to a JSON report')
+    parser.add_argument('--profile-cprofile', action='store_true', help='Also dump cProfile stats for each step')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this profile run as the baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown flagged as a regression by --compare-profile')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    if args.input:
+        INPUT_FILE = os.path.abspath(args.input)
+    if args.compare_profile:
+        if not compare_profile(args.compare_profile, args.baseline, threshold=args.threshold):
+            raise SystemExit(1)
+    elif args.incremental:
+        run_incremental(args.incremental)
+    elif args.benchmark_categories:
+        benchmark_category_classifier(args.benchmark_categories)
+    elif args.benchmark_formats:
+        benchmark_output_formats()
+    elif args.verify_incremental:
+        if not verify_incremental_state(args.verify_incremental):
+            raise SystemExit(1)
+    else:
+        main(profile=args.profile, cprofile=args.profile_cprofile, save_baseline=args.save_baseline)
 
@@ -5,6 +5,8 @@ Update image URLs in products JSON to use local paths
 import json
 import os
 
+from convert_csv_to_json import StreamingJSONArrayWriter, COMPRESSED_FORMATS
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 PRODUCTS_JSON = os.path.join(PROJECT_ROOT, 'web', 'src', 'data', 'products.json')
@@ -12,19 +14,27 @@ PRODUCTS_JSON = os.path.join(PROJECT_ROOT, 'web', 'src', 'data', 'products.json'
 def update_image_urls():
     """Update image URLs to use local paths"""
     with open(PRODUCTS_JSON, 'r') as f:
-        products = json.load(f)
+        text = f.read()
+    products = json.loads(text)
     
+    changed = 0
     for product in products:
-        # Extract SKU and update image URL
-        sku = product['sku']
         # Update to local path: /images/{sku}.png
-        product['image_url'] = f'/images/{sku}.png'
+        image_url = f"/images/{product['sku']}.png"
+        if product.get('image_url') != image_url:
+            product['image_url'] = image_url
+            changed += 1
+    
+    # convert_csv_to_json.py already writes these URLs; only rewrite if something differs
+    if not changed:
+        print(f"✓ Image URLs already up to date for {len(products)} products")
+        return
     
-    with open(PRODUCTS_JSON, 'w') as f:
-        json.dump(products, f, indent=2)
+    compact = not text.startswith('[\n')
+    with StreamingJSONArrayWriter(PRODUCTS_JSON, compact, COMPRESSED_FORMATS) as writer:
+        writer.write_many(products)
     
-    print(f"✓ Updated image URLs for {len(products)} products")
+    print(f"✓ Updated image URLs for {changed} of {len(products)} products")
 
 if __name__ == '__main__':
     update_image_urls()
-
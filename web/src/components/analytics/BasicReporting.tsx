@@ -18,7 +18,7 @@ import {
 import TrendingUpIcon from '@mui/icons-material/TrendingUp';
 import ShoppingCartIcon from '@mui/icons-material/ShoppingCart';
 import AttachMoneyIcon from '@mui/icons-material/AttachMoney';
-import { transactionService } from '../../services/mockData';
+import { mockTransactions, transactionService } from '../../services/mockData';
 import { formatPrice, formatDate } from '../../utils/formatters';
 
 interface DailyStats {
@@ -44,22 +44,22 @@ export default function BasicReporting() {
   const loadStats = async () => {
     try {
       setLoading(true);
-      const transactions = await transactionService.getAll();
-      
       // Get today's date
       const today = new Date().toISOString().split('T')[0];
       
-      // Filter today's transactions
-      const todayTransactions = transactions.filter((txn) =>
-        txn.timestamp.startsWith(today)
-      );
+      // Headline numbers come from the shard index plus this session's sales;
+      // only shards covering today are fetched (for top-selling items)
+      const index = await transactionService.getIndex();
+      const historyTotals = index.days[today];
+      const sessionToday = mockTransactions.filter((txn) => txn.timestamp.startsWith(today));
+      const todayTransactions = historyTotals
+        ? await transactionService.getByDateRange(today, today)
+        : sessionToday;
       
       // Calculate stats
-      const totalRevenue = todayTransactions.reduce(
-        (sum, txn) => sum + txn.total,
-        0
-      );
-      const transactionCount = todayTransactions.length;
+      const totalRevenue =
+        (historyTotals?.total ?? 0) + sessionToday.reduce((sum, txn) => sum + txn.total, 0);
+      const transactionCount = (historyTotals?.count ?? 0) + sessionToday.length;
       const averageTransactionValue =
         transactionCount > 0 ? Math.round(totalRevenue / transactionCount) : 0;
       
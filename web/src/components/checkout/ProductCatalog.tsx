@@ -9,7 +9,6 @@ import {
   TextField,
   Card,
   CardContent,
-  CardMedia,
   Typography,
   Button,
   Chip,
@@ -21,7 +20,10 @@ import SearchIcon from '@mui/icons-material/Search';
 import AddShoppingCartIcon from '@mui/icons-material/AddShoppingCart';
 import type { Product } from '../../types';
 import { productService } from '../../services/mockData';
+import { findSpriteTile, loadSpriteAtlases } from '../../services/spriteAtlases';
+import type { SpriteAtlasMap } from '../../services/spriteAtlases';
 import { formatPrice } from '../../utils/formatters';
+import ProductImage from './ProductImage';
 
 interface ProductCatalogProps {
   onAddToCart: (sku: string, quantity: number) => void;
@@ -31,9 +33,11 @@ export default function ProductCatalog({ onAddToCart }: ProductCatalogProps) {
   const [products, setProducts] = useState<Product[]>([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [loading, setLoading] = useState(false);
+  const [atlasMap, setAtlasMap] = useState<SpriteAtlasMap | null>(null);
 
   useEffect(() => {
     loadProducts();
+    loadSpriteAtlases().then(setAtlasMap);
   }, []);
 
   useEffect(() => {
@@ -125,22 +129,7 @@ export default function ProductCatalog({ onAddToCart }: ProductCatalogProps) {
                 },
               }}
             >
-              <CardMedia
-                component="img"
-                height="140"
-                image={product.image_url || '/placeholder.png'}
-                alt={product.name}
-                sx={{
-                  objectFit: 'contain',
-                  bgcolor: 'grey.100',
-                  p: 1,
-                }}
-                onError={(e) => {
-                  // Fallback if image fails to load
-                  const target = e.target as HTMLImageElement;
-                  target.src = '/placeholder.png';
-                }}
-              />
+              <ProductImage product={product} height={140} tile={findSpriteTile(atlasMap, product.sku)} />
               <CardContent sx={{ flexGrow: 1, display: 'flex', flexDirection: 'column', p: 2 }}>
                 <Typography variant="caption" color="text.secondary" gutterBottom>
                   {product.category}
@@ -0,0 +1,66 @@
+/**
+ * Product Image Component
+ * Draws the product's tile from its category sprite atlas when one is available,
+ * otherwise serves AVIF/WebP variants through <picture>, falling back to the original image
+ */
+
+import { useState } from 'react';
+import { Box } from '@mui/material';
+import type { Product } from '../../types';
+import type { SpriteTile } from '../../services/spriteAtlases';
+import { formatImageSources } from '../../utils/formatters';
+
+const PLACEHOLDER = '/placeholder.png';
+const PADDING = 8;
+
+interface ProductImageProps {
+  product: Product;
+  height: number;
+  tile?: SpriteTile;
+}
+
+export default function ProductImage({ product, height, tile }: ProductImageProps) {
+  // A failed variant or original drops straight to the placeholder (no <source> left to win)
+  const [failed, setFailed] = useState(false);
+  const frame = { display: 'block', height, bgcolor: 'grey.100', p: `${PADDING}px`, boxSizing: 'border-box' };
+
+  if (tile) {
+    // Crop the tile out of the shared sheet, scaled to the card's image area
+    const size = height - 2 * PADDING;
+    const scale = size / tile.w;
+    return (
+      <Box sx={frame}>
+        <Box
+          role="img"
+          aria-label={product.name}
+          sx={{
+            width: size,
+            height: size,
+            mx: 'auto',
+            backgroundImage: `url(${tile.sheet.url})`,
+            backgroundRepeat: 'no-repeat',
+            backgroundSize: `${tile.sheet.width * scale}px ${tile.sheet.height * scale}px`,
+            backgroundPosition: `${-tile.x * scale}px ${-tile.y * scale}px`,
+          }}
+        />
+      </Box>
+    );
+  }
+
+  const sources = failed ? [] : formatImageSources(product.image_variants);
+  return (
+    <Box component="picture" sx={frame}>
+      {sources.map((source) => (
+        <source key={source.type} type={source.type} srcSet={source.srcSet} sizes={`${height}px`} />
+      ))}
+      <Box
+        component="img"
+        src={failed ? PLACEHOLDER : product.image_url || PLACEHOLDER}
+        alt={product.name}
+        loading="lazy"
+        sx={{ display: 'block', width: '100%', height: '100%', objectFit: 'contain' }}
+        onError={() => setFailed(true)}
+      />
+    </Box>
+  );
+}
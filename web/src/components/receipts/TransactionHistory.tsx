@@ -26,6 +26,9 @@ import { transactionService } from '../../services/mockData';
 import { formatPrice, formatDateTime } from '../../utils/formatters';
 import ReceiptPreview from '../checkout/ReceiptPreview';
 
+// Transactions loaded per page; older history is fetched shard by shard on demand
+const PAGE_SIZE = 100;
+
 export default function TransactionHistory() {
   const [transactions, setTransactions] = useState<Transaction[]>([]);
   const [filteredTransactions, setFilteredTransactions] = useState<Transaction[]>([]);
@@ -33,10 +36,12 @@ export default function TransactionHistory() {
   const [selectedTransaction, setSelectedTransaction] = useState<Transaction | null>(null);
   const [receiptOpen, setReceiptOpen] = useState(false);
   const [loading, setLoading] = useState(true);
+  const [limit, setLimit] = useState(PAGE_SIZE);
+  const [totalCount, setTotalCount] = useState(0);
 
   useEffect(() => {
-    loadTransactions();
-  }, []);
+    loadTransactions(limit);
+  }, [limit]);
 
   const filterTransactions = useCallback(() => {
     if (!searchQuery.trim()) {
@@ -60,12 +65,16 @@ export default function TransactionHistory() {
     filterTransactions();
   }, [filterTransactions]);
 
-  const loadTransactions = async () => {
+  const loadTransactions = async (count: number) => {
     try {
       setLoading(true);
-      const data = await transactionService.getAll();
+      const [data, index] = await Promise.all([
+        transactionService.getRecent(count),
+        transactionService.getIndex(),
+      ]);
       setTransactions(data);
       setFilteredTransactions(data);
+      setTotalCount(index.totals.count);
     } catch (error) {
       console.error('Failed to load transactions:', error);
     } finally {
@@ -161,6 +170,14 @@ export default function TransactionHistory() {
         </TableContainer>
       )}
 
+      {!loading && transactions.length < totalCount && (
+        <Box sx={{ mt: 2, textAlign: 'center' }}>
+          <Button variant="outlined" onClick={() => setLimit(limit + PAGE_SIZE)}>
+            Load older transactions ({transactions.length} of {totalCount} shown)
+          </Button>
+        </Box>
+      )}
+
       <ReceiptPreview
         open={receiptOpen}
         transaction={selectedTransaction}
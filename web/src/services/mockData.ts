@@ -1,17 +1,27 @@
 /**
  * Mock data service for local development
- * Loads data from JSON files
+ * Loads products from JSON and transaction history from lazily fetched shards
  */
 
 import productsData from '../data/products.json';
-import transactionsData from '../data/transactions.json';
-import type { Product, Transaction } from '../types';
+import type { Product, Transaction, TransactionShardIndex } from '../types';
+import {
+  findTransaction,
+  loadRecentTransactions,
+  loadShardIndex,
+  loadTransactionsInRange,
+} from './transactionShards';
+import { loadSearchIndex } from './productSearch';
 
 // Simulate API delay
 const delay = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
 
 export const mockProducts = productsData as Product[];
-export const mockTransactions = transactionsData as Transaction[];
+// Transactions created this session (history lives in public/data/transactions)
+export const mockTransactions: Transaction[] = [];
+
+const newestFirst = (transactions: Transaction[]) =>
+  transactions.sort((a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime());
 
 /**
  * Mock API service for products
@@ -36,8 +46,17 @@ export const productService = {
   /**
    * Search products
    */
-  async search(query: string): Promise<Product[]> {
-    await delay(300);
+  async search(query: string, limit = 50): Promise<Product[]> {
+    try {
+      const index = await loadSearchIndex();
+      const bySku = new Map(mockProducts.map((p) => [p.sku, p]));
+      return index
+        .search(query, limit)
+        .map((hit) => bySku.get(String(hit.sku)))
+        .filter((p): p is Product => p !== undefined);
+    } catch (error) {
+      console.warn('Search index unavailable, falling back to a linear filter:', error);
+    }
     const lowerQuery = query.toLowerCase();
     return mockProducts.filter(
       p =>
@@ -53,21 +72,48 @@ export const productService = {
  */
 export const transactionService = {
   /**
-   * Get all transactions
+   * Get all transactions (loads every shard - prefer getRecent or getByDateRange)
    */
   async getAll(): Promise<Transaction[]> {
-    await delay(300);
-    return [...mockTransactions].sort((a, b) => 
-      new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
-    );
+    const index = await loadShardIndex();
+    const history = index.first_date && index.last_date
+      ? await loadTransactionsInRange(index.first_date, index.last_date)
+      : [];
+    return newestFirst([...mockTransactions, ...history]);
+  },
+
+  /**
+   * Get the most recent transactions (at least `limit` if available)
+   */
+  async getRecent(limit: number): Promise<Transaction[]> {
+    const history = await loadRecentTransactions(limit);
+    return newestFirst([...mockTransactions, ...history]);
+  },
+
+  /**
+   * Get transactions between two YYYY-MM-DD dates (inclusive, UTC)
+   */
+  async getByDateRange(startDate: string, endDate: string): Promise<Transaction[]> {
+    const history = await loadTransactionsInRange(startDate, endDate);
+    const created = mockTransactions.filter((t) => {
+      const date = t.timestamp.slice(0, 10);
+      return date >= startDate && date <= endDate;
+    });
+    return newestFirst([...created, ...history]);
+  },
+
+  /**
+   * Get the shard index: per-shard and per-day counts and totals without loading any shard
+   */
+  async getIndex(): Promise<TransactionShardIndex> {
+    return loadShardIndex();
   },
 
   /**
    * Get transaction by ID
    */
   async getById(transactionId: string): Promise<Transaction | null> {
-    await delay(200);
-    return mockTransactions.find(t => t.transaction_id === transactionId) || null;
+    return mockTransactions.find(t => t.transaction_id === transactionId) || findTransaction(transactionId);
   },
 
   /**
@@ -0,0 +1,130 @@
+/**
+ * Client for the prebuilt product search index
+ * public/data/search_index.json is written by scripts/product_search_index.py
+ */
+
+interface SearchIndexFile {
+  version: number;
+  fields: string[];
+  docs: Array<Array<string | number>>; // In popularity order
+  tokens: string[]; // Sorted
+  postings: number[][]; // Doc IDs per token, ascending (= popularity order)
+}
+
+export interface SearchHit {
+  sku: string;
+  name: string;
+  category: string;
+  price: number; // In cents
+  stock_quantity: number;
+  image_url: string;
+  popularity: number;
+}
+
+const SEARCH_INDEX_URL = '/data/search_index.json';
+
+/**
+ * Lowercase, strip accents and split into alphanumeric tokens (matches the Python build)
+ */
+export const normalizeQuery = (text: string): string[] =>
+  text
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .match(/[a-z0-9]+/g) ?? [];
+
+class ProductSearchIndex {
+  private docs: SearchHit[];
+  private tokens: string[];
+  private postings: number[][];
+  private docTokens: number[][];
+  private skuToDoc = new Map<string, number>();
+
+  constructor(index: SearchIndexFile) {
+    this.tokens = index.tokens;
+    this.postings = index.postings;
+    this.docs = index.docs.map(
+      (row) => Object.fromEntries(index.fields.map((field, i) => [field, row[i]])) as unknown as SearchHit
+    );
+    this.docs.forEach((doc, docId) => this.skuToDoc.set(String(doc.sku).toLowerCase(), docId));
+    this.docTokens = this.docs.map(() => []);
+    this.postings.forEach((docIds, tokenId) => docIds.forEach((docId) => this.docTokens[docId].push(tokenId)));
+  }
+
+  private lowerBound(value: string): number {
+    let lo = 0;
+    let hi = this.tokens.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      if (this.tokens[mid] < value) lo = mid + 1;
+      else hi = mid;
+    }
+    return lo;
+  }
+
+  /** Token IDs [lo, hi) starting with prefix */
+  private tokenRange(prefix: string): [number, number] {
+    return [this.lowerBound(prefix), this.lowerBound(prefix + '\uffff')];
+  }
+
+  /**
+   * Products matching every term as a prefix: exact SKU first, then by popularity
+   */
+  search(query: string, limit = 10): SearchHit[] {
+    const terms = normalizeQuery(query);
+    if (terms.length === 0) return [];
+
+    const results: number[] = [];
+    const exact = this.skuToDoc.get(terms.join(''));
+    if (exact !== undefined) results.push(exact);
+
+    const ranges = terms
+      .map((term) => {
+        const [lo, hi] = this.tokenRange(term);
+        let count = 0;
+        for (let t = lo; t < hi; t++) count += this.postings[t].length;
+        return { lo, hi, count };
+      })
+      .sort((a, b) => a.count - b.count);
+    if (ranges[0].count === 0) return results.map((docId) => this.docs[docId]);
+
+    // Candidates from the rarest term, in rank order; other terms checked per doc
+    const [rarest, ...others] = ranges;
+    let candidates: number[] = this.postings[rarest.lo];
+    if (rarest.hi - rarest.lo > 1) {
+      const merged = new Set<number>();
+      for (let t = rarest.lo; t < rarest.hi; t++) this.postings[t].forEach((docId) => merged.add(docId));
+      candidates = Array.from(merged).sort((a, b) => a - b);
+    }
+    for (const docId of candidates) {
+      if (results.length >= limit) break;
+      if (docId === exact) continue;
+      const tokens = this.docTokens[docId];
+      if (others.every(({ lo, hi }) => tokens.some((t) => t >= lo && t < hi))) {
+        results.push(docId);
+      }
+    }
+    return results.slice(0, limit).map((docId) => this.docs[docId]);
+  }
+}
+
+let indexPromise: Promise<ProductSearchIndex> | null = null;
+
+/**
+ * Load (once) the search index
+ */
+export const loadSearchIndex = (): Promise<ProductSearchIndex> => {
+  if (!indexPromise) {
+    indexPromise = fetch(SEARCH_INDEX_URL)
+      .then((response) => {
+        if (!response.ok) throw new Error(`Failed to load ${SEARCH_INDEX_URL}: ${response.status}`);
+        return response.json() as Promise<SearchIndexFile>;
+      })
+      .then((index) => new ProductSearchIndex(index))
+      .catch((error) => {
+        indexPromise = null;
+        throw error;
+      });
+  }
+  return indexPromise;
+};
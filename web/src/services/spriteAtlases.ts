@@ -0,0 +1,65 @@
+/**
+ * Client for the product sprite atlases
+ * public/data/sprite_atlases.json is written by scripts/build_sprite_atlases.py
+ */
+
+export interface AtlasSheet {
+  url: string;
+  category: string;
+  width: number;
+  height: number;
+  bytes: number;
+  hash: string;
+}
+
+export interface AtlasTile {
+  atlas: string;
+  x: number;
+  y: number;
+  w: number;
+  h: number;
+}
+
+export interface SpriteAtlasMap {
+  tile_size: number;
+  atlases: Record<string, AtlasSheet>;
+  skus: Record<string, AtlasTile>;
+}
+
+/**
+ * One product's tile, resolved to its sheet
+ */
+export interface SpriteTile extends AtlasTile {
+  sheet: AtlasSheet;
+}
+
+const ATLAS_MAP_URL = '/data/sprite_atlases.json';
+const EMPTY_MAP: SpriteAtlasMap = { tile_size: 0, atlases: {}, skus: {} };
+
+let mapPromise: Promise<SpriteAtlasMap> | null = null;
+
+/**
+ * Load the atlas map once per session.
+ * Resolves to an empty map when the atlases haven't been built, so every
+ * product falls back to its own image.
+ */
+export const loadSpriteAtlases = (): Promise<SpriteAtlasMap> => {
+  if (!mapPromise) {
+    mapPromise = fetch(ATLAS_MAP_URL)
+      .then((response) => (response.ok ? (response.json() as Promise<SpriteAtlasMap>) : EMPTY_MAP))
+      .catch(() => {
+        mapPromise = null;
+        return EMPTY_MAP;
+      });
+  }
+  return mapPromise;
+};
+
+/**
+ * Tile for a SKU, or undefined if the SKU isn't in an atlas
+ */
+export const findSpriteTile = (atlasMap: SpriteAtlasMap | null, sku: string): SpriteTile | undefined => {
+  const tile = atlasMap?.skus[sku];
+  const sheet = tile && atlasMap?.atlases[tile.atlas];
+  return tile && sheet ? { ...tile, sheet } : undefined;
+};
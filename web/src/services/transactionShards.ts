@@ -0,0 +1,95 @@
+/**
+ * Lazy loader for the sharded transaction history
+ * Fetches the shard index once and individual shards only when a view needs them
+ */
+
+import type { Transaction, TransactionShard, TransactionShardIndex } from '../types';
+
+const SHARD_BASE_URL = '/data/transactions';
+
+let indexPromise: Promise<TransactionShardIndex> | null = null;
+const shardCache = new Map<string, Promise<Transaction[]>>();
+
+const fetchJson = async <T>(url: string): Promise<T> => {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${url}: ${response.status}`);
+  }
+  return response.json() as Promise<T>;
+};
+
+/**
+ * Shard index (date ranges, counts and totals per shard and per day)
+ */
+export const loadShardIndex = (): Promise<TransactionShardIndex> => {
+  if (!indexPromise) {
+    indexPromise = fetchJson<TransactionShardIndex>(`${SHARD_BASE_URL}/index.json`).catch((error) => {
+      indexPromise = null; // Allow a retry after a failed fetch
+      throw error;
+    });
+  }
+  return indexPromise;
+};
+
+/**
+ * Transactions in one shard, sorted oldest first
+ */
+export const loadShard = (shard: TransactionShard): Promise<Transaction[]> => {
+  let promise = shardCache.get(shard.file);
+  if (!promise) {
+    promise = fetchJson<Transaction[]>(shard.url).catch((error) => {
+      shardCache.delete(shard.file);
+      throw error;
+    });
+    shardCache.set(shard.file, promise);
+  }
+  return promise;
+};
+
+/**
+ * Shards overlapping an inclusive YYYY-MM-DD date range
+ */
+export const shardsInRange = (
+  index: TransactionShardIndex,
+  startDate: string,
+  endDate: string
+): TransactionShard[] =>
+  index.shards.filter((shard) => shard.last_date >= startDate && shard.first_date <= endDate);
+
+/**
+ * Transactions between two dates (inclusive, UTC), loading only the overlapping shards
+ */
+export const loadTransactionsInRange = async (startDate: string, endDate: string): Promise<Transaction[]> => {
+  const index = await loadShardIndex();
+  const shards = await Promise.all(shardsInRange(index, startDate, endDate).map(loadShard));
+  return shards
+    .flat()
+    .filter((txn) => {
+      const date = txn.timestamp.slice(0, 10);
+      return date >= startDate && date <= endDate;
+    });
+};
+
+/**
+ * The most recent transactions, loading shards newest first until `limit` is reached
+ */
+export const loadRecentTransactions = async (limit: number): Promise<Transaction[]> => {
+  const index = await loadShardIndex();
+  const recent: Transaction[] = [];
+  for (let i = index.shards.length - 1; i >= 0 && recent.length < limit; i--) {
+    recent.push(...(await loadShard(index.shards[i])));
+  }
+  return recent;
+};
+
+/**
+ * Find a transaction by ID, searching shards newest first
+ */
+export const findTransaction = async (transactionId: string): Promise<Transaction | null> => {
+  const index = await loadShardIndex();
+  for (let i = index.shards.length - 1; i >= 0; i--) {
+    const match = (await loadShard(index.shards[i])).find((txn) => txn.transaction_id === transactionId);
+    if (match) return match;
+  }
+  return null;
+};
@@ -15,6 +15,7 @@ export interface Product {
   supplier_name?: string;
   supplier_contact?: string;
   image_url?: string;
+  image_variants?: Record<string, Record<string, string>>; // format -> size (px) -> URL
   created_at: string;
   updated_at: string;
   is_active: boolean;
@@ -72,3 +73,34 @@ export interface DailySalesSummary {
   }>;
 }
 
+
+export interface TransactionTotals {
+  count: number;
+  units: number;
+  subtotal: number; // In cents
+  tax: number; // In cents
+  discount_total: number; // In cents
+  total: number; // In cents
+}
+
+export interface TransactionShard extends TransactionTotals {
+  file: string;
+  url: string;
+  first_date: string; // YYYY-MM-DD (UTC)
+  last_date: string;
+  start: string; // ISO 8601 timestamp of the first transaction
+  end: string;
+  bytes: number;
+}
+
+// public/data/transactions/index.json, written by scripts/convert_csv_to_json.py
+export interface TransactionShardIndex {
+  version: number;
+  shard_by: 'day' | 'count';
+  max_records: number;
+  first_date: string | null;
+  last_date: string | null;
+  totals: TransactionTotals;
+  days: Record<string, TransactionTotals>;
+  shards: TransactionShard[];
+}
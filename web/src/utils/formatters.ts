@@ -54,3 +54,39 @@ export const formatTime = (dateString: string): string => {
   });
 };
 
+
+/**
+ * Image formats the product grid offers, most compact first
+ * (the browser picks the first <source> it can decode)
+ */
+export const IMAGE_FORMATS = ['avif', 'webp'] as const;
+
+/**
+ * Build a srcSet for one format from a product's image variants
+ * @param variants Variant URLs by format and size (from build_image_derivatives.py)
+ * @param format Image format ('avif' or 'webp')
+ * @returns srcSet string (e.g., "/images/variants/X/128.webp 128w, ..."), or undefined
+ */
+export const formatSrcSet = (
+  variants: Record<string, Record<string, string>> | undefined,
+  format: string
+): string | undefined => {
+  const sizes = variants?.[format];
+  if (!sizes) return undefined;
+  return Object.entries(sizes)
+    .map(([size, url]) => `${url} ${size}w`)
+    .join(', ');
+};
+
+/**
+ * <picture> sources for a product's image variants, in IMAGE_FORMATS order
+ * @param variants Variant URLs by format and size
+ * @returns One { type, srcSet } per format that has variants
+ */
+export const formatImageSources = (
+  variants: Record<string, Record<string, string>> | undefined
+): Array<{ type: string; srcSet: string }> =>
+  IMAGE_FORMATS.flatMap((format) => {
+    const srcSet = formatSrcSet(variants, format);
+    return srcSet ? [{ type: `image/${format}`, srcSet }] : [];
+  });